@@ -0,0 +1,103 @@
+import fs from "fs";
+import net from "net";
+
+/** The size of the header of a frame, which holds the length of the payload. */
+const FRAME_HEADER_SIZE = 4;
+
+export type FrameHandler = (request: any) => Promise<any>;
+
+/**
+ * A server that receives the calls from the clients on the same host through a Unix domain socket.
+ * It removes the TCP and HTTP overhead from every call to a simulated resource.
+ *
+ * Each message, in both directions, is a frame of a 4-byte big-endian length followed by a UTF-8
+ * encoded JSON payload. The requests sent on one connection are handled in order, and a reply is
+ * sent for each of them in the same order.
+ */
+export class IpcServer {
+  private server?: net.Server;
+  private readonly sockets: Set<net.Socket> = new Set();
+
+  constructor(private readonly handler: FrameHandler) {}
+
+  public async listen(socketPath: string): Promise<void> {
+    // Remove the socket file left by a previous simulator that didn't exit properly.
+    fs.rmSync(socketPath, { force: true });
+
+    const server = net.createServer((socket) => this.serve(socket));
+    await new Promise<void>((resolve, reject) => {
+      server.once("error", reject);
+      server.listen(socketPath, () => {
+        server.off("error", reject);
+        resolve();
+      });
+    });
+    this.server = server;
+  }
+
+  public async close(): Promise<void> {
+    for (const socket of this.sockets) {
+      socket.destroy();
+    }
+    await new Promise<void>((resolve) => {
+      if (!this.server) {
+        resolve();
+        return;
+      }
+      this.server.close(() => resolve());
+    });
+    this.server = undefined;
+  }
+
+  private serve(socket: net.Socket) {
+    this.sockets.add(socket);
+    socket.on("close", () => this.sockets.delete(socket));
+    socket.on("error", (e) => {
+      if (process.env.DEBUG) {
+        console.error(`The IPC connection failed: ${e}`);
+      }
+    });
+
+    let buffered = Buffer.alloc(0);
+    // Chain the handling of the requests, so that the replies are sent in the order of the requests.
+    let pending = Promise.resolve();
+    socket.on("data", (chunk) => {
+      buffered = buffered.length === 0 ? chunk : Buffer.concat([buffered, chunk]);
+
+      while (buffered.length >= FRAME_HEADER_SIZE) {
+        const length = buffered.readUInt32BE(0);
+        if (buffered.length < FRAME_HEADER_SIZE + length) {
+          break;
+        }
+
+        const payload = buffered.subarray(FRAME_HEADER_SIZE, FRAME_HEADER_SIZE + length);
+        buffered = buffered.subarray(FRAME_HEADER_SIZE + length);
+
+        let request: any;
+        try {
+          request = JSON.parse(payload.toString("utf-8"));
+        } catch (e) {
+          // The stream can't be resynchronized after a malformed frame.
+          socket.destroy(new Error(`Received a malformed frame: ${e}`));
+          return;
+        }
+
+        pending = pending
+          .then(() => this.handler(request))
+          .then((reply) => {
+            if (!socket.destroyed) {
+              socket.write(encodeFrame(reply));
+            }
+          })
+          .catch((e) => socket.destroy(e));
+      }
+    });
+  }
+}
+
+export function encodeFrame(message: any): Buffer {
+  const payload = Buffer.from(JSON.stringify(message), "utf-8");
+  const header = Buffer.alloc(FRAME_HEADER_SIZE);
+  header.writeUInt32BE(payload.length, 0);
+  return Buffer.concat([header, payload]);
+}
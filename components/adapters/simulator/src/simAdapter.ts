@@ -46,6 +46,9 @@ export class SimulatorAdapter extends core.Adapter {
     this.simulator = new Simulator(this.rootpath, address);
     await this.simulator.start();
     envs.PLUTO_SIMULATOR_URL = this.simulator.serverUrl;
+    if (this.simulator.socketPath) {
+      envs.PLUTO_SIMULATOR_SOCKET = this.simulator.socketPath;
+    }
 
     for (const [key, value] of Object.entries(envs)) {
       process.env[key] = value;
@@ -1,11 +1,20 @@
 import fs from "fs";
+import os from "os";
 import http from "http";
 import path from "path";
+import { randomUUID } from "crypto";
 import express from "express";
 import { currentLanguage } from "@plutolang/base/utils";
 import { LanguageType, arch, simulator } from "@plutolang/base";
 import { ComputeClosure, AnyFunction, createClosure } from "@plutolang/base/closure";
 import { MethodNotFound, ResourceNotFound } from "./errors";
+import { IpcServer } from "./ipc";
+
+/**
+ * The maximum size of a request body. The default of express, 100kb, is too small for the batched
+ * operations.
+ */
+const BODY_SIZE_LIMIT = "50mb";
 
 export class Simulator {
   private resources: Map<string, simulator.IResourceInstance>;
@@ -13,6 +22,8 @@ export class Simulator {
 
   private _serverUrl?: string;
   private _server?: http.Server;
+  private _socketPath?: string;
+  private _ipcServer?: IpcServer;
 
   private readonly exitHandler = async () => {};
 
@@ -242,6 +253,45 @@ export class Simulator {
         break;
       }
     }
+
+    await this.startIpcServer();
+  }
+
+  /**
+   * Starts the server for the clients on the same host, which receives the calls through a Unix
+   * domain socket. The HTTP server remains available as a fallback, e.g. for remote clients.
+   */
+  private async startIpcServer(): Promise<void> {
+    if (process.platform === "win32" || process.env.PLUTO_SIMULATOR_DISABLE_IPC) {
+      return;
+    }
+
+    // The length of a socket path is limited to around 100 bytes, so the temporary directory is
+    // used instead of the project directory.
+    const socketPath = path.join(os.tmpdir(), `pluto-sim-${randomUUID().slice(0, 8)}.sock`);
+    const ipcServer = new IpcServer((request) => this.handleIpcRequest(request));
+    try {
+      await ipcServer.listen(socketPath);
+    } catch (e) {
+      if (process.env.DEBUG) {
+        console.error(`Failed to listen on ${socketPath}, falling back to HTTP only: ${e}`);
+      }
+      return;
+    }
+
+    this._socketPath = socketPath;
+    this._ipcServer = ipcServer;
+  }
+
+  private async handleIpcRequest(
+    request: simulator.ServerRequest | simulator.BatchRequest
+  ): Promise<simulator.ServerResponse | simulator.BatchResponse> {
+    if ("calls" in request) {
+      return await this.invokeBatch(request.calls);
+    }
+
+    const [, reply] = await this.invokeAndCatch(request.resourceId, request.op, request.args);
+    return reply;
   }
 
   public async stop(): Promise<void> {
@@ -249,6 +299,13 @@ export class Simulator {
     this._server = undefined;
     this._serverUrl = undefined;
 
+    await this._ipcServer?.close();
+    if (this._socketPath) {
+      fs.rmSync(this._socketPath, { force: true });
+    }
+    this._ipcServer = undefined;
+    this._socketPath = undefined;
+
     // Remove the exit handler to avoid too many listeners.
     process.off("SIGINT", this.exitHandler);
     process.off("SIGTERM", this.exitHandler);
@@ -269,6 +326,14 @@ export class Simulator {
     return this._serverUrl;
   }
 
+  /**
+   * The path of the Unix domain socket that the simulator listens on, or undefined if the IPC
+   * transport isn't available on this host.
+   */
+  get socketPath(): string | undefined {
+    return this._socketPath;
+  }
+
   private createExpress() {
     const invokeAndReply = async (
       resourceId: string,
@@ -276,40 +341,31 @@ export class Simulator {
       args: any[],
       res: express.Response
     ) => {
-      try {
-        const result = await this.invokeMethod(resourceId, method, args);
-        res.status(200).json({ result });
-      } catch (err: any) {
-        if (err instanceof MethodNotFound || err instanceof ResourceNotFound) {
-          res.status(404).json({
-            error: {
-              message: err.message,
-              stack: err.message,
-              name: err.name,
-            },
-          });
-        } else {
-          const replyError = err instanceof Error ? err : new Error(`${err}`);
-          res.status(500).json({
-            error: {
-              message: replyError.message,
-              stack: replyError.stack,
-              name: replyError.name,
-            },
-          });
-        }
-      }
+      const [status, reply] = await this.invokeAndCatch(resourceId, method, args);
+      res.status(status).json(reply);
     };
 
     const app = express();
-    app.use(express.json());
-    app.use(express.urlencoded({ extended: true }));
+    app.use(express.json({ limit: BODY_SIZE_LIMIT }));
+    app.use(express.urlencoded({ extended: true, limit: BODY_SIZE_LIMIT }));
 
     app.post("/call", async (req: express.Request, res: express.Response) => {
       const { resourceId, op, args } = req.body;
       await invokeAndReply(resourceId, op, args, res);
     });
 
+    // Invokes a list of operations in one round trip. The operations are executed in order, and
+    // the failure of one doesn't stop the following ones. The replies are in the same order.
+    app.post("/batch", async (req: express.Request, res: express.Response) => {
+      const { calls } = req.body as simulator.BatchRequest;
+      if (!Array.isArray(calls)) {
+        res.status(400).json({ error: { message: "The calls should be an array." } });
+        return;
+      }
+
+      res.status(200).json(await this.invokeBatch(calls));
+    });
+
     app.post("/:resourceId/:method", async (req: express.Request, res: express.Response) => {
       const { resourceId, method } = req.params;
       const args = req.body;
@@ -319,6 +375,59 @@ export class Simulator {
     return app;
   }
 
+  /**
+   * Invokes the calls in order. The failure of one doesn't stop the following ones.
+   */
+  private async invokeBatch(calls: simulator.ServerRequest[]): Promise<simulator.BatchResponse> {
+    const results: simulator.ServerResponse[] = [];
+    for (const call of calls) {
+      const [, reply] = await this.invokeAndCatch(call.resourceId, call.op, call.args);
+      results.push(reply);
+    }
+    return { results };
+  }
+
+  /**
+   * Invokes a method on a resource instance and converts the outcome to a reply.
+   *
+   * @returns The HTTP status code and the reply of the invocation.
+   */
+  private async invokeAndCatch(
+    resourceId: string,
+    method: string,
+    args: any[]
+  ): Promise<[number, simulator.ServerResponse]> {
+    try {
+      const result = await this.invokeMethod(resourceId, method, args);
+      return [200, { result }];
+    } catch (err: any) {
+      if (err instanceof MethodNotFound || err instanceof ResourceNotFound) {
+        return [
+          404,
+          {
+            error: {
+              message: err.message,
+              stack: err.message,
+              name: err.name,
+            },
+          },
+        ];
+      }
+
+      const replyError = err instanceof Error ? err : new Error(`${err}`);
+      return [
+        500,
+        {
+          error: {
+            message: replyError.message,
+            stack: replyError.stack,
+            name: replyError.name,
+          },
+        },
+      ];
+    }
+  }
+
   /**
    * Invokes a method on a resource instance. The resource Id can be a partial ID. But if multiple
    * resources are found for the given ID, an error is thrown.
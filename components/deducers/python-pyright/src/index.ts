@@ -20,7 +20,18 @@ import { TypeSearcher } from "./type-searcher";
 import { ImportFinder } from "./import-finder";
 import * as ProgramUtils from "./program-utils";
 import { CodeExtractor } from "./code-extractor";
-import { bundleModules } from "./module-bundler";
+import {
+  bundleModules,
+  BundleModulesOptions,
+  BuildContainers,
+  createBuildContainers,
+  BundleReport,
+  Limiter,
+  Module,
+  TreeShakeOptions,
+} from "./module-bundler";
+import * as LayerUtils from "./module-bundler/layer";
+import * as BundleManifestUtils from "./module-bundler/bundle-manifest";
 import {
   CustomInfraFn,
   validateCustomInfraFn,
@@ -315,21 +326,118 @@ export default class PyrightDeducer extends core.Deducer {
       );
     }
 
-    await Promise.all(
+    const platformType = this.stack.platformType;
+    // TODO: Make the Python version and architecture configurable. These values will be used in
+    // multiple places, including the Deducer and the infrastructure SDK. The former determines
+    // the Python version and architecture for bundling dependencies, while the latter sets the
+    // cloud runtime environment.
+    let buildContainers: Promise<BuildContainers> | undefined;
+    const bundleOptions: BundleModulesOptions = {
+      install: installPkg,
+      slim: true,
+      // By default, we'll delete the `dist-info` directory, but LangChain needs it. The bytecode is
+      // precompiled for the runtime, so it's kept too.
+      uselessFilesPatterns: [],
+      cache: true,
+      platform: platformType,
+      compile: true,
+      // The pip processes of all the closures share the limiter, the distributions they install are
+      // shared through the store.
+      limiter: new Limiter(this.stack.configs["bundleConcurrency"]),
+      // If Docker is used, e.g. for cross-architecture, the commands of all the closures are run
+      // in the same container, which is created and started on the first use.
+      buildContainers: () =>
+        (buildContainers ??= createBuildContainers([path.resolve(this.closureDir, "..")])),
+    };
+    // The tree shaking is optional, since the modules imported dynamically can't be traced. They
+    // can be kept by the allow-list.
+    const treeShake: TreeShakeOptions | undefined = this.stack.configs["treeShakeDependencies"]
+      ? { allowList: this.stack.configs["treeShakeAllowList"] ?? [] }
+      : undefined;
+
+    // Find the modules of all the closures first, so the ones shared by them are installed once.
+    const closureModules = await Promise.all(
       closures.map((closure) =>
-        bundleOne(closure, this.stack.platformType, this.importFinder!, this.bundleFilename)
+        this.importFinder!.getImportedModulesForSingleFile(
+          path.resolve(closure.path, this.bundleFilename)
+        )
       )
     );
 
-    async function bundleOne(
-      closure: arch.Closure,
-      platformType: PlatformType,
-      importFinder: ImportFinder,
-      bundleFilename: string
-    ) {
+    // If enabled, the shared modules are installed into a layer, which is attached to the functions
+    // of the closures requiring them. Only AWS Lambda supports the layers.
+    const layersBaseDir = path.resolve(this.closureDir, "..", "layers");
+    const sharedModules =
+      installPkg &&
+      platformType === PlatformType.AWS &&
+      this.stack.configs["sharedDependencyLayer"] === true
+        ? LayerUtils.findSharedModules(closureModules)
+        : [];
+    let layerDir: string | undefined;
+
+    try {
+      if (sharedModules.length > 0) {
+        const layerName = LayerUtils.getLayerDirName(
+          runtime,
+          targetArch,
+          platformType,
+          sharedModules
+        );
+        layerDir = path.resolve(layersBaseDir, layerName);
+        await fs.ensureDir(layerDir);
+
+        const report = await bundleModules(
+          runtime,
+          targetPlatform,
+          targetArch,
+          sharedModules,
+          layerDir,
+          path.join(layerDir, LayerUtils.LAYER_SITE_PACKAGES_DIR),
+          { ...bundleOptions }
+        );
+        printReport("the shared layer", report);
+      }
+      await LayerUtils.removeStaleLayers(layersBaseDir, layerDir ? [layerDir] : []);
+
+      const bundled = await Promise.all(
+        closures.map((closure, idx) =>
+          bundleOne(closure, closureModules[idx], this.bundleFilename)
+        )
+      );
+      const unchanged = bundled.filter((done) => !done).length;
+      if (unchanged > 0) {
+        console.log(`Reused the bundles of ${unchanged} unchanged closures.`);
+      }
+    } finally {
+      await (await buildContainers)?.stopAll();
+    }
+
+    /**
+     * Bundle the closure, unless its inputs are the same as the last time.
+     * @returns Whether the closure is bundled.
+     */
+    async function bundleOne(closure: arch.Closure, modules: Module[], bundleFilename: string) {
       const destBaseDir = path.resolve(closure.path, "site-packages");
       const closureFile = path.resolve(closure.path, bundleFilename);
-      const modules = await importFinder!.getImportedModulesForSingleFile(closureFile);
+
+      // The shared modules are left to the layer.
+      const ownModules = modules.filter((m) => !LayerUtils.isShared(m, sharedModules));
+      const layerDirs = layerDir && ownModules.length < modules.length ? [layerDir] : [];
+
+      const inputsHash = await BundleManifestUtils.hashBundleInputs(closureFile, ownModules, [
+        runtime,
+        targetPlatform,
+        targetArch,
+        bundleOptions.platform,
+        bundleOptions.install,
+        bundleOptions.compile,
+        treeShake,
+        layerDirs,
+      ]);
+      if (inputsHash && (await BundleManifestUtils.isUpToDate(closure.path, inputsHash))) {
+        return false;
+      }
+      await BundleManifestUtils.removeBundleManifest(closure.path);
 
       // The process of bundling may eliminate some files that were previously there. Therefore, we
       // tidy up the  folder, leaving only the entrypoint file and the directory that stores the
@@ -341,19 +449,56 @@ export default class PyrightDeducer extends core.Deducer {
         }
       }
 
-      // TODO: Make the Python version and architecture configurable. These values will be used in
-      // multiple places, including the Deducer and the infrastructure SDK. The former determines
-      // the Python version and architecture for bundling dependencies, while the latter sets the
-      // cloud runtime environment.
-      await bundleModules(runtime, targetPlatform, targetArch, modules, closure.path, destBaseDir, {
-        install: installPkg,
-        slim: true,
-        // By default, we'll delete the `dist-info` directory, but LangChain needs it, so we'll just
-        // delete the `.pyc` and `__pycache__` files.
-        uselessFilesPatterns: ["**/*.pyc", "**/__pycache__"],
-        cache: true,
-        platform: platformType,
-      });
+      if (layerDirs.length > 0) {
+        await LayerUtils.dumpLayerManifest(closure.path, layerDirs);
+      }
+
+      const report = await bundleModules(
+        runtime,
+        targetPlatform,
+        targetArch,
+        ownModules,
+        closure.path,
+        destBaseDir,
+        {
+          ...bundleOptions,
+          // The modules imported from the layers are traced through the layers.
+          treeShake: treeShake && {
+            ...treeShake,
+            extraPaths: layerDirs.map((dir) => path.join(dir, LayerUtils.LAYER_SITE_PACKAGES_DIR)),
+          },
+        }
+      );
+      printReport(`'${closure.id}'`, report);
+
+      if (inputsHash) {
+        await BundleManifestUtils.dumpBundleManifest(closure.path, inputsHash);
+      }
+      return true;
+    }
+
+    function printReport(target: string, report: BundleReport) {
+      if (!process.env.DEBUG) {
+        return;
+      }
+
+      const bytecode = report.bytecode;
+      if (bytecode) {
+        console.log(
+          `Precompiled ${bytecode.files} Python modules of ${target} for ${runtime}, sparing each cold start up to ${bytecode.seconds.toFixed(2)}s of compilation.`
+        );
+      }
+      const treeShakeReport = report.treeShake;
+      if (treeShakeReport) {
+        const toMB = (bytes: number) => (bytes / 1024 / 1024).toFixed(2);
+        console.log(
+          `Tree shaking removed ${treeShakeReport.removedFiles} of ${treeShakeReport.totalFiles} files, ${toMB(treeShakeReport.removedBytes)} of ${toMB(treeShakeReport.totalBytes)} MB, from the dependencies of ${target}.`
+        );
+      }
+      const timings = Object.entries(report.timings)
+        .map(([phase, seconds]) => `${phase} ${seconds.toFixed(2)}s`)
+        .join(", ");
+      console.log(`Bundled the dependencies of ${target}: ${timings || "nothing to do"}.`);
     }
   }
 }
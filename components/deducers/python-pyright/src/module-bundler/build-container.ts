@@ -0,0 +1,167 @@
+import * as os from "os";
+import * as path from "path";
+import * as fs from "fs-extra";
+import { spawnSync } from "child_process";
+import * as CmdUtils from "./command-utils";
+
+/**
+ * The label of the build containers, whose value is the host and the process that started them, so
+ * the containers left by a killed process can be found and removed.
+ */
+const CONTAINER_LABEL = "dev.plutolang.build-container";
+
+/**
+ * The long-lived build containers, one for each image, i.e. each runtime and architecture. A
+ * container is started on its first use, and the commands are run in it by `docker exec`, instead
+ * of starting a container for each of them. The containers are stopped by `stopAll`, once all the
+ * bundlings are done.
+ *
+ * The host directories are bound into the containers when they're started, so only the paths in
+ * them can be used by the commands.
+ *
+ * If the process exits before `stopAll`, e.g. on Ctrl+C or a crash, the containers are removed by
+ * an exit handler. The ones left by a killed process are removed when the next containers start.
+ */
+export class BuildContainers {
+  private readonly mounts: readonly [string, string][];
+  private readonly containers: Map<string, Promise<string>> = new Map();
+  private readonly startedIds: Set<string> = new Set();
+  private readonly exitHandler = () => this.removeStartedSync();
+  private reaped?: Promise<void>;
+
+  constructor(hostDirs: readonly string[]) {
+    this.mounts = hostDirs.map((dir, idx) => [path.resolve(dir), `/var/pluto/mount${idx}`]);
+  }
+
+  /**
+   * Get the path in the containers of the host path.
+   * @returns The path, or undefined if the host path isn't bound into the containers.
+   */
+  public toContainerPath(hostPath: string): string | undefined {
+    const resolved = path.resolve(hostPath);
+    for (const [hostDir, containerDir] of this.mounts) {
+      const relative = path.relative(hostDir, resolved);
+      if (relative === "" || (!relative.startsWith("..") && !path.isAbsolute(relative))) {
+        return path.posix.join(containerDir, ...relative.split(path.sep));
+      }
+    }
+    return;
+  }
+
+  /**
+   * Run the commands in the container of the image, starting it if it's not started yet.
+   * @returns The output of the commands.
+   */
+  public async exec(imageUri: string, commands: string[][]): Promise<string> {
+    const containerId = await this.start(imageUri);
+    const args = ["exec", containerId, ...CmdUtils.mergeCommands(commands)];
+    return await CmdUtils.runCommand("docker", args);
+  }
+
+  public async stopAll() {
+    const containers = await Promise.allSettled(this.containers.values());
+    this.containers.clear();
+    for (const container of containers) {
+      if (container.status === "fulfilled") {
+        // The container is removed once stopped, since it's started with `--rm`.
+        await CmdUtils.runCommand("docker", ["rm", "--force", container.value]).catch(() => {});
+        this.startedIds.delete(container.value);
+      }
+    }
+    process.off("exit", this.exitHandler);
+  }
+
+  private start(imageUri: string): Promise<string> {
+    let container = this.containers.get(imageUri);
+    if (container === undefined) {
+      container = (async () => {
+        this.reaped ??= reapStaleContainers();
+        await this.reaped;
+
+        const args = ["run", "--detach", "--rm", "--label", `${CONTAINER_LABEL}=${ownerLabel()}`];
+        for (const [hostDir, containerDir] of this.mounts) {
+          // Create the directory, otherwise it'd be created by Docker and owned by root.
+          await fs.ensureDir(hostDir);
+          args.push("-v", `${hostDir}:${containerDir}:z`);
+        }
+        // Keep the container running until it's removed.
+        args.push(imageUri, "tail", "-f", "/dev/null");
+        const containerId = (await CmdUtils.runCommand("docker", args)).trim();
+
+        if (this.startedIds.size === 0) {
+          process.on("exit", this.exitHandler);
+        }
+        this.startedIds.add(containerId);
+        return containerId;
+      })();
+      this.containers.set(imageUri, container);
+    }
+    return container;
+  }
+
+  /**
+   * Remove the started containers synchronously, since nothing asynchronous runs once the process
+   * is exiting.
+   */
+  private removeStartedSync() {
+    if (this.startedIds.size > 0) {
+      spawnSync("docker", ["rm", "--force", ...this.startedIds], { stdio: "ignore" });
+      this.startedIds.clear();
+    }
+  }
+}
+
+function ownerLabel(pid: number = process.pid): string {
+  return `${os.hostname()}:${pid}`;
+}
+
+/**
+ * Remove the build containers started on this host by the processes that are no longer running,
+ * e.g. killed before they could remove their containers.
+ */
+async function reapStaleContainers() {
+  let output: string;
+  try {
+    output = await CmdUtils.runCommand("docker", [
+      "ps",
+      "--all",
+      "--filter",
+      `label=${CONTAINER_LABEL}`,
+      "--format",
+      `{{.ID}} {{.Label "${CONTAINER_LABEL}"}}`,
+    ]);
+  } catch {
+    // Docker isn't available, the start of the container will report it.
+    return;
+  }
+
+  const prefix = `${os.hostname()}:`;
+  const stale: string[] = [];
+  for (const line of output.split("\n")) {
+    const [containerId, owner] = line.trim().split(" ");
+    if (!containerId || !owner?.startsWith(prefix)) {
+      continue;
+    }
+    const pid = parseInt(owner.slice(prefix.length));
+    if (pid !== process.pid && !isProcessAlive(pid)) {
+      stale.push(containerId);
+    }
+  }
+  if (stale.length > 0) {
+    await CmdUtils.runCommand("docker", ["rm", "--force", ...stale]).catch(() => {});
+  }
+}
+
+function isProcessAlive(pid: number): boolean {
+  if (!(pid > 0)) {
+    return false;
+  }
+  try {
+    // The signal 0 only checks whether the process exists.
+    process.kill(pid, 0);
+    return true;
+  } catch (e: any) {
+    // EPERM means the process exists but belongs to another user.
+    return e.code === "EPERM";
+  }
+}
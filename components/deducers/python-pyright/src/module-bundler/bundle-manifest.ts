@@ -0,0 +1,130 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import { createHash, Hash } from "crypto";
+import { BUNDLE_MANIFEST_FILE } from "@plutolang/base/closure";
+import { runCommand } from "./command-utils";
+import { InstalledModule, Module, ModuleType } from "./types";
+
+export interface BundleManifest {
+  readonly hash: string;
+}
+
+/**
+ * Hash the inputs of a bundle: the content of the entrypoint, the content of the local modules, the
+ * installed modules with their versions, and any other settings affecting the bundle.
+ *
+ * The installed modules without a version take the version installed in the local Python
+ * environment. If it isn't installed there, the inputs can't be identified, since the module is
+ * installed at whatever version pip resolves.
+ *
+ * @returns The hash, or undefined if the inputs can't be identified.
+ */
+export async function hashBundleInputs(
+  entrypoint: string,
+  modules: readonly Module[],
+  settings: unknown
+): Promise<string | undefined> {
+  const unversioned = modules
+    .filter((m): m is InstalledModule => m.type === ModuleType.Installed && !m.version)
+    .map((m) => m.name);
+  const localVersions = await getLocalVersions(unversioned);
+  if (localVersions.size < new Set(unversioned).size) {
+    return;
+  }
+
+  const hash = createHash("sha256");
+  hash.update(JSON.stringify(settings));
+  hash.update(await fs.readFile(entrypoint));
+
+  const sorted = [...modules].sort((a, b) => a.name.localeCompare(b.name));
+  for (const module of sorted) {
+    if (module.type === ModuleType.Installed) {
+      const version = module.version || localVersions.get(module.name);
+      hash.update(`installed:${module.name}==${version}\n`);
+    } else {
+      hash.update(`local:${module.name}\n`);
+      await hashPath(hash, module.modulePath);
+    }
+  }
+  return hash.digest("hex");
+}
+
+const GET_VERSIONS_SCRIPT = `
+import importlib.metadata
+import json
+import sys
+
+versions = {}
+for name in sys.argv[1:]:
+    try:
+        versions[name] = importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        pass
+print(json.dumps(versions))
+`;
+
+/**
+ * Get the versions of the distributions installed in the local Python environment.
+ *
+ * @returns The versions keyed by the names of the distributions, without the ones not installed.
+ */
+export async function getLocalVersions(names: readonly string[]): Promise<Map<string, string>> {
+  if (names.length === 0) {
+    return new Map();
+  }
+
+  try {
+    const output = await runCommand("python3", ["-c", GET_VERSIONS_SCRIPT, ...names]);
+    return new Map(Object.entries(JSON.parse(output)));
+  } catch (e) {
+    if (process.env.DEBUG) {
+      console.warn("Failed to get the versions of the local Python distributions.", e);
+    }
+    return new Map();
+  }
+}
+
+/**
+ * Check if the bundle in the closure directory was built from the same inputs.
+ */
+export async function isUpToDate(closureDir: string, hash: string): Promise<boolean> {
+  const manifestPath = path.join(closureDir, BUNDLE_MANIFEST_FILE);
+  if (!(await fs.pathExists(manifestPath))) {
+    return false;
+  }
+  const manifest: BundleManifest = await fs.readJson(manifestPath);
+  return manifest.hash === hash;
+}
+
+/**
+ * Record the hash of the inputs once the bundle is built.
+ */
+export async function dumpBundleManifest(closureDir: string, hash: string) {
+  const manifest: BundleManifest = { hash };
+  await fs.writeFile(path.join(closureDir, BUNDLE_MANIFEST_FILE), JSON.stringify(manifest));
+}
+
+/**
+ * Remove the manifest before the bundle is rebuilt, so an interrupted bundling is never taken as up
+ * to date.
+ */
+export async function removeBundleManifest(closureDir: string) {
+  await fs.remove(path.join(closureDir, BUNDLE_MANIFEST_FILE));
+}
+
+async function hashPath(hash: Hash, filepath: string, relative = "") {
+  const stat = await fs.stat(filepath);
+  if (stat.isFile()) {
+    hash.update(`file:${relative}\n`);
+    hash.update(await fs.readFile(filepath));
+    return;
+  }
+
+  const entries = (await fs.readdir(filepath)).sort();
+  for (const entry of entries) {
+    if (entry === "__pycache__") {
+      continue;
+    }
+    await hashPath(hash, path.join(filepath, entry), path.posix.join(relative, entry));
+  }
+}
@@ -1,15 +1,24 @@
 import * as path from "path";
 import * as fs from "fs-extra";
+import { performance } from "perf_hooks";
 import { PlatformType } from "@plutolang/base";
 import { systemConfigDir } from "@plutolang/base/utils";
 import * as SlimUtils from "./slim";
 import * as AwsUtils from "./aws-utils";
 import * as CmdUtils from "./command-utils";
 import * as MetadataUtils from "./metadata";
+import * as BytecodeUtils from "./bytecode";
+import * as StoreUtils from "./store";
+import * as TreeShaker from "./tree-shaker";
+import { Limiter } from "./limiter";
+import { BuildContainers } from "./build-container";
 import { getIndexUrls, IndexUrl } from "./index-url";
 import { getCurrentArch, getCurrentPlatform } from "../common/os-utils";
 import { Architecture, InstalledModule, Module, ModuleType, Runtime } from "./types";
 
+/** The directory in the Docker container that the pip cache of the host is bound to. */
+const DOCKER_CACHE_DIR = "/var/pipCache";
+
 export interface BundleModulesOptions {
   /**
    * Whether to install the modules. If false, the installation is skipped. @default true
@@ -20,6 +29,52 @@ export interface BundleModulesOptions {
   slim?: boolean;
   uselessFilesPatterns?: string[];
   cache?: boolean;
+  /**
+   * Whether to precompile the modules into the bytecode of the runtime, so the cold starts don't
+   * compile them on every import. The bytecode isn't removed by the slimming. @default false
+   */
+  compile?: boolean;
+  /**
+   * The limiter of the pip and Docker processes, shared by the concurrent bundlings to bound the
+   * number of processes. If not set, the processes aren't limited.
+   */
+  limiter?: Limiter;
+  /**
+   * Whether to remove the modules and the data files of the site-packages that can't be imported by
+   * the bundle. The site-packages is assembled again on every bundling then, since the modules
+   * reachable depend on the code of the bundle. @default undefined, no tree shaking
+   */
+  treeShake?: TreeShaker.TreeShakeOptions;
+  /**
+   * Get the long-lived build containers shared by the bundlings, which the commands are run in by
+   * `docker exec` if Docker is used. It's only called once a command runs in Docker, so the
+   * containers can be created on the first use, e.g. by `createBuildContainers`. If not set, or if
+   * the paths aren't bound into the containers, a container is started for each of the commands.
+   */
+  buildContainers?: () => Promise<BuildContainers>;
+}
+
+/**
+ * Create the build containers, with the workspace directories, the store and the pip cache bound
+ * into them. The containers are started on their first use, and have to be stopped by `stopAll`.
+ * @param workspaceDirs The directories containing the bundles.
+ */
+export async function createBuildContainers(workspaceDirs: string[]): Promise<BuildContainers> {
+  return new BuildContainers([...workspaceDirs, StoreUtils.getStoreRootDir(), await getCacheDir()]);
+}
+
+export interface BundleReport {
+  /** The report of the precompiled bytecode, if the compilation is enabled. */
+  bytecode?: BytecodeUtils.BytecodeReport;
+  /** The report of the tree shaking, if it's enabled. */
+  treeShake?: TreeShaker.TreeShakeReport;
+  /**
+   * The seconds spent in each phase of the bundling: `queue` waiting for the limiter, `resolve`
+   * resolving the requirements, `install` installing the distributions missing from the store,
+   * `store` moving them into the store, `link` linking the distributions into the site-packages,
+   * and `compile` compiling the local modules.
+   */
+  timings: Record<string, number>;
 }
 
 export async function bundleModules(
@@ -30,7 +85,7 @@ export async function bundleModules(
   bundleDir: string,
   sitePackagesDir: string,
   options: BundleModulesOptions = {}
-): Promise<void> {
+): Promise<BundleReport> {
   if (getCurrentPlatform() !== platform || getCurrentArch() !== architecture) {
     // In this case, the user is trying to bundle the modules for a different platform or
     // architecture. We need to check if the Docker can meet the requirement.
@@ -67,26 +122,68 @@ export async function bundleModules(
   await copyLocalModules(modules, bundleDir);
   await generateRequirements(modules, bundleDir);
 
-  const currentMeta = { runtime, architecture, platform: options.platform, modules, done: false };
-  if (isCompleted(sitePackagesDir, currentMeta)) {
-    // If the installation is already done, skip it.
-    return;
-  }
-
-  if (options.install !== false) {
+  const currentMeta = {
+    runtime,
+    architecture,
+    platform: options.platform,
+    modules,
+    compile: !!options.compile,
+    done: false,
+  };
+  const report: BundleReport = { timings: {} };
+  // If the installation is already done, skip it.
+  const installed = !options.treeShake && isCompleted(sitePackagesDir, currentMeta);
+  let installedBytecode: BytecodeUtils.BytecodeReport | undefined;
+  if (!installed && options.install !== false) {
     // Clean the target folder and dump the metadata file.
     fs.removeSync(sitePackagesDir);
     fs.ensureDirSync(sitePackagesDir);
     MetadataUtils.dumpMetaFile(sitePackagesDir, currentMeta);
 
     // Install the installable modules.
-    await installModules(modules, sitePackagesDir, runtime, architecture, options);
+    installedBytecode = await installModules(
+      modules,
+      sitePackagesDir,
+      runtime,
+      platform,
+      architecture,
+      options,
+      report.timings
+    );
 
     // Mark the installation as done. This is used to skip the installation if the metadata hasn't
     // changed.
     currentMeta.done = true;
     MetadataUtils.dumpMetaFile(sitePackagesDir, currentMeta);
+
+    if (options.treeShake && path.resolve(sitePackagesDir) !== path.resolve(bundleDir)) {
+      const treeShakeOptions = options.treeShake;
+      report.treeShake = await timed(report.timings, "treeShake", () =>
+        TreeShaker.treeShake(path.resolve(bundleDir), path.resolve(sitePackagesDir), {
+          ...treeShakeOptions,
+          extraPaths: treeShakeOptions.extraPaths?.map((p) => path.resolve(p)),
+        })
+      );
+    }
+  }
+
+  if (options.compile) {
+    // The installed modules are compiled along with their installation, only the local modules and
+    // the entrypoint are left.
+    const localBytecode = await compileLocalModules(
+      runtime,
+      architecture,
+      bundleDir,
+      sitePackagesDir,
+      options,
+      report.timings
+    );
+    report.bytecode = {
+      files: localBytecode.files + (installedBytecode?.files ?? 0),
+      seconds: localBytecode.seconds + (installedBytecode?.seconds ?? 0),
+    };
   }
+  return report;
 }
 
 async function copyLocalModules(modules: readonly Module[], bundleDir: string) {
@@ -102,52 +199,332 @@ async function copyLocalModules(modules: readonly Module[], bundleDir: string) {
   }
 }
 
+/**
+ * Install the modules into the target folder from the store. The requirements are resolved to the
+ * distributions first, only the ones missing from the store are installed, and all of them are
+ * linked into the target folder. If the requirements can't be resolved, e.g. by an old pip without
+ * the installation report, they're installed into the target folder directly.
+ *
+ * @returns The report of the bytecode compiled for the newly installed distributions.
+ */
 async function installModules(
   modules: readonly Module[],
   targetFolder: string,
   runtime: Runtime,
+  platform: typeof process.platform,
   architecture: Architecture,
-  options: BundleModulesOptions
-) {
+  options: BundleModulesOptions,
+  timings: Record<string, number>
+): Promise<BytecodeUtils.BytecodeReport | undefined> {
   // Generate requirements.txt file in the target folder.
   await generateRequirements(modules, targetFolder);
+  if (!modules.some((m) => m.type === ModuleType.Installed)) {
+    return;
+  }
 
+  const storeDir = StoreUtils.getStoreDir(runtime, platform, architecture, {
+    platformType: options.platform,
+    compile: options.compile,
+    slim: options.slim,
+  });
+  await fs.ensureDir(storeDir);
+  // The staging folder is next to the store, so the installed files are moved into the store
+  // without being copied.
+  const stagingDir = await fs.mkdtemp(path.join(path.dirname(storeDir), ".staging-"));
   const hostCacheDir = await getCacheDir();
-  const cacheDir = options.dockerPip ? "/var/pipCache" : hostCacheDir;
-  const workDir = options.dockerPip ? "/var/task" : targetFolder;
+  const docker = options.dockerPip
+    ? await getDockerPaths(stagingDir, hostCacheDir, options)
+    : undefined;
+  const workDir = docker?.workDir ?? stagingDir;
+  const cacheDir = docker?.cacheDir ?? hostCacheDir;
+  const run = (phase: string, commands: string[][]) =>
+    runInstallCommands(commands, stagingDir, hostCacheDir, runtime, architecture, options, {
+      timings,
+      phase,
+    });
 
-  let commands: string[][] = [];
-  commands.push(
-    getPipInstallCommand(runtime, workDir, `${workDir}/requirements.txt`, !!options.cache, cacheDir)
+  try {
+    await fs.copy(path.join(targetFolder, "requirements.txt"), `${stagingDir}/requirements.txt`);
+
+    let dists: StoreUtils.Distribution[];
+    try {
+      await run("resolve", [getPipResolveCommand(runtime, workDir, !!options.cache, cacheDir)]);
+      dists = await StoreUtils.parseResolveReport(`${stagingDir}/report.json`);
+    } catch (e) {
+      if (process.env.DEBUG) {
+        console.warn("Failed to resolve the requirements, installing them directly.", e);
+      }
+      return await installDirectly(
+        targetFolder,
+        hostCacheDir,
+        runtime,
+        architecture,
+        options,
+        timings
+      );
+    }
+
+    let bytecode: BytecodeUtils.BytecodeReport | undefined;
+    const missing = dists.filter((dist) => !StoreUtils.hasDistribution(storeDir, dist));
+    if (missing.length > 0) {
+      // The dependencies are resolved already, each of the missing distributions is installed on
+      // its own.
+      await generatePinnedRequirements(missing, `${stagingDir}/missing.txt`);
+      const requirementsPath = `${workDir}/missing.txt`;
+      const commands = getInstallCommands(runtime, workDir, requirementsPath, cacheDir, options, [
+        "--no-deps",
+      ]);
+      const output = await run("install", commands);
+      bytecode = options.compile ? BytecodeUtils.parseCompileOutput(output) : undefined;
+
+      await timed(timings, "store", () => StoreUtils.storeDistributions(stagingDir, storeDir));
+    }
+
+    await timed(timings, "link", () =>
+      StoreUtils.linkDistributions(storeDir, dists, targetFolder)
+    );
+
+    if (options.slim) {
+      // If slimming is enabled, remove the useless files, including the dist-info, and the *.pyc
+      // and __pycache__ unless the bytecode is precompiled. The linked files are only removed, so
+      // the store isn't affected.
+      SlimUtils.removeUselessFiles(targetFolder, options.uselessFilesPatterns, !!options.compile);
+    }
+    return bytecode;
+  } finally {
+    await fs.remove(stagingDir);
+  }
+}
+
+/**
+ * Install the requirements of the target folder into it directly, bypassing the store.
+ */
+async function installDirectly(
+  targetFolder: string,
+  hostCacheDir: string,
+  runtime: Runtime,
+  architecture: Architecture,
+  options: BundleModulesOptions,
+  timings: Record<string, number>
+): Promise<BytecodeUtils.BytecodeReport | undefined> {
+  const docker = options.dockerPip
+    ? await getDockerPaths(targetFolder, hostCacheDir, options)
+    : undefined;
+  const workDir = docker?.workDir ?? targetFolder;
+  const cacheDir = docker?.cacheDir ?? hostCacheDir;
+  const requirementsPath = `${workDir}/requirements.txt`;
+  const commands = getInstallCommands(runtime, workDir, requirementsPath, cacheDir, options);
+  const output = await runInstallCommands(
+    commands,
+    targetFolder,
+    hostCacheDir,
+    runtime,
+    architecture,
+    options,
+    { timings, phase: "install" }
   );
 
+  if (options.slim) {
+    // If slimming is enabled, remove the useless files, including the dist-info, and the *.pyc and
+    // __pycache__ unless the bytecode is precompiled.
+    SlimUtils.removeUselessFiles(targetFolder, options.uselessFilesPatterns, !!options.compile);
+  }
+
+  // The compilation is the last command, its report is the last line of the output.
+  return options.compile ? BytecodeUtils.parseCompileOutput(output) : undefined;
+}
+
+/**
+ * Construct the commands installing the requirements into the work directory, stripping the shared
+ * libraries and compiling the bytecode if enabled.
+ */
+function getInstallCommands(
+  runtime: Runtime,
+  workDir: string,
+  requirementsPath: string,
+  cacheDir: string,
+  options: BundleModulesOptions,
+  extraArgs: string[] = []
+): string[][] {
+  const commands: string[][] = [];
+  const pipCmd = getPipInstallCommand(
+    runtime,
+    workDir,
+    requirementsPath,
+    !!options.cache,
+    cacheDir
+  );
+  pipCmd.push(...extraArgs);
+  if (options.compile) {
+    // The bytecode compiled by pip is checked against the timestamps of the sources, which aren't
+    // kept by the zip archives. It's compiled with the unchecked hashes afterwards instead.
+    pipCmd.push("--no-compile");
+  }
+  commands.push(pipCmd);
+
   if (options.slim) {
     // If slimming is enabled, strip the ".so" files to reduce the size.
     commands.push(SlimUtils.getStripCommand(workDir));
   }
 
+  if (options.compile) {
+    // Compile with the runtime of the target, which is the one in the container if Docker is used.
+    commands.push(BytecodeUtils.getCompileCommand(runtime, workDir));
+  }
+  return commands;
+}
+
+interface DockerPaths {
+  readonly workDir: string;
+  readonly cacheDir: string;
+  /** Whether the paths are the ones in the build containers. */
+  readonly warm: boolean;
+}
+
+/**
+ * Get the paths in the Docker container of the host folder and the pip cache. They're the paths
+ * in the build containers if both are bound into them, otherwise the paths they're bound to in a
+ * container started for the commands.
+ */
+async function getDockerPaths(
+  hostFolder: string,
+  hostCacheDir: string | undefined,
+  options: BundleModulesOptions
+): Promise<DockerPaths> {
+  const containers = await options.buildContainers?.();
+  const workDir = containers?.toContainerPath(hostFolder);
+  const cacheDir = hostCacheDir ? containers?.toContainerPath(hostCacheDir) : DOCKER_CACHE_DIR;
+  if (workDir && cacheDir) {
+    return { workDir, cacheDir, warm: true };
+  }
+  return { workDir: "/var/task", cacheDir: DOCKER_CACHE_DIR, warm: false };
+}
+
+/**
+ * Run the commands, inside a Docker container if Docker is enabled. The commands are run in the
+ * build container if the paths are bound into it, otherwise in a container started for them with
+ * the host folder bound to `/var/task`. The commands wait for the limiter, if any, and the time
+ * they take is added to the phase.
+ *
+ * @returns The output of the last command.
+ */
+async function runInstallCommands(
+  commands: string[][],
+  hostFolder: string,
+  hostCacheDir: string | undefined,
+  runtime: Runtime,
+  architecture: Architecture,
+  options: BundleModulesOptions,
+  timing: Timing
+): Promise<string> {
   if (options.dockerPip) {
-    // If Docker is enabled, run the commands inside a Docker container.
-    const bindPaths: [string, string][] = [[targetFolder, workDir]];
-    if (options.cache) {
-      bindPaths.push([hostCacheDir, cacheDir]);
+    const imageUri = getBaseImageUri(runtime, architecture, options.platform);
+    if ((await getDockerPaths(hostFolder, hostCacheDir, options)).warm) {
+      const containers = await options.buildContainers!();
+      return await limit(options.limiter, timing, () => containers.exec(imageUri, commands));
+    }
+
+    // Otherwise, run the commands inside a Docker container started for them.
+    const bindPaths: [string, string][] = [[hostFolder, "/var/task"]];
+    if (options.cache && hostCacheDir) {
+      bindPaths.push([hostCacheDir, DOCKER_CACHE_DIR]);
     }
 
-    const imageUri = getBaseImageUri(runtime, architecture, options.platform);
     const dockerCmd = getDockerRunCommand(imageUri, bindPaths, commands);
     commands = [dockerCmd]; // Replace the commands with the Docker run command.
   }
 
-  // Run the commands.
-  for (const cmd of commands) {
-    await CmdUtils.runCommand(cmd[0], cmd.slice(1));
+  return await limit(options.limiter, timing, async () => {
+    // Run the commands.
+    let output = "";
+    for (const cmd of commands) {
+      output = await CmdUtils.runCommand(cmd[0], cmd.slice(1));
+    }
+    return output;
+  });
+}
+
+/**
+ * Compile the local modules and the entrypoint in the bundle directory, skipping the installed
+ * modules. The bytecode only depends on the Python version, so it's compiled on the host if the
+ * runtime is installed, otherwise in the Docker container.
+ */
+async function compileLocalModules(
+  runtime: Runtime,
+  architecture: Architecture,
+  bundleDir: string,
+  sitePackagesDir: string,
+  options: BundleModulesOptions,
+  timings: Record<string, number>
+): Promise<BytecodeUtils.BytecodeReport> {
+  const onHost = await CmdUtils.existCommand(runtime);
+  const workDir = onHost
+    ? bundleDir
+    : (await getDockerPaths(bundleDir, undefined, options)).workDir;
+
+  let exclude: string | undefined;
+  const relativeSitePackages = path.relative(bundleDir, sitePackagesDir);
+  if (relativeSitePackages !== "" && !relativeSitePackages.startsWith("..")) {
+    const join = onHost ? path.join : path.posix.join;
+    exclude = `^${escapeRegExp(join(workDir, relativeSitePackages))}[/\\\\]`;
   }
 
-  if (options.slim) {
-    // If slimming is enabled, remove the useless files, including the *.pyc, dist-info,
-    // __pycache__, and etc.
-    SlimUtils.removeUselessFiles(targetFolder, options.uselessFilesPatterns);
+  const cmd = BytecodeUtils.getCompileCommand(runtime, workDir, exclude);
+  const output = await runInstallCommands(
+    [cmd],
+    bundleDir,
+    /* hostCacheDir */ undefined,
+    runtime,
+    architecture,
+    { ...options, dockerPip: !onHost },
+    { timings, phase: "compile" }
+  );
+  return BytecodeUtils.parseCompileOutput(output);
+}
+
+interface Timing {
+  readonly timings: Record<string, number>;
+  readonly phase: string;
+}
+
+/**
+ * Run the function once the limiter allows. The time spent waiting is added to the `queue` phase,
+ * and the time spent running to the given phase.
+ */
+async function limit<T>(
+  limiter: Limiter | undefined,
+  timing: Timing,
+  fn: () => Promise<T>
+): Promise<T> {
+  if (!limiter) {
+    return await timed(timing.timings, timing.phase, fn);
   }
+  const queuedAt = performance.now();
+  return await limiter.run(() => {
+    addTiming(timing.timings, "queue", queuedAt);
+    return timed(timing.timings, timing.phase, fn);
+  });
+}
+
+async function timed<T>(
+  timings: Record<string, number>,
+  phase: string,
+  fn: () => Promise<T>
+): Promise<T> {
+  const start = performance.now();
+  try {
+    return await fn();
+  } finally {
+    addTiming(timings, phase, start);
+  }
+}
+
+function addTiming(timings: Record<string, number>, phase: string, start: number) {
+  timings[phase] = (timings[phase] ?? 0) + (performance.now() - start) / 1000;
+}
+
+function escapeRegExp(str: string): string {
+  return str.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
 }
 
 function isCompleted(targetFolder: string, meta: MetadataUtils.Metadata) {
@@ -206,6 +583,26 @@ async function getCacheDir() {
   return cacheDir;
 }
 
+/**
+ * Construct the command resolving the requirements in the work directory to the distributions,
+ * without installing them. The resolution is written to `report.json` in the work directory.
+ */
+function getPipResolveCommand(
+  pythonBin: string,
+  workDir: string,
+  enableCache: boolean,
+  cacheDir: string
+): string[] {
+  const pipCmd = [pythonBin, "-m", "pip", "install", "--dry-run", "--ignore-installed", "--quiet"];
+  pipCmd.push("--report", `${workDir}/report.json`, "-r", `${workDir}/requirements.txt`);
+  if (enableCache) {
+    pipCmd.push("--cache-dir", cacheDir);
+  } else {
+    pipCmd.push("--no-cache-dir");
+  }
+  return pipCmd;
+}
+
 function getPipInstallCommand(
   pythonBin: string,
   targetFolder: string,
@@ -237,12 +634,7 @@ function getPipInstallCommand(
  * Generate a requirements.txt file in the target folder.
  */
 async function generateRequirements(modules: readonly Module[], targetFolder: string) {
-  const indexUrls = await getIndexUrls();
-  const indexUrlLines = indexUrls
-    .map((indexUrl) => {
-      return indexUrl.primary ? `--index-url ${indexUrl.url}` : `--extra-index-url ${indexUrl.url}`;
-    })
-    .join("\n");
+  const indexUrlLines = await getIndexUrlLines();
 
   const requiredModules = modules
     .filter<InstalledModule>((m): m is InstalledModule => ModuleType.Installed === m.type)
@@ -256,3 +648,24 @@ async function generateRequirements(modules: readonly Module[], targetFolder: st
 
   await fs.writeFile(`${targetFolder}/requirements.txt`, `${indexUrlLines}\n${requiredModules}`);
 }
+
+/**
+ * Generate a requirements file pinning the distributions to their resolved versions.
+ */
+async function generatePinnedRequirements(
+  dists: readonly StoreUtils.Distribution[],
+  filepath: string
+) {
+  const indexUrlLines = await getIndexUrlLines();
+  const pinnedDists = dists.map((dist) => `${dist.name}==${dist.version}`).join("\n");
+  await fs.writeFile(filepath, `${indexUrlLines}\n${pinnedDists}`);
+}
+
+async function getIndexUrlLines() {
+  const indexUrls = await getIndexUrls();
+  return indexUrls
+    .map((indexUrl) => {
+      return indexUrl.primary ? `--index-url ${indexUrl.url}` : `--extra-index-url ${indexUrl.url}`;
+    })
+    .join("\n");
+}
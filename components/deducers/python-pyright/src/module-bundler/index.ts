@@ -1,3 +1,11 @@
-export { bundleModules, BundleModulesOptions } from "./bundle-module";
+export {
+  bundleModules,
+  BundleModulesOptions,
+  BundleReport,
+  createBuildContainers,
+} from "./bundle-module";
+export { BuildContainers } from "./build-container";
+export { Limiter } from "./limiter";
+export { TreeShakeOptions, TreeShakeReport } from "./tree-shaker";
 export * from "./types";
 export * from "./module-set";
@@ -0,0 +1,93 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import { createHash } from "crypto";
+import { PlatformType } from "@plutolang/base";
+import { LAYER_MANIFEST_FILE } from "@plutolang/base/closure";
+import { Architecture, InstalledModule, Module, ModuleType, Runtime } from "./types";
+
+/**
+ * The directory in a layer directory that the modules are installed to. The layers are extracted
+ * to `/opt` on AWS Lambda, and `/opt/python` is on the system path of the Python runtimes.
+ */
+export const LAYER_SITE_PACKAGES_DIR = "python";
+
+export interface LayerManifest {
+  readonly layers: string[];
+}
+
+/**
+ * Find the installed modules required by at least two of the closures. These are installed once
+ * into a shared layer, instead of into each of the closures.
+ */
+export function findSharedModules(moduleSets: readonly (readonly Module[])[]): InstalledModule[] {
+  const counts = new Map<string, { module: InstalledModule; count: number }>();
+  for (const modules of moduleSets) {
+    const keys = new Set<string>();
+    for (const module of modules) {
+      if (module.type !== ModuleType.Installed) {
+        continue;
+      }
+      const key = moduleKey(module);
+      if (keys.has(key)) {
+        continue;
+      }
+      keys.add(key);
+
+      const entry = counts.get(key) ?? { module, count: 0 };
+      entry.count++;
+      counts.set(key, entry);
+    }
+  }
+
+  return Array.from(counts.values())
+    .filter((entry) => entry.count >= 2)
+    .map((entry) => entry.module)
+    .sort((a, b) => moduleKey(a).localeCompare(moduleKey(b)));
+}
+
+/**
+ * Check if the module is one of the shared modules.
+ */
+export function isShared(module: Module, sharedModules: readonly InstalledModule[]): boolean {
+  return sharedModules.some((shared) => Module.same(shared, module));
+}
+
+/**
+ * Get the name of the directory of a layer. It's derived from the content of the layer, so a layer
+ * is only rebuilt and uploaded again when its modules change.
+ */
+export function getLayerDirName(
+  runtime: Runtime,
+  architecture: Architecture,
+  platform: PlatformType | undefined,
+  modules: readonly InstalledModule[]
+): string {
+  const hash = createHash("sha256");
+  hash.update(JSON.stringify([runtime, architecture, platform, modules.map(moduleKey)]));
+  return hash.digest("hex").slice(0, 16);
+}
+
+/**
+ * Remove the directories of the layers other than the given ones, which were built by the previous
+ * compilations.
+ */
+export async function removeStaleLayers(layersBaseDir: string, keep: readonly string[]) {
+  if (!(await fs.pathExists(layersBaseDir))) {
+    return;
+  }
+  for (const name of await fs.readdir(layersBaseDir)) {
+    const layerDir = path.resolve(layersBaseDir, name);
+    if (!keep.includes(layerDir)) {
+      await fs.remove(layerDir);
+    }
+  }
+}
+
+export async function dumpLayerManifest(closureDir: string, layerDirs: string[]) {
+  const manifest: LayerManifest = { layers: layerDirs };
+  await fs.writeFile(path.join(closureDir, LAYER_MANIFEST_FILE), JSON.stringify(manifest, null, 2));
+}
+
+function moduleKey(module: InstalledModule): string {
+  return module.version ? `${module.name}==${module.version}` : module.name;
+}
@@ -0,0 +1,51 @@
+import * as os from "os";
+
+/**
+ * Limit the number of tasks running at the same time, e.g. the pip processes started by the
+ * bundling of the closures. The tasks beyond the limit wait for a running one to finish.
+ */
+export class Limiter {
+  private running = 0;
+  private readonly waiting: (() => void)[] = [];
+
+  constructor(public readonly concurrency: number = defaultConcurrency()) {
+    if (concurrency < 1) {
+      throw new Error(`The concurrency should be at least 1, but got ${concurrency}.`);
+    }
+  }
+
+  public async run<T>(fn: () => Promise<T>): Promise<T> {
+    await this.acquire();
+    try {
+      return await fn();
+    } finally {
+      this.release();
+    }
+  }
+
+  private async acquire() {
+    if (this.running < this.concurrency) {
+      this.running++;
+      return;
+    }
+    // The slot is handed over by the task releasing it.
+    await new Promise<void>((resolve) => this.waiting.push(resolve));
+  }
+
+  private release() {
+    const next = this.waiting.shift();
+    if (next) {
+      next();
+    } else {
+      this.running--;
+    }
+  }
+}
+
+/**
+ * The installations are mostly bound by the network and the disk, a few of them are enough to keep
+ * both busy.
+ */
+function defaultConcurrency(): number {
+  return Math.max(1, Math.min(4, os.cpus().length));
+}
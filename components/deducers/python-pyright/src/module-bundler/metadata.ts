@@ -8,6 +8,8 @@ export interface Metadata {
   readonly architecture: Architecture;
   readonly platform?: PlatformType;
   readonly modules: readonly Module[];
+  /** Whether the installed modules are precompiled into bytecode. */
+  readonly compile?: boolean;
 
   done: boolean;
 }
@@ -32,7 +34,8 @@ export function sameMetadata(meta1: Metadata, meta2: Metadata, caredType?: Modul
   if (
     meta1.runtime !== meta2.runtime ||
     meta1.architecture !== meta2.architecture ||
-    meta1.platform !== meta2.platform
+    meta1.platform !== meta2.platform ||
+    !!meta1.compile !== !!meta2.compile
   )
     return false;
 
@@ -1,8 +1,14 @@
 import * as fs from "fs-extra";
 import { globSync } from "glob";
 
-export function removeUselessFiles(folderPath: string, patterns?: string[]) {
-  patterns = patterns ?? ["**/*.py[c|o]", "**/__pycache__*", "**/*.dist-info*"];
+const BYTECODE_PATTERNS = ["**/*.py[c|o]", "**/__pycache__*"];
+
+/**
+ * Remove the files matching the patterns from the folder. The default patterns match the bytecode
+ * and the dist-info directories, the bytecode is left out of them if `keepBytecode` is set.
+ */
+export function removeUselessFiles(folderPath: string, patterns?: string[], keepBytecode = false) {
+  patterns = patterns ?? [...(keepBytecode ? [] : BYTECODE_PATTERNS), "**/*.dist-info*"];
   for (const pattern of patterns) {
     for (const file of globSync(`${folderPath}/${pattern}`)) {
       fs.rmSync(file, { recursive: true });
@@ -0,0 +1,205 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import { PlatformType } from "@plutolang/base";
+import { systemConfigDir } from "@plutolang/base/utils";
+import { Architecture, Runtime } from "./types";
+
+/**
+ * A distribution installed by pip, e.g. `pydantic==2.7.1`.
+ */
+export interface Distribution {
+  readonly name: string;
+  readonly version: string;
+}
+
+/**
+ * The options changing the files installed for a distribution, so the distributions installed with
+ * different options are kept in different stores.
+ */
+export interface StoreOptions {
+  readonly platformType?: PlatformType;
+  /** Whether the bytecode is compiled, which adds the `.pyc` files to the distributions. */
+  readonly compile?: boolean;
+  /** Whether the useless files are removed from the bundles the distributions are linked into. */
+  readonly slim?: boolean;
+}
+
+/**
+ * Get the directory of the store holding the distributions installed for the target. The files of
+ * each distribution are kept in a directory of their own, and hard linked into the `site-packages`
+ * of the closures requiring it, so a distribution is installed once for all the closures and all
+ * the compilations.
+ */
+export function getStoreDir(
+  runtime: Runtime,
+  platform: typeof process.platform,
+  architecture: Architecture,
+  options: StoreOptions = {}
+): string {
+  const target = [
+    runtime,
+    platform,
+    architecture,
+    options.platformType ?? "default",
+    options.compile ? "compiled" : "source",
+    options.slim ? "slim" : "full",
+  ].join("-");
+  return path.join(getStoreRootDir(), target);
+}
+
+/**
+ * Get the directory containing the stores of all the targets. It can be changed by the
+ * `PLUTO_PYTHON_STORE_DIR` environment variable, e.g. to isolate the tests from the real store.
+ */
+export function getStoreRootDir(): string {
+  return (
+    process.env["PLUTO_PYTHON_STORE_DIR"] ??
+    path.join(systemConfigDir(), "caches", "pyright-deducer", "store")
+  );
+}
+
+export function hasDistribution(storeDir: string, dist: Distribution): boolean {
+  return fs.existsSync(distributionDir(storeDir, dist));
+}
+
+/**
+ * Parse the installation report of `pip install --dry-run --report`, which lists the distributions
+ * the requirements are resolved to.
+ */
+export async function parseResolveReport(reportPath: string): Promise<Distribution[]> {
+  const report = await fs.readJson(reportPath);
+  return (report.install ?? []).map((item: any) => ({
+    name: item.metadata.name,
+    version: item.metadata.version,
+  }));
+}
+
+/**
+ * Move the distributions installed in the staging directory into the store. The files of each
+ * distribution are found from the RECORD of its `dist-info` directory. The bytecode compiled after
+ * the installation isn't recorded, so it's taken along with its source file.
+ *
+ * The distributions already in the store, e.g. stored by a concurrent bundling, are left as they
+ * are.
+ */
+export async function storeDistributions(stagingDir: string, storeDir: string): Promise<void> {
+  await fs.ensureDir(storeDir);
+
+  for (const distInfo of await fs.readdir(stagingDir)) {
+    const dist = parseDistInfoName(distInfo);
+    if (!dist) {
+      continue;
+    }
+
+    const finalDir = distributionDir(storeDir, dist);
+    if (await fs.pathExists(finalDir)) {
+      continue;
+    }
+
+    // Gather the files in a temporary directory, and move it into place at once, so a distribution
+    // in the store is always complete.
+    const tmpDir = `${finalDir}.tmp-${process.pid}-${Date.now()}`;
+    try {
+      for (const file of await recordedFiles(stagingDir, distInfo)) {
+        await fs.move(path.join(stagingDir, file), path.join(tmpDir, file), { overwrite: true });
+      }
+      await fs.rename(tmpDir, finalDir);
+    } catch (e: any) {
+      if (e.code !== "EEXIST" && e.code !== "ENOTEMPTY") {
+        throw e;
+      }
+      // Stored by another bundling in the meantime.
+    } finally {
+      await fs.remove(tmpDir);
+    }
+  }
+}
+
+/**
+ * Link the files of the distributions in the store into the target directory. The files are
+ * hard linked, or copied if the store is on another file system.
+ *
+ * The linked files must not be modified in place, since they're shared with the store. Removing
+ * them is fine.
+ */
+export async function linkDistributions(
+  storeDir: string,
+  dists: readonly Distribution[],
+  targetDir: string
+): Promise<void> {
+  for (const dist of dists) {
+    const srcDir = distributionDir(storeDir, dist);
+    for (const file of await listFiles(srcDir)) {
+      const dest = path.join(targetDir, file);
+      await fs.ensureDir(path.dirname(dest));
+      try {
+        await fs.link(path.join(srcDir, file), dest);
+      } catch (e: any) {
+        if (e.code === "EXDEV" || e.code === "EPERM") {
+          await fs.copy(path.join(srcDir, file), dest);
+        } else if (e.code !== "EEXIST") {
+          throw e;
+        }
+      }
+    }
+  }
+}
+
+function distributionDir(storeDir: string, dist: Distribution): string {
+  // Normalize the name as PEP 503 does, so the name in a requirement and the name of a dist-info
+  // directory are the same.
+  const name = dist.name.toLowerCase().replace(/[-_.]+/g, "-");
+  return path.join(storeDir, `${name}-${dist.version}`);
+}
+
+function parseDistInfoName(dirname: string): Distribution | undefined {
+  const matched = /^([^-]+)-([^-]+)\.dist-info$/.exec(dirname);
+  if (!matched) {
+    return;
+  }
+  return { name: matched[1], version: matched[2] };
+}
+
+async function recordedFiles(stagingDir: string, distInfo: string): Promise<string[]> {
+  const recordPath = path.join(stagingDir, distInfo, "RECORD");
+  const files = new Set<string>();
+  for (const line of (await fs.readFile(recordPath, "utf-8")).split("\n")) {
+    // The path is the first field of the CSV line, quoted if it contains a comma.
+    const matched = /^(?:"((?:[^"]|"")*)"|([^,]*)),/.exec(line);
+    const file = matched ? matched[1]?.replace(/""/g, '"') ?? matched[2] : undefined;
+    // The files outside of the target directory, e.g. the scripts, aren't needed by the closures.
+    if (!file || file.startsWith("..") || path.isAbsolute(file)) {
+      continue;
+    }
+    if (!(await fs.pathExists(path.join(stagingDir, file)))) {
+      continue;
+    }
+    files.add(path.normalize(file));
+
+    if (file.endsWith(".py")) {
+      const cacheDir = path.join(path.dirname(file), "__pycache__");
+      const stem = path.basename(file, ".py");
+      if (await fs.pathExists(path.join(stagingDir, cacheDir))) {
+        for (const pyc of await fs.readdir(path.join(stagingDir, cacheDir))) {
+          if (pyc.startsWith(`${stem}.`) && pyc.endsWith(".pyc")) {
+            files.add(path.join(cacheDir, pyc));
+          }
+        }
+      }
+    }
+  }
+  return Array.from(files);
+}
+
+async function listFiles(dir: string, prefix = ""): Promise<string[]> {
+  const files: string[] = [];
+  for (const entry of await fs.readdir(path.join(dir, prefix), { withFileTypes: true })) {
+    const relative = path.join(prefix, entry.name);
+    if (entry.isDirectory()) {
+      files.push(...(await listFiles(dir, relative)));
+    } else {
+      files.push(relative);
+    }
+  }
+  return files;
+}
@@ -0,0 +1,374 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import { ParseOptions, Parser } from "pyright-internal/dist/parser/parser";
+import { DiagnosticSink } from "pyright-internal/dist/common/diagnosticSink";
+import { ParseTreeWalker } from "pyright-internal/dist/analyzer/parseTreeWalker";
+import { ImportAsNode, ImportFromNode } from "pyright-internal/dist/parser/parseNodes";
+
+/**
+ * The modules always kept, since they're imported by the adapters of the infrastructure SDK, which
+ * aren't part of the bundle yet.
+ */
+const DEFAULT_ALLOW_LIST = ["pluto_client", "pluto_base"];
+
+export interface TreeShakeOptions {
+  /**
+   * The modules kept along with all their submodules and data files, e.g. the ones imported
+   * dynamically by `importlib.import_module`, which can't be traced.
+   */
+  allowList?: string[];
+  /**
+   * The other directories the modules are imported from, e.g. the site-packages of the layers.
+   * They're traced through, but nothing is removed from them.
+   */
+  extraPaths?: string[];
+}
+
+export interface TreeShakeReport {
+  readonly totalFiles: number;
+  readonly totalBytes: number;
+  readonly removedFiles: number;
+  readonly removedBytes: number;
+}
+
+/**
+ * Remove the modules and the data files of the site-packages that can't be imported by the bundle.
+ * The import graph is traced from the Python files of the bundle, outside of the site-packages,
+ * through the site-packages. All the import statements are followed, including the conditional
+ * ones and the ones in the functions, so the graph is a superset of the modules actually imported.
+ *
+ * Kept, besides the reached modules:
+ * - the dist-info and egg-info directories, read by `importlib.metadata`;
+ * - the non-Python files of the reached packages, including the native extensions, which import
+ *   modules in ways that can't be traced;
+ * - the files that belong to no package, e.g. the `.pth` files.
+ */
+export async function treeShake(
+  bundleDir: string,
+  sitePackagesDir: string,
+  options: TreeShakeOptions = {}
+): Promise<TreeShakeReport> {
+  const tracer = new ImportTracer([bundleDir, sitePackagesDir, ...(options.extraPaths ?? [])]);
+  for (const file of await listFiles(bundleDir, sitePackagesDir)) {
+    if (file.endsWith(".py")) {
+      tracer.traceFile(file);
+    }
+  }
+  for (const moduleName of [...DEFAULT_ALLOW_LIST, ...(options.allowList ?? [])]) {
+    tracer.traceTree(moduleName);
+  }
+
+  let totalFiles = 0;
+  let totalBytes = 0;
+  let removedFiles = 0;
+  let removedBytes = 0;
+  for (const file of await listFiles(sitePackagesDir)) {
+    const size = (await fs.stat(file)).size;
+    totalFiles++;
+    totalBytes += size;
+    if (!tracer.isReachable(file, sitePackagesDir)) {
+      await fs.remove(file);
+      removedFiles++;
+      removedBytes += size;
+    }
+  }
+  await removeEmptyDirs(sitePackagesDir, /* keep */ true);
+
+  return { totalFiles, totalBytes, removedFiles, removedBytes };
+}
+
+interface ModuleLocation {
+  /** The `__init__.py` of a package, the source of a module, or undefined for the others. */
+  readonly file?: string;
+  /** The directory of a package, including a namespace package. */
+  readonly packageDir?: string;
+}
+
+class ImportTracer {
+  private readonly visitedModules = new Set<string>();
+  private readonly reachedFiles = new Set<string>();
+  private readonly reachedPackages = new Set<string>();
+  private readonly reachedTopLevels = new Set<string>();
+  private readonly keptTrees: string[] = [];
+
+  constructor(private readonly roots: readonly string[]) {}
+
+  /**
+   * Trace the imports of the file, and the imports of the modules it imports, recursively.
+   */
+  public traceFile(file: string) {
+    if (this.reachedFiles.has(file)) {
+      return;
+    }
+    this.reachedFiles.add(file);
+
+    const currentPackage = this.getPackageName(file);
+    for (const imported of parseImports(file)) {
+      let base = imported.module;
+      if (imported.leadingDots > 0) {
+        if (currentPackage === undefined) {
+          continue;
+        }
+        const parts = currentPackage === "" ? [] : currentPackage.split(".");
+        const packageParts = parts.slice(0, parts.length - (imported.leadingDots - 1));
+        base = [...packageParts, ...(imported.module ? [imported.module] : [])].join(".");
+      }
+      if (base === "") {
+        continue;
+      }
+
+      this.traceModule(base);
+      // The names imported from a package may be its submodules.
+      for (const name of imported.names) {
+        this.traceModule(`${base}.${name}`);
+      }
+      if (imported.wildcard) {
+        for (const submodule of this.listSubmodules(base)) {
+          this.traceModule(`${base}.${submodule}`);
+        }
+      }
+    }
+  }
+
+  /**
+   * Keep the module along with all its submodules and data files.
+   */
+  public traceTree(moduleName: string) {
+    this.traceModule(moduleName);
+    const location = this.resolve(moduleName);
+    if (!location?.packageDir) {
+      return;
+    }
+    this.keptTrees.push(location.packageDir);
+    for (const file of listFilesSync(location.packageDir)) {
+      if (file.endsWith(".py")) {
+        this.traceFile(file);
+      }
+    }
+  }
+
+  public isReachable(file: string, sitePackagesDir: string): boolean {
+    const relative = path.relative(sitePackagesDir, file);
+    const parts = relative.split(path.sep);
+    if (parts.length === 1 && !file.endsWith(".py")) {
+      return true;
+    }
+    if (/\.(dist|egg)-info$/.test(parts[0])) {
+      return true;
+    }
+    if (this.keptTrees.some((dir) => file.startsWith(dir + path.sep))) {
+      return true;
+    }
+
+    if (file.endsWith(".py")) {
+      return this.reachedFiles.has(file);
+    }
+
+    const dirname = path.dirname(file);
+    if (path.basename(dirname) === "__pycache__") {
+      // The bytecode is kept along with its source, e.g. `mod.cpython-310.pyc` with `mod.py`.
+      const stem = path.basename(file).split(".")[0];
+      return this.reachedFiles.has(path.join(path.dirname(dirname), `${stem}.py`));
+    }
+
+    if (!this.reachedTopLevels.has(path.join(sitePackagesDir, parts[0]))) {
+      return false;
+    }
+    const owner = findOwnerPackage(dirname, sitePackagesDir);
+    return owner === undefined || this.reachedPackages.has(owner);
+  }
+
+  private traceModule(moduleName: string) {
+    // Importing a module imports its parent packages first.
+    const parts = moduleName.split(".");
+    for (let i = 1; i <= parts.length; i++) {
+      const name = parts.slice(0, i).join(".");
+      if (this.visitedModules.has(name)) {
+        continue;
+      }
+      this.visitedModules.add(name);
+
+      const location = this.resolve(name);
+      if (!location) {
+        return;
+      }
+      if (location.packageDir) {
+        this.reachedPackages.add(location.packageDir);
+        this.markTopLevel(location.packageDir);
+      }
+      if (location.file) {
+        this.markTopLevel(location.file);
+        this.traceFile(location.file);
+      }
+    }
+  }
+
+  private markTopLevel(filepath: string) {
+    for (const root of this.roots) {
+      if (filepath.startsWith(root + path.sep)) {
+        const topLevel = path.relative(root, filepath).split(path.sep)[0];
+        this.reachedTopLevels.add(path.join(root, topLevel));
+      }
+    }
+  }
+
+  /**
+   * Find the module in the roots, in the same way as the import system does.
+   */
+  private resolve(moduleName: string): ModuleLocation | undefined {
+    const relative = path.join(...moduleName.split("."));
+    for (const root of this.roots) {
+      const dir = path.join(root, relative);
+      const init = path.join(dir, "__init__.py");
+      if (fs.existsSync(init)) {
+        return { file: init, packageDir: dir };
+      }
+      if (fs.existsSync(`${dir}.py`)) {
+        return { file: `${dir}.py` };
+      }
+      const parent = path.dirname(dir);
+      const basename = path.basename(dir);
+      if (
+        fs.existsSync(parent) &&
+        fs
+          .readdirSync(parent)
+          .some((name) => name.startsWith(`${basename}.`) && /\.(so|pyd)$/.test(name))
+      ) {
+        // A native extension, which is kept with its package.
+        return {};
+      }
+      if (fs.existsSync(dir) && fs.statSync(dir).isDirectory()) {
+        // A namespace package.
+        return { packageDir: dir };
+      }
+    }
+    return;
+  }
+
+  private listSubmodules(moduleName: string): string[] {
+    const location = this.resolve(moduleName);
+    if (!location?.packageDir) {
+      return [];
+    }
+    return fs
+      .readdirSync(location.packageDir)
+      .filter((name) => name !== "__init__.py" && name !== "__pycache__")
+      .map((name) => name.replace(/\.py$/, ""))
+      .filter((name) => /^[A-Za-z_][A-Za-z0-9_]*$/.test(name));
+  }
+
+  /**
+   * Get the package the file belongs to, relative to the root containing it, which is the base of
+   * its relative imports.
+   */
+  private getPackageName(file: string): string | undefined {
+    // The site-packages may be inside the bundle directory, the innermost root is the one.
+    const root = this.roots
+      .filter((root) => file.startsWith(root + path.sep))
+      .sort((a, b) => b.length - a.length)[0];
+    if (!root) {
+      return;
+    }
+    return path.relative(root, path.dirname(file)).split(path.sep).filter(Boolean).join(".");
+  }
+}
+
+interface ImportStatement {
+  readonly leadingDots: number;
+  readonly module: string;
+  /** The names imported by the `from ... import` statement. */
+  readonly names: string[];
+  readonly wildcard: boolean;
+}
+
+function parseImports(filepath: string): ImportStatement[] {
+  const parser = new Parser();
+  const content = fs.readFileSync(filepath, "utf-8");
+  const parseResult = parser.parseSourceFile(content, new ParseOptions(), new DiagnosticSink());
+  if (!parseResult.parseTree) {
+    return [];
+  }
+
+  const visitor = new ImportStatementVisitor();
+  visitor.walk(parseResult.parseTree);
+  return visitor.statements;
+}
+
+class ImportStatementVisitor extends ParseTreeWalker {
+  public readonly statements: ImportStatement[] = [];
+
+  visitImportAs(node: ImportAsNode): boolean {
+    this.statements.push({
+      leadingDots: node.module.leadingDots,
+      module: node.module.nameParts.map((part) => part.value).join("."),
+      names: [],
+      wildcard: false,
+    });
+    return false;
+  }
+
+  visitImportFrom(node: ImportFromNode): boolean {
+    this.statements.push({
+      leadingDots: node.module.leadingDots,
+      module: node.module.nameParts.map((part) => part.value).join("."),
+      names: node.imports.map((imported) => imported.name.value),
+      wildcard: !!node.isWildcardImport,
+    });
+    return false;
+  }
+}
+
+/**
+ * Find the nearest regular package containing the directory, within the site-packages.
+ */
+function findOwnerPackage(dir: string, sitePackagesDir: string): string | undefined {
+  let current = dir;
+  while (current.startsWith(sitePackagesDir + path.sep)) {
+    if (fs.existsSync(path.join(current, "__init__.py"))) {
+      return current;
+    }
+    current = path.dirname(current);
+  }
+  return;
+}
+
+async function listFiles(dir: string, excludeDir?: string): Promise<string[]> {
+  const files: string[] = [];
+  for (const entry of await fs.readdir(dir, { withFileTypes: true })) {
+    const fullpath = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      if (fullpath !== excludeDir) {
+        files.push(...(await listFiles(fullpath, excludeDir)));
+      }
+    } else {
+      files.push(fullpath);
+    }
+  }
+  return files;
+}
+
+function listFilesSync(dir: string): string[] {
+  const files: string[] = [];
+  for (const entry of fs.readdirSync(dir, { withFileTypes: true })) {
+    const fullpath = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      files.push(...listFilesSync(fullpath));
+    } else {
+      files.push(fullpath);
+    }
+  }
+  return files;
+}
+
+async function removeEmptyDirs(dir: string, keep = false): Promise<boolean> {
+  let empty = true;
+  for (const entry of await fs.readdir(dir, { withFileTypes: true })) {
+    if (!entry.isDirectory() || !(await removeEmptyDirs(path.join(dir, entry.name)))) {
+      empty = false;
+    }
+  }
+  if (empty && !keep) {
+    await fs.remove(dir);
+  }
+  return empty;
+}
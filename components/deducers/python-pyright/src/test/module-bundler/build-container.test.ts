@@ -0,0 +1,64 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import { spawnSync } from "child_process";
+import { getTmpDir } from "../test-utils";
+import { BuildContainers } from "../../module-bundler/build-container";
+import * as CmdUtils from "../../module-bundler/command-utils";
+
+const dockerAvailable = spawnSync("docker", ["info"], { stdio: "ignore" }).status === 0;
+// The containers can only be started where Docker is available.
+const testWithDocker = dockerAvailable ? test : test.skip;
+
+const IMAGE = "busybox:stable";
+
+describe("build containers", () => {
+  test("should map the bound host paths into the containers", () => {
+    const workspace = path.resolve("/tmp/workspace");
+    const cache = path.resolve("/tmp/pip-cache");
+    const containers = new BuildContainers([workspace, cache]);
+
+    expect(containers.toContainerPath(workspace)).toBe("/var/pluto/mount0");
+    expect(containers.toContainerPath(path.join(workspace, "closures", "a", "site-packages"))).toBe(
+      "/var/pluto/mount0/closures/a/site-packages"
+    );
+    expect(containers.toContainerPath(path.join(cache, "wheels"))).toBe("/var/pluto/mount1/wheels");
+    expect(containers.toContainerPath(path.resolve("/tmp/workspace-other"))).toBeUndefined();
+    expect(containers.toContainerPath(path.resolve("/tmp"))).toBeUndefined();
+  });
+
+  testWithDocker(
+    "should run the commands in one long-lived container",
+    async () => {
+      const { tmpdir, cleanup } = getTmpDir();
+      const containers = new BuildContainers([tmpdir]);
+      try {
+        await fs.writeFile(path.join(tmpdir, "input.txt"), "hello");
+        const input = containers.toContainerPath(path.join(tmpdir, "input.txt"))!;
+        const output = containers.toContainerPath(path.join(tmpdir, "output.txt"))!;
+
+        const first = await containers.exec(IMAGE, [["hostname"]]);
+        await containers.exec(IMAGE, [["cp", input, output]]);
+        const second = await containers.exec(IMAGE, [["hostname"]]);
+
+        // The commands ran in the same container, on the bound host directory.
+        expect(second).toBe(first);
+        expect(await fs.readFile(path.join(tmpdir, "output.txt"), "utf-8")).toBe("hello");
+      } finally {
+        await containers.stopAll();
+        cleanup();
+      }
+
+      const left = await CmdUtils.runCommand("docker", [
+        "ps",
+        "--all",
+        "--quiet",
+        "--filter",
+        "label=dev.plutolang.build-container",
+        "--filter",
+        `ancestor=${IMAGE}`,
+      ]);
+      expect(left.trim()).toBe("");
+    },
+    /* timeout */ 120000
+  );
+});
@@ -0,0 +1,63 @@
+import * as fs from "fs-extra";
+import { getTmpDir } from "../test-utils";
+import { InstalledModule, LocalModule } from "../../module-bundler";
+import * as BundleManifestUtils from "../../module-bundler/bundle-manifest";
+
+describe("bundle manifest", () => {
+  test("should change the hash only when the inputs change", async () => {
+    const { tmpdir, cleanup } = getTmpDir();
+
+    const entrypoint = `${tmpdir}/closure/__init__.py`;
+    await fs.outputFile(entrypoint, "def handler():\n  pass\n");
+    await fs.outputFile(`${tmpdir}/module/__init__.py`, "VALUE = 1\n");
+    await fs.outputFile(`${tmpdir}/module/__pycache__/__init__.cpython-310.pyc`, "stale");
+
+    const local = LocalModule.create("module", `${tmpdir}/module`);
+    const hash = (modules = [local, InstalledModule.create("numpy", "1.26.4")]) =>
+      BundleManifestUtils.hashBundleInputs(entrypoint, modules, ["python3.10"]);
+
+    try {
+      const original = await hash();
+      expect(await hash()).toBe(original);
+
+      // The bytecode of the local modules doesn't matter.
+      await fs.outputFile(`${tmpdir}/module/__pycache__/__init__.cpython-310.pyc`, "fresh");
+      expect(await hash()).toBe(original);
+
+      expect(await hash([local, InstalledModule.create("numpy", "2.0.0")])).not.toBe(original);
+
+      await fs.outputFile(`${tmpdir}/module/__init__.py`, "VALUE = 2\n");
+      const changed = await hash();
+      expect(changed).not.toBe(original);
+
+      await BundleManifestUtils.dumpBundleManifest(`${tmpdir}/closure`, changed!);
+      expect(await BundleManifestUtils.isUpToDate(`${tmpdir}/closure`, changed)).toBe(true);
+      expect(await BundleManifestUtils.isUpToDate(`${tmpdir}/closure`, original)).toBe(false);
+    } finally {
+      cleanup();
+    }
+  });
+
+  test("should hash an installed module without a version with its local version", async () => {
+    const { tmpdir, cleanup } = getTmpDir();
+
+    const entrypoint = `${tmpdir}/closure/__init__.py`;
+    await fs.outputFile(entrypoint, "def handler():\n  pass\n");
+    const hash = (modules: InstalledModule[]) =>
+      BundleManifestUtils.hashBundleInputs(entrypoint, modules, []);
+
+    try {
+      // pip is installed along with Python.
+      const versions = await BundleManifestUtils.getLocalVersions(["pip"]);
+      expect(versions.has("pip")).toBe(true);
+      expect(await hash([InstalledModule.create("pip")])).toBe(
+        await hash([InstalledModule.create("pip", versions.get("pip"))])
+      );
+
+      // The version pip would resolve isn't known, so the inputs can't be identified.
+      expect(await hash([InstalledModule.create("pluto-not-installed-dist")])).toBeUndefined();
+    } finally {
+      cleanup();
+    }
+  });
+});
@@ -62,11 +62,60 @@ describe("bundle with the local modules", () => {
       cleanup();
     }
   }, /* timeout */ 60000);
+
+  test("should precompile the local modules into unchecked bytecode", async () => {
+    const { tmpdir, cleanup } = getTmpDir();
+
+    await fs.writeFile(`${tmpdir}/module.py`, "def hello():\n  return 'Hello, world!'\n");
+
+    const runtime = await CommandUtils.getDefaultPythonRuntime();
+    const architecture = "x86_64";
+    const modules: Module[] = [LocalModule.create("module", `${tmpdir}/module.py`)];
+
+    const bundleDir = `${tmpdir}/bundle`;
+    fs.ensureDirSync(bundleDir);
+    const sitePackagesDir = `${bundleDir}/site-packages`;
+    const options = { dockerPip: false, compile: true };
+
+    try {
+      const report = await bundleModules(
+        runtime,
+        platform,
+        architecture,
+        modules,
+        bundleDir,
+        sitePackagesDir,
+        options
+      );
+      expect(report.bytecode?.files).toBe(1);
+
+      const pycFiles = await fs.readdir(`${bundleDir}/__pycache__`);
+      expect(pycFiles).toHaveLength(1);
+      expect(pycFiles[0]).toMatch(/^module\.cpython-\d+\.pyc$/);
+
+      // The flags of a hash-based bytecode file which isn't checked against the source.
+      const header = await fs.readFile(`${bundleDir}/__pycache__/${pycFiles[0]}`);
+      expect(header.readUInt32LE(4)).toBe(0b01);
+    } finally {
+      cleanup();
+    }
+  }, /* timeout */ 60000);
 });
 
 describe("bundle with the packages that need to install", () => {
   const platform = "linux";
 
+  // Install into a store of the tests, instead of the store of the user.
+  let storeRoot: ReturnType<typeof getTmpDir>;
+  beforeAll(() => {
+    storeRoot = getTmpDir();
+    process.env["PLUTO_PYTHON_STORE_DIR"] = storeRoot.tmpdir;
+  });
+  afterAll(() => {
+    delete process.env["PLUTO_PYTHON_STORE_DIR"];
+    storeRoot.cleanup();
+  });
+
   test("should bundle packages and remove useless files", async () => {
     const { tmpdir, cleanup } = getTmpDir();
 
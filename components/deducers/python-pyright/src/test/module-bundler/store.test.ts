@@ -0,0 +1,63 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import { getTmpDir } from "../test-utils";
+import * as StoreUtils from "../../module-bundler/store";
+
+async function writeDistribution(stagingDir: string, name: string, version: string) {
+  const distInfo = `${name}-${version}.dist-info`;
+  await fs.outputFile(path.join(stagingDir, name, "__init__.py"), "VALUE = 1\n");
+  await fs.outputFile(path.join(stagingDir, name, "__pycache__", "__init__.cpython-310.pyc"), "");
+  await fs.outputFile(path.join(stagingDir, distInfo, "METADATA"), `Name: ${name}\n`);
+  await fs.outputFile(
+    path.join(stagingDir, distInfo, "RECORD"),
+    [
+      `${name}/__init__.py,sha256=abc,10`,
+      `${distInfo}/METADATA,,`,
+      `${distInfo}/RECORD,,`,
+      `../../bin/${name},,`,
+    ].join("\n")
+  );
+}
+
+describe("content-addressed package store", () => {
+  test("should split the staging directory by distribution and link them", async () => {
+    const { tmpdir, cleanup } = getTmpDir();
+    const stagingDir = path.join(tmpdir, "staging");
+    const storeDir = path.join(tmpdir, "store");
+    const targetDir = path.join(tmpdir, "site-packages");
+
+    try {
+      await writeDistribution(stagingDir, "alpha", "1.0.0");
+      await writeDistribution(stagingDir, "beta_pkg", "2.1");
+      await StoreUtils.storeDistributions(stagingDir, storeDir);
+
+      const alpha = { name: "alpha", version: "1.0.0" };
+      const beta = { name: "Beta-Pkg", version: "2.1" };
+      expect(StoreUtils.hasDistribution(storeDir, alpha)).toBe(true);
+      expect(StoreUtils.hasDistribution(storeDir, beta)).toBe(true);
+      expect(StoreUtils.hasDistribution(storeDir, { name: "alpha", version: "2.0" })).toBe(false);
+
+      await StoreUtils.linkDistributions(storeDir, [alpha], targetDir);
+      expect(await fs.readdir(targetDir)).toEqual(["alpha", "alpha-1.0.0.dist-info"]);
+      expect(await fs.readdir(path.join(targetDir, "alpha", "__pycache__"))).toEqual([
+        "__init__.cpython-310.pyc",
+      ]);
+
+      // The linked file is the same as the one in the store.
+      const linked = await fs.stat(path.join(targetDir, "alpha", "__init__.py"));
+      expect(linked.nlink).toBeGreaterThan(1);
+    } finally {
+      cleanup();
+    }
+  });
+
+  test("should keep the distributions installed with different options apart", () => {
+    const dirs = [
+      StoreUtils.getStoreDir("python3.10", "linux", "x86_64"),
+      StoreUtils.getStoreDir("python3.10", "linux", "x86_64", { compile: true }),
+      StoreUtils.getStoreDir("python3.10", "linux", "x86_64", { slim: true }),
+      StoreUtils.getStoreDir("python3.10", "linux", "x86_64", { compile: true, slim: true }),
+    ];
+    expect(new Set(dirs).size).toBe(dirs.length);
+  });
+});
@@ -0,0 +1,46 @@
+import * as fs from "fs-extra";
+import { getTmpDir } from "../test-utils";
+import { treeShake } from "../../module-bundler/tree-shaker";
+
+describe("tree shaking of the site-packages", () => {
+  test("should remove the modules not reachable from the bundle", async () => {
+    const { tmpdir, cleanup } = getTmpDir();
+    const sitePackages = `${tmpdir}/site-packages`;
+
+    await fs.outputFile(`${tmpdir}/__init__.py`, "from lib.core import run\nimport extra\n");
+    await fs.outputFile(`${sitePackages}/lib/__init__.py`, "");
+    await fs.outputFile(`${sitePackages}/lib/core.py`, "from . import helpers\n");
+    await fs.outputFile(`${sitePackages}/lib/helpers.py`, "");
+    await fs.outputFile(`${sitePackages}/lib/unused.py`, "");
+    await fs.outputFile(`${sitePackages}/lib/data.json`, "{}");
+    await fs.outputFile(`${sitePackages}/lib/tests/__init__.py`, "");
+    await fs.outputFile(`${sitePackages}/lib/tests/fixture.txt`, "fixture");
+    await fs.outputFile(`${sitePackages}/lib-1.0.dist-info/METADATA`, "Name: lib\n");
+    await fs.outputFile(`${sitePackages}/unused_pkg/__init__.py`, "");
+    await fs.outputFile(`${sitePackages}/plugin/__init__.py`, "");
+    await fs.outputFile(`${sitePackages}/plugin/backend.py`, "");
+    await fs.outputFile(`${sitePackages}/extra.py`, "");
+
+    try {
+      const report = await treeShake(tmpdir, sitePackages, { allowList: ["plugin"] });
+
+      const exists = (file: string) => fs.pathExistsSync(`${sitePackages}/${file}`);
+      expect(exists("lib/__init__.py")).toBe(true);
+      expect(exists("lib/core.py")).toBe(true);
+      expect(exists("lib/helpers.py")).toBe(true);
+      expect(exists("lib/data.json")).toBe(true);
+      expect(exists("lib-1.0.dist-info/METADATA")).toBe(true);
+      expect(exists("extra.py")).toBe(true);
+      expect(exists("plugin/backend.py")).toBe(true);
+
+      expect(exists("lib/unused.py")).toBe(false);
+      expect(exists("lib/tests")).toBe(false);
+      expect(exists("unused_pkg")).toBe(false);
+
+      expect(report.totalFiles).toBe(12);
+      expect(report.removedFiles).toBe(4);
+    } finally {
+      cleanup();
+    }
+  });
+});
@@ -1,6 +1,6 @@
 import os
 from abc import ABC
-from typing import Callable, List, Type
+from typing import Any, Callable, Dict, FrozenSet, List, Type
 
 _empty_lambda: Callable[..., None] = lambda *args, **kwargs: None
 
@@ -35,76 +35,55 @@ class IResource(ABC):
     The interface that contains the infrastructure API of the resource. This is used to check if an
     infrastructure API is called during runtime. If it is called, the call will be skipped.
     """
+    __client_attrs: Dict[str, Any] | None = None
+    """
+    The attributes resolved from the client, keyed by the attribute name. Only callables, i.e. the
+    client APIs and the captured property accessors, are cached. It is reset whenever the `_client`
+    attribute is assigned.
+    """
 
-    def __get_infra_apis(self) -> List[str]:
+    def __get_infra_apis(self) -> FrozenSet[str]:
         """
-        Get a list of infrastructure APIs defined in the resource's infrastructure interface.
+        Get the set of infrastructure APIs defined in the resource's infrastructure interface.
+
+        The set is computed once per resource class, or per interface set on an instance, on first
+        use, and stored in an immutable lookup table, so attribute dispatch doesn't repeat the class
+        introspection on every call.
 
         Returns:
-            A list of strings representing the names of the user defined infrastructure APIs.
+            A frozen set of strings representing the names of the user defined infrastructure APIs.
 
         Raises:
             ValueError: If multiple classes that inherit from IResourceInfraApi are found.
         """
-
-        infra_iface: Type[IResourceInfraApi] | None = None
-
-        # Try to get the _infra_iface attribute from self, if user has set it, use it.
-        try:
-            infra_iface = self._infra_iface
-        except:
-            pass
-
-        if infra_iface is None:
-            # If the _infra_iface attribute doesn't exist, try to find the class that is a subclass
-            # of IResourceInfraApi and not a subclass of IResourceClientApi or
-            # IResourceCapturedProps.
-
-            # First, get all the classes that are a subclass of IResourceInfraApi.
-            infra_iface_clses: List[Type[IResourceInfraApi]] = [
-                klass
-                for klass in self.__class__.mro()
-                if issubclass(klass, IResourceInfraApi)
-            ]
-
-            # Second, find the class that is a subclass of IResourceInfraApi and not a subclass of
-            # IResourceClientApi or IResourceCapturedProps
-            for klass in infra_iface_clses:
-                if klass == IResourceInfraApi:
-                    # Skip the IResourceInfraApi class itself.
-                    continue
-
-                if not issubclass(klass, IResourceClientApi) and not issubclass(
-                    klass, IResourceCapturedProps
-                ):
-                    if infra_iface is not None:
-                        # Found multiple classes that inherit from IResourceInfraApi.
-                        raise ValueError(
-                            "Multiple base classes that inherit from IResourceInfraApi are found."
-                        )
-                    infra_iface = klass
-
-            # Set the _infra_iface attribute to the found class.
-            if infra_iface is not None:
-                super().__setattr__("_infra_iface", infra_iface)
-
-        # If the _infra_iface attribute is still None, return an empty list.
-        if infra_iface is None:
-            return []
-
-        # Get all the user defined infrastructure APIs.
-        # RULE: The infrastructure APIs should not start with "__".
-        infra_apis = [
-            func
-            for func in dir(infra_iface)
-            if callable(getattr(infra_iface, func)) and not func.startswith("__")
-        ]
+        # An interface set on the instance takes precedence over the one of the class.
+        infra_iface = self.__dict__.get("_infra_iface")
+        key = infra_iface if infra_iface is not None else type(self)
+        infra_apis = _infra_apis_table.get(key)
+        if infra_apis is None:
+            if infra_iface is None:
+                infra_iface = _resolve_infra_iface(type(self))
+            infra_apis = _list_infra_apis(infra_iface)
+            _infra_apis_table[key] = infra_apis
         return infra_apis
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "_client":
+            # The attributes resolved from the previous client are no longer valid.
+            super().__setattr__("_IResource__client_attrs", {})
+
     def __getattribute__(self, name: str):
         if name == "fqn" or name.startswith("_"):
             return super().__getattribute__(name)
 
+        # The infrastructure APIs never enter the cache, so a hit can be returned directly.
+        client_attrs = self.__client_attrs
+        if client_attrs is not None:
+            attr = client_attrs.get(name)
+            if attr is not None:
+                return attr
+
         # Check if the attribute is an infrastructure API, if it is, return an empty lambda.
         infra_apis = self.__get_infra_apis()
         if name in infra_apis:
@@ -117,10 +96,79 @@ class IResource(ABC):
         try:
             if os.getenv("DEBUG", False):
                 print(f"Getting attribute from _client: {name}")
-            return getattr(self._client, name)
+            attr = getattr(self._client, name)
         except:
             # If the _client doesn't exist, or the attribute doesn't exist in the client, return the
             # attribute of self.
             if os.getenv("DEBUG", False):
                 print(f"Getting attribute from self: {name}")
             return super().__getattribute__(name)
+
+        # The values of the client's properties may change, so only the callables are cached.
+        if client_attrs is not None and callable(attr):
+            client_attrs[name] = attr
+        return attr
+
+
+_infra_apis_table: Dict[type, FrozenSet[str]] = {}
+"""
+The infrastructure API names of each resource class, keyed by the class, or by the interface if it
+is set on an instance. It is filled lazily, the first time an attribute of an instance is accessed.
+"""
+
+
+def _resolve_infra_iface(
+    resource_cls: Type["IResource"],
+) -> Type[IResourceInfraApi] | None:
+    """
+    Find the interface that contains the infrastructure API of the resource class.
+
+    Raises:
+        ValueError: If multiple classes that inherit from IResourceInfraApi are found.
+    """
+    # If the user has set the _infra_iface attribute on the class, use it.
+    infra_iface: Type[IResourceInfraApi] | None = getattr(
+        resource_cls, "_infra_iface", None
+    )
+    if infra_iface is not None:
+        return infra_iface
+
+    # If the _infra_iface attribute doesn't exist, try to find the class that is a subclass of
+    # IResourceInfraApi and not a subclass of IResourceClientApi or IResourceCapturedProps.
+
+    # First, get all the classes that are a subclass of IResourceInfraApi.
+    infra_iface_clses: List[Type[IResourceInfraApi]] = [
+        klass for klass in resource_cls.mro() if issubclass(klass, IResourceInfraApi)
+    ]
+
+    # Second, find the class that is a subclass of IResourceInfraApi and not a subclass of
+    # IResourceClientApi or IResourceCapturedProps
+    for klass in infra_iface_clses:
+        if klass == IResourceInfraApi:
+            # Skip the IResourceInfraApi class itself.
+            continue
+
+        if not issubclass(klass, IResourceClientApi) and not issubclass(
+            klass, IResourceCapturedProps
+        ):
+            if infra_iface is not None:
+                # Found multiple classes that inherit from IResourceInfraApi.
+                raise ValueError(
+                    "Multiple base classes that inherit from IResourceInfraApi are found."
+                )
+            infra_iface = klass
+
+    return infra_iface
+
+
+def _list_infra_apis(infra_iface: Type[IResourceInfraApi] | None) -> FrozenSet[str]:
+    if infra_iface is None:
+        return frozenset()
+
+    # Get all the user defined infrastructure APIs.
+    # RULE: The infrastructure APIs should not start with "__".
+    return frozenset(
+        func
+        for func in dir(infra_iface)
+        if callable(getattr(infra_iface, func)) and not func.startswith("__")
+    )
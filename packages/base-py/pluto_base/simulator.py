@@ -1,31 +1,324 @@
+import os
 import json
+import socket
+import struct
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 import requests
+from requests.adapters import HTTPAdapter
 
 SIM_HANDLE_PATH = "/call"
+SIM_BATCH_PATH = "/batch"
+
+SESSION_POOL_MAXSIZE = 32
+"""
+The maximum number of connections kept alive to a simulator, i.e. the number of threads that can
+call the simulator concurrently without opening new connections.
+"""
+
+PIPELINE_MAX_BATCH_SIZE = 1000
+"""
+The maximum number of calls sent to the simulator in one round trip when flushing a pipeline.
+"""
+
+FRAME_HEADER = struct.Struct(">I")
+"""
+The header of a frame sent through the Unix domain socket, i.e. the length of the JSON payload.
+"""
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(url: str) -> requests.Session:
+    """
+    Get the session shared by all the clients of the simulator at the URL. The session keeps the
+    connections to the simulator alive, so the calls don't open a new TCP connection each time.
+    Its connection pool is thread-safe.
+    """
+    session = _sessions.get(url)
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        session = _sessions.get(url)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"Content-Type": "application/json"})
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[url] = session
+        return session
+
+
+class HttpTransport:
+    """
+    Send the calls to the simulator through HTTP.
+    """
+
+    def __init__(self, url: str):
+        self._url = url
+        self._session = _get_session(url)
+
+    def call(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        resp = self._session.post(self._url + SIM_HANDLE_PATH, data=json.dumps(body))
+        return resp.json()
+
+    def batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        resp = self._session.post(self._url + SIM_BATCH_PATH, data=json.dumps(body))
+        return resp.json()
+
+
+class SocketTransport:
+    """
+    Send the calls to the simulator through its Unix domain socket, which is only available when the
+    simulator runs on the same host. Each message is a frame of a 4-byte big-endian length followed
+    by the JSON payload. A connection is kept per thread, since the replies on a connection come
+    back in the order of the requests.
+    """
+
+    def __init__(self, socket_path: str):
+        self._socket_path = socket_path
+        self._local = threading.local()
+
+    def call(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._roundtrip(body)
+
+    def batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._roundtrip(body)
+
+    def _roundtrip(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        sock: Optional[socket.socket] = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self._socket_path)
+            self._local.sock = sock
+
+        try:
+            payload = json.dumps(body).encode("utf-8")
+            sock.sendall(FRAME_HEADER.pack(len(payload)) + payload)
+            (length,) = FRAME_HEADER.unpack(_recv_exactly(sock, FRAME_HEADER.size))
+            return json.loads(_recv_exactly(sock, length))
+        except:
+            # The stream may be out of sync, drop the connection and reconnect on the next call.
+            self._local.sock = None
+            sock.close()
+            raise
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("The simulator closed the connection.")
+        buf += chunk
+    return bytes(buf)
+
+
+Transport = HttpTransport | SocketTransport
+
+_transports: Dict[Tuple[str, Optional[str]], Transport] = {}
+_transports_lock = threading.Lock()
+
+
+def _get_transport(url: str, socket_path: Optional[str] = None) -> Transport:
+    """
+    Get the transport to the simulator. The Unix domain socket is used if the simulator provides
+    one and it exists on this host, i.e. the simulator runs on the same host, otherwise HTTP is
+    used.
+    """
+    key = (url, socket_path)
+    transport = _transports.get(key)
+    if transport is not None:
+        return transport
+
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            if socket_path and os.path.exists(socket_path) and hasattr(socket, "AF_UNIX"):
+                transport = SocketTransport(socket_path)
+            else:
+                transport = HttpTransport(url)
+            _transports[key] = transport
+        return transport
 
 
 class SimulatorClient:
-    def __init__(self, url, resourceId):
+    def __init__(
+        self,
+        url,
+        resourceId,
+        socket_path: Optional[str] = None,
+        op_names: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            op_names: The names of the methods of the simulated resource, which is implemented in
+                TypeScript, keyed by the names of the Python methods that differ from them, e.g.
+                `{"get_many": "getMany"}`. The other operations are sent under their own names.
+        """
         self._url = url
         self._resourceId = resourceId
+        self._transport = _get_transport(url, socket_path)
+        self._op_names = op_names or {}
 
     def __getattr__(self, op):
+        # Only called when the attribute isn't found normally, so the function is stored on the
+        # instance to make the later accesses plain attribute lookups. The operations never start
+        # with an underscore, leave those names to the regular lookup to avoid recursion.
+        if op.startswith("_"):
+            raise AttributeError(op)
+
+        transport = self._transport
+        op_name = self._op_names.get(op, op)
+
         def function(*args):
-            body = {"resourceId": self._resourceId, "op": op, "args": args}
-            resp = requests.post(
-                self._url + SIM_HANDLE_PATH,
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(body),
-            )
-            parsed = resp.json()
+            body = {"resourceId": self._resourceId, "op": op_name, "args": args}
+            parsed = transport.call(body)
 
             if "error" in parsed:
                 raise Exception(parsed["error"])
 
             return parsed.get("result", None)
 
+        self.__dict__[op] = function
         return function
 
+    def pipeline(self, max_batch_size: int = PIPELINE_MAX_BATCH_SIZE) -> "SimulatorPipeline":
+        """
+        Create a pipeline for the resource. The operations called on the pipeline are queued, and
+        sent to the simulator in one round trip per `max_batch_size` calls when it is flushed.
+
+        Example:
+            with kvstore.pipeline() as pipe:
+                for i in range(10000):
+                    pipe.set(f"key-{i}", "value")
+                call = pipe.get("key-0")
+            print(call.result())
+        """
+        return SimulatorPipeline(
+            self._transport, self._resourceId, max_batch_size, op_names=self._op_names
+        )
+
+
+class PipelinedCall:
+    """
+    The handle of an operation queued in a pipeline. Its result is available after the pipeline is
+    flushed.
+    """
+
+    def __init__(self, op: str):
+        self._op = op
+        self._done = False
+        self._result: Any = None
+        self._error: Any = None
+
+    def _resolve(self, reply: Dict[str, Any]):
+        self._done = True
+        self._result = reply.get("result", None)
+        self._error = reply.get("error", None)
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    @property
+    def error(self) -> Any:
+        return self._error
+
+    def result(self) -> Any:
+        """
+        Get the result of the operation.
+
+        Raises:
+            RuntimeError: If the pipeline hasn't been flushed yet.
+            Exception: If the operation failed in the simulator.
+        """
+        if not self._done:
+            raise RuntimeError(f"The pipelined call '{self._op}' hasn't been flushed yet.")
+        if self._error is not None:
+            raise Exception(self._error)
+        return self._result
+
+
+class SimulatorPipeline:
+    """
+    Queue the operations of a resource and send them to the simulator in batches. The operations
+    are executed by the simulator in the order they are called. When used as a context manager,
+    the pipeline is flushed on exit, and the error of the first failed operation is raised.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        resourceId: str,
+        max_batch_size: int = PIPELINE_MAX_BATCH_SIZE,
+        op_names: Optional[Dict[str, str]] = None,
+    ):
+        if max_batch_size <= 0:
+            raise ValueError("The max batch size should be greater than 0.")
+
+        self._transport = transport
+        self._resourceId = resourceId
+        self._op_names = op_names or {}
+        self._max_batch_size = max_batch_size
+        self._queued: List[Tuple[Dict[str, Any], PipelinedCall]] = []
+
+    def __getattr__(self, op):
+        if op.startswith("_"):
+            raise AttributeError(op)
+
+        op_name = self._op_names.get(op, op)
+
+        def function(*args) -> PipelinedCall:
+            call = PipelinedCall(op)
+            body = {"resourceId": self._resourceId, "op": op_name, "args": args}
+            self._queued.append((body, call))
+            return call
+
+        self.__dict__[op] = function
+        return function
+
+    def flush(self) -> List[PipelinedCall]:
+        """
+        Send the queued operations to the simulator.
+
+        Returns:
+            The handles of the sent operations, in the order they were called.
+        """
+        queued, self._queued = self._queued, []
+        for start in range(0, len(queued), self._max_batch_size):
+            batch = queued[start : start + self._max_batch_size]
+            body = {"calls": [req for req, _ in batch]}
+            parsed = self._transport.batch(body)
+
+            if "error" in parsed:
+                raise Exception(parsed["error"])
+
+            for (_, call), reply in zip(batch, parsed["results"]):
+                call._resolve(reply)
+        return [call for _, call in queued]
+
+    def __enter__(self) -> "SimulatorPipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            # Drop the queued operations, the block didn't complete.
+            self._queued = []
+            return
+
+        for call in self.flush():
+            if call.error is not None:
+                raise Exception(call.error)
+
 
-def make_simulator_client(url: str, resourceId: str):
-    return SimulatorClient(url, resourceId)
+def make_simulator_client(
+    url: str,
+    resourceId: str,
+    socket_path: Optional[str] = None,
+    op_names: Optional[Dict[str, str]] = None,
+):
+    return SimulatorClient(url, resourceId, socket_path, op_names)
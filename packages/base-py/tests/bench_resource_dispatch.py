@@ -0,0 +1,111 @@
+"""
+Micro-benchmark for the attribute dispatch of `IResource`.
+
+It compares the per-call cost of calling a client API through a resource object against the legacy
+dispatch, which computed the infrastructure API names and resolved the attribute from the client
+through an exception-driven lookup on every attribute access.
+
+Usage:
+    PYTHONPATH=$(pwd) python tests/bench_resource_dispatch.py [--number N]
+"""
+
+import argparse
+import os
+import timeit
+from typing import Any, List, Type
+
+from pluto_base import resource
+
+
+class ResourceInfraApi(resource.IResourceInfraApi):
+    def infra_api_1(self) -> Any:
+        pass
+
+    def infra_api_2(self, _a: Any) -> int:
+        raise NotImplementedError
+
+
+class ResourceClientApi(resource.IResourceClientApi):
+    def client_api(self) -> Any:
+        raise NotImplementedError
+
+
+class ResourceCapturedProps(resource.IResourceCapturedProps):
+    pass
+
+
+class ResourceClient(ResourceClientApi, ResourceCapturedProps):
+    def client_api(self) -> Any:
+        return "client_api"
+
+
+class ResourceInfra(ResourceInfraApi, ResourceCapturedProps):
+    pass
+
+
+class Resource(resource.IResource, ResourceClientApi, ResourceInfra):
+    def __init__(self):
+        self._client = ResourceClient()
+
+
+class LegacyResource(Resource):
+    """
+    The resource class with the dispatch used before the per-class infrastructure API table was
+    introduced, and before the resolved client attributes were cached. It walks the MRO and scans
+    the infrastructure interface on every access.
+    """
+
+    def __legacy_infra_apis(self) -> List[str]:
+        infra_iface: Type[resource.IResourceInfraApi] | None = None
+        for klass in self.__class__.mro():
+            if klass == resource.IResourceInfraApi or not issubclass(
+                klass, resource.IResourceInfraApi
+            ):
+                continue
+            if not issubclass(klass, resource.IResourceClientApi) and not issubclass(
+                klass, resource.IResourceCapturedProps
+            ):
+                infra_iface = klass
+
+        if infra_iface is None:
+            return []
+        return [
+            func
+            for func in dir(infra_iface)
+            if callable(getattr(infra_iface, func)) and not func.startswith("__")
+        ]
+
+    def __getattribute__(self, name: str):
+        if name == "fqn" or name.startswith("_"):
+            return object.__getattribute__(self, name)
+
+        if name in self.__legacy_infra_apis():
+            return resource._empty_lambda
+
+        try:
+            return getattr(self._client, name)
+        except:
+            return object.__getattribute__(self, name)
+
+
+def bench(label: str, res: resource.IResource, number: int) -> float:
+    seconds = timeit.timeit(lambda: res.client_api(), number=number)
+    per_call_ns = seconds / number * 1e9
+    print(f"{label:<8} {per_call_ns:10.1f} ns/call")
+    return per_call_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    os.environ.pop("DEBUG", None)
+
+    before = bench("before", LegacyResource(), args.number)
+    after = bench("after", Resource(), args.number)
+    print(f"speedup  {before / after:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmark of the simulator client, in operations per second.
+
+It runs a sequence of KVStore `set` and `get` operations through the legacy client, which sent
+every operation with a standalone `requests.post`, and through `SimulatorClient` over HTTP and over
+the Unix domain socket, one call at a time and pipelined. By default, the operations are sent to a
+stub simulator started by the benchmark, which implements the protocol for a KVStore. Pass `--url`,
+`--socket` and `--resource-id` to target a KVStore of a simulator started by `pluto run` instead.
+
+Usage:
+    PYTHONPATH=$(pwd) python tests/bench_simulator_client.py [--ops N]
+        [--url URL --socket PATH --resource-id ID]
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+import requests
+
+from pluto_base import simulator
+
+
+store: Dict[str, Any] = {}
+
+
+def invoke(req: Dict[str, Any]) -> Dict[str, Any]:
+    if req["op"] == "set":
+        key, val = req["args"]
+        store[key] = val
+        return {"result": None}
+    elif req["op"] == "get":
+        return {"result": store.get(req["args"][0])}
+    return {"error": {"message": f"Method not found: {req['op']}"}}
+
+
+class StubSimulatorHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 is required for the connections to be kept alive. Nagle's algorithm is disabled, as
+    # Node.js does by default, otherwise the replies on a kept-alive connection would be delayed.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        req = json.loads(self.rfile.read(length))
+
+        if self.path == simulator.SIM_BATCH_PATH:
+            reply: Dict[str, Any] = {"results": [invoke(call) for call in req["calls"]]}
+        else:
+            reply = invoke(req)
+
+        body = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubSocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                return
+            (length,) = struct.unpack(">I", header)
+            req = json.loads(self.rfile.read(length))
+
+            if "calls" in req:
+                reply: Dict[str, Any] = {"results": [invoke(call) for call in req["calls"]]}
+            else:
+                reply = invoke(req)
+
+            payload = json.dumps(reply).encode("utf-8")
+            self.wfile.write(struct.pack(">I", len(payload)) + payload)
+
+
+class StubSocketServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    block_on_close = False
+
+
+class LegacySimulatorClient:
+    """The simulator client before the connections were pooled and the calls could be batched."""
+
+    def __init__(self, url, resourceId):
+        self._url = url
+        self._resourceId = resourceId
+
+    def __getattr__(self, op):
+        def function(*args):
+            body = {"resourceId": self._resourceId, "op": op, "args": args}
+            resp = requests.post(
+                self._url + simulator.SIM_HANDLE_PATH,
+                headers={"Content-Type": "application/json"},
+                data=json.dumps(body),
+            )
+            parsed = resp.json()
+            if "error" in parsed:
+                raise Exception(parsed["error"])
+            return parsed.get("result", None)
+
+        return function
+
+
+def bench(label: str, client: Any, ops: int, pipelined: bool = False) -> float:
+    start = time.perf_counter()
+    if pipelined:
+        with client.pipeline() as pipe:
+            for i in range(ops // 2):
+                pipe.set(f"key-{i}", f"value-{i}")
+                pipe.get(f"key-{i}")
+    else:
+        for i in range(ops // 2):
+            client.set(f"key-{i}", f"value-{i}")
+            client.get(f"key-{i}")
+    ops_per_sec = ops / (time.perf_counter() - start)
+    print(f"{label:<16} {ops_per_sec:10.0f} ops/s")
+    return ops_per_sec
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--url", help="The URL of a running simulator.")
+    parser.add_argument("--socket", help="The socket path of a running simulator.")
+    parser.add_argument("--resource-id", default="kvstore", help="The ID of a KVStore resource.")
+    args = parser.parse_args()
+
+    url, socket_path = args.url, args.socket
+    servers: List[socketserver.BaseServer] = []
+    tmpdir = tempfile.TemporaryDirectory()
+    if url is None:
+        http_server = ThreadingHTTPServer(("127.0.0.1", 0), StubSimulatorHandler)
+        url = f"http://127.0.0.1:{http_server.server_address[1]}"
+        socket_path = os.path.join(tmpdir.name, "simulator.sock")
+        servers = [http_server, StubSocketServer(socket_path, StubSocketHandler)]
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        bench("before", LegacySimulatorClient(url, args.resource_id), args.ops)
+
+        http_client = simulator.make_simulator_client(url, args.resource_id)
+        bench("http", http_client, args.ops)
+        bench("http+pipeline", http_client, args.ops, pipelined=True)
+
+        if socket_path:
+            socket_client = simulator.make_simulator_client(url, args.resource_id, socket_path)
+            bench("socket", socket_client, args.ops)
+            bench("socket+pipeline", socket_client, args.ops, pipelined=True)
+    finally:
+        for server in servers:
+            server.shutdown()
+        tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -75,3 +75,114 @@ def test_exec_client_api():
     result = r.client_api()
     assert isinstance(r.client_api, Callable)
     assert result == "client_api"
+
+
+def test_infra_apis_computed_once_per_class():
+    """
+    Test that the infrastructure APIs are computed once per resource class and shared by all of its
+    instances.
+    """
+    r1 = Resource()
+    r1.client_api()
+    infra_apis = resource._infra_apis_table[Resource]
+    assert infra_apis == frozenset(["infra_api_1", "infra_api_2"])
+
+    r2 = Resource()
+    r2.infra_api_1()
+    assert resource._infra_apis_table[Resource] is infra_apis
+
+
+def test_infra_iface_set_on_instance():
+    """
+    Test that an infrastructure interface set on an instance takes precedence over the one of the
+    class.
+    """
+
+    class InstanceInfraApi(resource.IResourceInfraApi):
+        def instance_infra_api(self) -> Any:
+            raise NotImplementedError
+
+    r = Resource()
+    r._infra_iface = InstanceInfraApi
+    assert r.instance_infra_api() is None
+    # No longer skipped, so the method of the class is called.
+    with pytest.raises(NotImplementedError):
+        r.infra_api_2(1)
+
+    # The other instances keep the interface of the class.
+    assert Resource().infra_api_1() is None
+
+
+def test_multiple_infra_ifaces():
+    """
+    Test to access an attribute of a resource that has multiple infrastructure interfaces. It should
+    raise a ValueError.
+    """
+
+    class AnotherInfraApi(resource.IResourceInfraApi):
+        pass
+
+    class MultiInfraResource(Resource, AnotherInfraApi):
+        pass
+
+    r = MultiInfraResource()
+    with pytest.raises(ValueError):
+        r.client_api()
+
+
+class CountingClient(ResourceClient):
+    def __init__(self, result: str):
+        self.result = result
+        self.lookups = 0
+
+    def __getattribute__(self, name: str):
+        if name == "client_api":
+            object.__setattr__(self, "lookups", object.__getattribute__(self, "lookups") + 1)
+        return super().__getattribute__(name)
+
+    def client_api(self) -> Any:
+        return self.result
+
+    @property
+    def prop(self) -> str:
+        return self.result
+
+
+class ResourceWithClient(resource.IResource, ResourceClient, ResourceInfra):
+    def __init__(self, client: ResourceClient):
+        self._client = client
+
+
+def test_client_api_resolved_once():
+    """
+    Test that a client API is resolved from the client only once, and then served from the cache.
+    """
+    client = CountingClient("first")
+    r = ResourceWithClient(client)
+
+    for _ in range(3):
+        assert r.client_api() == "first"
+    assert client.lookups == 1
+
+
+def test_client_attrs_invalidated_on_client_reassignment():
+    """
+    Test that the cached client attributes are dropped when the client is reassigned.
+    """
+    r = ResourceWithClient(CountingClient("first"))
+    assert r.client_api() == "first"
+
+    r._client = CountingClient("second")
+    assert r.client_api() == "second"
+
+
+def test_client_property_not_cached():
+    """
+    Test that the non-callable attributes of the client are resolved on every access.
+    """
+    client = CountingClient("first")
+    r = ResourceWithClient(client)
+    assert r.prop == "first"
+
+    client.result = "second"
+    assert r.prop == "second"
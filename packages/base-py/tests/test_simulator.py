@@ -0,0 +1,221 @@
+import json
+import os
+import socketserver
+import struct
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+import pytest
+from pluto_base import simulator
+
+
+store: Dict[str, Any] = {}
+batch_sizes: List[int] = []
+
+
+def invoke(req: Dict[str, Any]) -> Dict[str, Any]:
+    if req["op"] == "set":
+        key, val = req["args"]
+        store[key] = val
+        return {"result": None}
+    if req["op"] == "get":
+        key = req["args"][0]
+        if key not in store:
+            return {"error": {"message": f"There is no target key-value pair, Key: {key}."}}
+        return {"result": store[key]}
+    if req["op"] == "getMany":
+        keys = req["args"][0]
+        return {"result": {key: store[key] for key in keys if key in store}}
+    return {"error": {"message": f"Method not found: {req['op']}"}}
+
+
+class KVStoreSimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        req = json.loads(self.rfile.read(length))
+
+        if self.path == simulator.SIM_BATCH_PATH:
+            batch_sizes.append(len(req["calls"]))
+            reply: Dict[str, Any] = {"results": [invoke(call) for call in req["calls"]]}
+        else:
+            reply = invoke(req)
+
+        body = json.dumps(reply).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixStreamServer(socketserver.ThreadingUnixStreamServer):
+    # The clients keep their connections open, don't wait for them when closing the server.
+    daemon_threads = True
+    block_on_close = False
+
+
+class KVStoreSocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            header = self.rfile.read(4)
+            if len(header) < 4:
+                return
+            (length,) = struct.unpack(">I", header)
+            req = json.loads(self.rfile.read(length))
+
+            if "calls" in req:
+                reply: Dict[str, Any] = {"results": [invoke(call) for call in req["calls"]]}
+            else:
+                reply = invoke(req)
+
+            payload = json.dumps(reply).encode("utf-8")
+            self.wfile.write(struct.pack(">I", len(payload)) + payload)
+
+
+@pytest.fixture
+def simulator_url():
+    store.clear()
+    batch_sizes.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KVStoreSimulatorHandler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_call_op(simulator_url: str):
+    """
+    Test to call operations of a resource through the simulator client.
+    """
+    client = simulator.make_simulator_client(simulator_url, "kvstore")
+
+    client.set("key", "value")
+    assert client.get("key") == "value"
+    with pytest.raises(Exception):
+        client.get("missing")
+
+
+def test_pipeline(simulator_url: str):
+    """
+    Test to queue operations in a pipeline and send them in batches.
+    """
+    client = simulator.make_simulator_client(simulator_url, "kvstore")
+
+    with client.pipeline(max_batch_size=4) as pipe:
+        for i in range(5):
+            pipe.set(f"key-{i}", f"value-{i}")
+        call = pipe.get("key-3")
+        assert not call.done
+
+    assert call.result() == "value-3"
+    assert batch_sizes == [4, 2]
+    assert client.get("key-4") == "value-4"
+
+
+def test_pipeline_with_failed_call(simulator_url: str):
+    """
+    Test a pipeline in which an operation fails. The following operations should still be executed,
+    and the error should be raised on exit.
+    """
+    client = simulator.make_simulator_client(simulator_url, "kvstore")
+
+    with pytest.raises(Exception):
+        with client.pipeline() as pipe:
+            failed = pipe.get("missing")
+            pipe.set("key", "value")
+
+    with pytest.raises(Exception):
+        failed.result()
+    assert client.get("key") == "value"
+
+
+def test_result_before_flush(simulator_url: str):
+    """
+    Test to get the result of a pipelined call before the pipeline is flushed.
+    """
+    client = simulator.make_simulator_client(simulator_url, "kvstore")
+
+    pipe = client.pipeline()
+    call = pipe.set("key", "value")
+    with pytest.raises(RuntimeError):
+        call.result()
+
+    pipe.flush()
+    assert call.result() is None
+
+
+@pytest.fixture
+def simulator_socket():
+    store.clear()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        socket_path = os.path.join(tmpdir, "sim.sock")
+        server = UnixStreamServer(socket_path, KVStoreSocketHandler)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        yield socket_path
+        server.shutdown()
+        server.server_close()
+
+
+def test_call_op_through_socket(simulator_socket: str):
+    """
+    Test to call operations through the Unix domain socket of the simulator. The URL is unreachable,
+    so the calls can only succeed through the socket.
+    """
+    client = simulator.make_simulator_client("http://127.0.0.1:1", "kvstore", simulator_socket)
+
+    client.set("key", "value")
+    assert client.get("key") == "value"
+    with pytest.raises(Exception):
+        client.get("missing")
+
+    with client.pipeline() as pipe:
+        pipe.set("key-1", "value-1")
+        call = pipe.get("key-1")
+    assert call.result() == "value-1"
+
+
+def test_fallback_to_http(simulator_url: str):
+    """
+    Test that the client falls back to HTTP when the socket doesn't exist on this host.
+    """
+    client = simulator.make_simulator_client(simulator_url, "kvstore", "/nonexistent/sim.sock")
+
+    client.set("key", "value")
+    assert client.get("key") == "value"
+
+
+def test_op_names(simulator_url: str):
+    """
+    Test that the operations are sent under the names of the methods of the simulated resource.
+    """
+    client = simulator.make_simulator_client(
+        simulator_url, "kvstore", op_names={"get_many": "getMany"}
+    )
+    client.set("key-1", "value-1")
+    client.set("key-2", "value-2")
+
+    assert client.get_many(["key-1", "key-2", "missing"]) == {
+        "key-1": "value-1",
+        "key-2": "value-2",
+    }
+
+    with client.pipeline() as pipe:
+        call = pipe.get_many(["key-1"])
+    assert call.result() == {"key-1": "value-1"}
+
+
+def test_op_names_not_mapped(simulator_url: str):
+    """
+    Test that the operations without a mapped name are sent under their own names.
+    """
+    client = simulator.make_simulator_client(simulator_url, "kvstore")
+
+    with pytest.raises(Exception, match="Method not found: get_many"):
+        client.get_many(["key-1"])
@@ -1,2 +1,3 @@
 export * from "./create-closure";
 export * from "./types";
+export * from "./manifest";
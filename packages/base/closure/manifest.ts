@@ -0,0 +1,14 @@
+/**
+ * The file in the directory of a Python closure recording the hash of the inputs of its bundle. It's
+ * written by the Python deducer, and read by the infrastructure SDK, which skips the serialization
+ * of the closures that haven't changed. It's a hidden file, so the cleaning of the closure
+ * directory leaves it.
+ */
+export const BUNDLE_MANIFEST_FILE = ".pluto-bundle.json";
+
+/**
+ * The file in the directory of a Python closure listing the directories of the layers the closure
+ * depends on. It's written by the Python deducer, and read by the infrastructure SDK to attach the
+ * layers to the function.
+ */
+export const LAYER_MANIFEST_FILE = "pluto-layers.json";
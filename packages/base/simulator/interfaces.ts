@@ -14,4 +14,13 @@ export interface ServerResponse {
   readonly error?: any;
 }
 
+export interface BatchRequest {
+  calls: ServerRequest[];
+}
+
+export interface BatchResponse {
+  /** The replies of the calls, in the same order as the calls in the request. */
+  readonly results: ServerResponse[];
+}
+
 export type SimulatorCleint = any;
@@ -7,7 +7,13 @@ import * as pulumi from "@pulumi/pulumi";
 import { Role } from "@pulumi/aws/iam";
 import { Function as AwsLambda } from "@pulumi/aws/lambda";
 import { IResourceInfra, LanguageType, PlatformType } from "@plutolang/base";
-import { ComputeClosure, getDepth, isComputeClosure, wrapClosure } from "@plutolang/base/closure";
+import {
+  ComputeClosure,
+  LAYER_MANIFEST_FILE,
+  getDepth,
+  isComputeClosure,
+  wrapClosure,
+} from "@plutolang/base/closure";
 import {
   createEnvNameForProperty,
   currentLanguage,
@@ -24,9 +30,15 @@ import {
   Function as PlutoFunction,
 } from "@plutolang/pluto";
 import { genAwsResourceName } from "@plutolang/pluto/dist/clients/aws";
-import { dumpClosureToDir_python, serializeClosureToDir, getDefaultPythonRuntime } from "../utils";
+import {
+  dumpClosureToDir_python,
+  serializeClosureToDir,
+  getDefaultPythonRuntime,
+  hashClosure_python,
+} from "../utils";
 import { Permission } from "./permission";
 import { S3Bucket } from "./bucket.s3";
+import { adaptFunctionOptions, genAwsClientEnvs } from "./utils";
 
 export enum Ops {
   WATCH_LOG = "WATCH_LOG",
@@ -43,12 +55,15 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
   private readonly statements: aws.types.input.iam.GetPolicyDocumentStatementArgs[];
 
   public readonly lambdaName: string;
+  public readonly roleName: pulumi.Output<string>;
   public readonly lambdaArn: pulumi.Output<string>;
   public readonly lambdaInvokeArn: pulumi.Output<string>;
 
   public readonly outputs?: pulumi.Output<any> | string;
 
   private static lambdaAssetsBucket?: S3Bucket;
+  /** The layers created by this deployment, keyed by their directories. */
+  private static readonly layers: Map<string, aws.lambda.LayerVersion> = new Map();
 
   constructor(closure: ComputeClosure<AnyFunction>, name?: string, options: FunctionOptions = {}) {
     name = name ?? DEFAULT_FUNCTION_NAME;
@@ -57,7 +72,7 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
     if (!isComputeClosure(closure)) {
       throw new Error("This closure is invalid.");
     }
-    this.options = options;
+    this.options = adaptFunctionOptions(options);
 
     // Check if the closure is created by user directly or not. If yes, we need to wrap it with the
     // platform adaption function.
@@ -78,6 +93,7 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
     // Extract the environment variables from the closure.
     const envs: Record<string, any> = {
       ...options?.envs,
+      ...genAwsClientEnvs(this.options),
       PLUTO_PROJECT_NAME: currentProjectName(),
       PLUTO_STACK_NAME: currentStackName(),
       PLUTO_PLATFORM_TYPE: PlatformType.AWS,
@@ -96,8 +112,21 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
     // Serialize the closure with its dependencies to a directory.
     assert(process.env.WORK_DIR, "WORK_DIR is not set.");
     const workdir = path.join(process.env.WORK_DIR, "assets", `${this.id}`);
-    fs.rmSync(workdir, { recursive: true, force: true });
-    fs.ensureDirSync(workdir);
+    // The hash of the dumped closure is kept next to the directory, so it isn't archived.
+    const hashFile = `${workdir}.hash`;
+    const closureHash =
+      currentLanguage() === LanguageType.Python ? hashClosure_python(closure) : undefined;
+    const unchanged =
+      closureHash !== undefined &&
+      fs.existsSync(workdir) &&
+      fs.existsSync(hashFile) &&
+      fs.readFileSync(hashFile, "utf-8") === closureHash;
+    if (!unchanged) {
+      fs.rmSync(hashFile, { force: true });
+      fs.rmSync(workdir, { recursive: true, force: true });
+      fs.ensureDirSync(workdir);
+    }
+
     let entrypointFilePathP: Promise<string>;
     let runtime: string;
     if (currentLanguage() === LanguageType.TypeScript) {
@@ -106,7 +135,17 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
       });
       runtime = "nodejs18.x";
     } else if (currentLanguage() === LanguageType.Python) {
-      entrypointFilePathP = dumpClosureToDir_python(workdir, closure);
+      if (unchanged) {
+        // The closure is dumped the same as the last time, the directory is reused as it is.
+        entrypointFilePathP = Promise.resolve(path.join(workdir, "__init__.py"));
+      } else {
+        entrypointFilePathP = dumpClosureToDir_python(workdir, closure).then((entrypoint) => {
+          if (closureHash) {
+            fs.writeFileSync(hashFile, closureHash);
+          }
+          return entrypoint;
+        });
+      }
       runtime = getDefaultPythonRuntime();
     } else {
       throw new Error(`Unsupported language: ${currentLanguage()}`);
@@ -114,13 +153,19 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
 
     // Create the IAM role and lambda function.
     this.iam = this.createIAM();
+    this.roleName = this.iam.name;
     this.lambdaName = genAwsResourceName(this.id);
+    // The dependencies shared by the closures are installed once into layers by the deducer.
+    const layers =
+      currentLanguage() === LanguageType.Python ? this.getLayers(closure, runtime) : [];
     this.lambda = this.createLambda(
       workdir,
       entrypointFilePathP,
       runtime,
       closure.exportName,
-      envs
+      envs,
+      layers,
+      closureHash
     );
     this.lambdaUrl = this.createLambdaUrl();
     this.lambdaArn = this.lambda.arn;
@@ -178,7 +223,9 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
     entrypointFilePathP: Promise<string>,
     runtime: string,
     exportName: string,
-    envs: Record<string, any>
+    envs: Record<string, any>,
+    layers: pulumi.Output<string>[],
+    closureHash?: string
   ) {
     const handlerName = entrypointFilePathP.then((filepath) => {
       const filename = path.basename(filepath);
@@ -186,15 +233,13 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
       return `${prefix}.${exportName}`;
     });
 
-    if (Lambda.lambdaAssetsBucket === undefined) {
-      Lambda.lambdaAssetsBucket = new S3Bucket("lambda-assets");
-    }
-
-    const lambdaAssetName = genAwsResourceName(this.id, Date.now().toString());
+    // The asset is named after the hash of the closure if any, so the code of an unchanged closure
+    // is neither uploaded nor updated again. Otherwise, it's uploaded on every deployment.
+    const lambdaAssetName = genAwsResourceName(this.id, closureHash ?? Date.now().toString());
     function upload(): pulumi.Output<string> {
       const lambdaZip = new pulumi.asset.FileArchive(workdir);
       const object = new aws.s3.BucketObjectv2(lambdaAssetName, {
-        bucket: Lambda.lambdaAssetsBucket!.bucket.bucket,
+        bucket: Lambda.assetsBucket().bucket.bucket,
         source: lambdaZip,
       });
       return object.key;
@@ -204,7 +249,7 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
       this.lambdaName,
       {
         name: this.lambdaName,
-        s3Bucket: Lambda.lambdaAssetsBucket!.bucket.bucket,
+        s3Bucket: Lambda.assetsBucket().bucket.bucket,
         s3Key: pulumi.output(entrypointFilePathP).apply(upload),
         role: this.iam.arn,
         handler: handlerName,
@@ -214,11 +259,57 @@ export class Lambda extends pulumi.ComponentResource implements IResourceInfra,
           variables: envs,
         },
         timeout: 10 * 60,
+        layers: layers,
       },
       { parent: this }
     );
   }
 
+  /**
+   * Get the ARNs of the layers listed in the manifests of the closure and its inner closures,
+   * creating the layers not created yet by the other functions.
+   */
+  private getLayers(closure: ComputeClosure<AnyFunction>, runtime: string) {
+    const layerDirs = new Set<string>();
+    let current: ComputeClosure<AnyFunction> | undefined = closure;
+    while (current) {
+      const manifestPath = path.join(current.dirpath, LAYER_MANIFEST_FILE);
+      if (fs.existsSync(manifestPath)) {
+        const manifest: { layers: string[] } = fs.readJsonSync(manifestPath);
+        manifest.layers.forEach((dir) => layerDirs.add(dir));
+      }
+      current = current.innerClosure;
+    }
+
+    return Array.from(layerDirs).map((layerDir) => {
+      let layer = Lambda.layers.get(layerDir);
+      if (layer === undefined) {
+        // The name of the directory is the hash of its content, so the layer is only replaced when
+        // its content changes.
+        const layerName = path.basename(layerDir);
+        const object = new aws.s3.BucketObjectv2(genAwsResourceName("layer", layerName), {
+          bucket: Lambda.assetsBucket().bucket.bucket,
+          source: new pulumi.asset.FileArchive(layerDir),
+        });
+        layer = new aws.lambda.LayerVersion(genAwsResourceName("layer", layerName), {
+          layerName: genAwsResourceName(currentProjectName(), currentStackName(), layerName),
+          s3Bucket: Lambda.assetsBucket().bucket.bucket,
+          s3Key: object.key,
+          compatibleRuntimes: [runtime],
+        });
+        Lambda.layers.set(layerDir, layer);
+      }
+      return layer.arn;
+    });
+  }
+
+  private static assetsBucket(): S3Bucket {
+    if (Lambda.lambdaAssetsBucket === undefined) {
+      Lambda.lambdaAssetsBucket = new S3Bucket("lambda-assets");
+    }
+    return Lambda.lambdaAssetsBucket;
+  }
+
   private createLambdaUrl() {
     return new aws.lambda.FunctionUrl(
       genAwsResourceName(this.id, "url"),
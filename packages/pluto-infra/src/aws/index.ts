@@ -1,6 +1,7 @@
 export { ApiGatewayRouter } from "./router.apigateway";
 export { DynamoKVStore } from "./kvstore.dynamodb";
 export { SNSQueue } from "./queue.sns";
+export { SQSQueue } from "./queue.sqs";
 export { Lambda } from "./function.lambda";
 export { CloudWatchSchedule } from "./schedule.cloudwatch";
 export { AwsTester } from "./tester";
@@ -9,6 +9,11 @@ import { genAwsResourceName } from "@plutolang/pluto/dist/clients/aws";
 export enum DynamoDbOps {
   GET = "get",
   SET = "set",
+  GET_MANY = "get_many",
+  SET_MANY = "set_many",
+  SCAN = "scan",
+  INCR = "incr",
+  SET_IF = "set_if",
 }
 
 export class DynamoKVStore
@@ -48,9 +53,14 @@ export class DynamoKVStore
     const actions: string[] = [];
     switch (op) {
       case DynamoDbOps.GET:
+      case DynamoDbOps.GET_MANY:
+      case DynamoDbOps.SCAN:
         actions.push("dynamodb:*");
         break;
       case DynamoDbOps.SET:
+      case DynamoDbOps.SET_MANY:
+      case DynamoDbOps.INCR:
+      case DynamoDbOps.SET_IF:
         actions.push("dynamodb:*");
         break;
       default:
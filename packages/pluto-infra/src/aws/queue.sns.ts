@@ -9,19 +9,24 @@ import { CloudEvent, EventHandler, IQueueInfra, Queue, QueueOptions } from "@plu
 import { genAwsResourceName } from "@plutolang/pluto/dist/clients/aws";
 import { Lambda } from "./function.lambda";
 import { Permission } from "./permission";
+import { adaptQueueOptions, genQueueSubscriberEnvs } from "./utils";
 
 export enum SNSOps {
   PUSH = "push",
+  PUSH_MANY = "pushMany",
+  PUSH_MANY_PY = "push_many",
 }
 
 export class SNSQueue extends pulumi.ComponentResource implements IResourceInfra, IQueueInfra {
   public readonly id: string;
 
   private readonly topic: aws.sns.Topic;
+  private readonly options?: QueueOptions;
 
   constructor(name: string, options?: QueueOptions) {
     super("pluto:queue:aws/SNS", name, options);
     this.id = genResourceId(Queue.fqn, name);
+    this.options = adaptQueueOptions(options);
 
     this.topic = new aws.sns.Topic(
       genAwsResourceName(this.id),
@@ -38,7 +43,8 @@ export class SNSQueue extends pulumi.ComponentResource implements IResourceInfra
     }
 
     const awsHandler = adaptPlatformNorm(closure);
-    const lambda = new Lambda(awsHandler, /* name */ `${this.id}-func`);
+    const envs = genQueueSubscriberEnvs(this.options);
+    const lambda = new Lambda(awsHandler, /* name */ `${this.id}-func`, { envs });
 
     // create topic subscription
     new aws.sns.TopicSubscription(
@@ -68,6 +74,9 @@ export class SNSQueue extends pulumi.ComponentResource implements IResourceInfra
     const actions = [];
     switch (op) {
       case SNSOps.PUSH:
+      case SNSOps.PUSH_MANY:
+      case SNSOps.PUSH_MANY_PY:
+        // PublishBatch is authorized by the same action as Publish.
         actions.push("SNS:Publish");
         break;
       default:
@@ -0,0 +1,161 @@
+import { join } from "path";
+import * as aws from "@pulumi/aws";
+import * as pulumi from "@pulumi/pulumi";
+import { IResourceInfra, LanguageType } from "@plutolang/base";
+import { currentLanguage, genResourceId } from "@plutolang/base/utils";
+import { ComputeClosure, isComputeClosure, wrapClosure } from "@plutolang/base/closure";
+import { EventHandler, IQueueInfra, Queue, QueueOptions } from "@plutolang/pluto";
+import { genAwsResourceName } from "@plutolang/pluto/dist/clients/aws";
+import { Lambda } from "./function.lambda";
+import { Permission } from "./permission";
+import { adaptQueueOptions, genQueueSubscriberEnvs } from "./utils";
+
+export enum SQSOps {
+  PUSH = "push",
+  PUSH_MANY = "push_many",
+}
+
+const DEFAULT_BATCH_SIZE = 10;
+/** Beyond this batch size, SQS requires a batching window. */
+const MAX_BATCH_SIZE_WITHOUT_WINDOW = 10;
+const MAX_BATCH_SIZE = 10000;
+const MAX_BATCH_WINDOW = 300;
+
+/**
+ * The visibility timeout of the queue. It has to be longer than the timeout of the subscriber, which
+ * is 10 minutes, otherwise a message could be received again while it's still being handled.
+ */
+const VISIBILITY_TIMEOUT = 6 * 10 * 60;
+
+/**
+ * The queue backed by AWS SQS. The subscriber is invoked by an event source mapping, which polls
+ * the queue and passes the messages in batches.
+ */
+export class SQSQueue extends pulumi.ComponentResource implements IResourceInfra, IQueueInfra {
+  public readonly id: string;
+
+  private readonly queue: aws.sqs.Queue;
+  private readonly options?: QueueOptions;
+
+  constructor(name: string, options?: QueueOptions) {
+    super("pluto:queue:aws/SQS", name, options);
+    this.id = genResourceId(Queue.fqn, name);
+    this.options = adaptQueueOptions(options);
+
+    const batchSize = this.options?.sqsBatchSize ?? DEFAULT_BATCH_SIZE;
+    const batchWindow = this.options?.sqsBatchWindow ?? 0;
+    if (batchSize <= 0 || batchSize > MAX_BATCH_SIZE) {
+      throw new Error(`The SQS batch size of '${name}' should be between 1 and ${MAX_BATCH_SIZE}.`);
+    }
+    if (batchWindow < 0 || batchWindow > MAX_BATCH_WINDOW) {
+      throw new Error(
+        `The SQS batching window of '${name}' should be between 0 and ${MAX_BATCH_WINDOW} seconds.`
+      );
+    }
+    if (batchSize > MAX_BATCH_SIZE_WITHOUT_WINDOW && batchWindow < 1) {
+      throw new Error(
+        `The SQS batching window of '${name}' should be at least 1 second, since the batch size is greater than ${MAX_BATCH_SIZE_WITHOUT_WINDOW}.`
+      );
+    }
+    const maxConcurrency = this.options?.sqsMaxConcurrency;
+    if (maxConcurrency !== undefined && (maxConcurrency < 2 || maxConcurrency > 1000)) {
+      throw new Error(`The SQS maximum concurrency of '${name}' should be between 2 and 1000.`);
+    }
+
+    this.queue = new aws.sqs.Queue(
+      genAwsResourceName(this.id),
+      {
+        name: genAwsResourceName(this.id),
+        visibilityTimeoutSeconds: VISIBILITY_TIMEOUT,
+      },
+      { parent: this }
+    );
+  }
+
+  public subscribe(closure: ComputeClosure<EventHandler>): void {
+    if (!isComputeClosure(closure)) {
+      throw new Error("This closure is invalid.");
+    }
+
+    const awsHandler = adaptPlatformNorm(closure);
+    const envs = genQueueSubscriberEnvs(this.options);
+    const lambda = new Lambda(awsHandler, /* name */ `${this.id}-func`, { envs });
+
+    // The event source mapping polls the queue with the role of the function. The mapping can only
+    // be created once the role is allowed to poll.
+    const pollPolicy = new aws.iam.RolePolicy(
+      genAwsResourceName(this.id, "poll-policy"),
+      {
+        role: lambda.roleName,
+        policy: this.queue.arn.apply((arn) =>
+          JSON.stringify({
+            Version: "2012-10-17",
+            Statement: [
+              {
+                Effect: "Allow",
+                Action: [
+                  "sqs:ReceiveMessage",
+                  "sqs:DeleteMessage",
+                  "sqs:ChangeMessageVisibility",
+                  "sqs:GetQueueAttributes",
+                ],
+                Resource: arn,
+              },
+            ],
+          })
+        ),
+      },
+      { parent: this }
+    );
+
+    const maxConcurrency = this.options?.sqsMaxConcurrency;
+    new aws.lambda.EventSourceMapping(
+      genAwsResourceName(this.id, "mapping"),
+      {
+        eventSourceArn: this.queue.arn,
+        functionName: lambda.lambdaName,
+        batchSize: this.options?.sqsBatchSize ?? DEFAULT_BATCH_SIZE,
+        maximumBatchingWindowInSeconds: this.options?.sqsBatchWindow ?? 0,
+        scalingConfig: maxConcurrency ? { maximumConcurrency: maxConcurrency } : undefined,
+        // Only the failed messages of a batch are returned to the queue.
+        functionResponseTypes: ["ReportBatchItemFailures"],
+      },
+      { parent: this, dependsOn: [lambda, pollPolicy] }
+    );
+  }
+
+  public grantPermission(op: string): Permission {
+    const actions = [];
+    switch (op) {
+      case SQSOps.PUSH:
+      case SQSOps.PUSH_MANY:
+        // SendMessageBatch is authorized by the same action as SendMessage. The clients look up the
+        // URL of the queue by its name.
+        actions.push("sqs:SendMessage", "sqs:GetQueueUrl");
+        break;
+      default:
+        throw new Error(`Unknown operation: ${op}`);
+    }
+
+    return {
+      effect: "Allow",
+      actions: actions,
+      resources: [this.queue.arn],
+    };
+  }
+
+  public postProcess() {}
+}
+
+function adaptPlatformNorm(closure: ComputeClosure<EventHandler>): ComputeClosure<any> {
+  switch (currentLanguage()) {
+    case LanguageType.Python:
+      return wrapClosure(() => {}, closure, {
+        dirpath: join(__dirname, "sqs_subscriber_adapter.py"),
+        exportName: "handler",
+        placeholder: "__handler_",
+      });
+    default:
+      throw new Error(`The SQS queue doesn't support the language: ${currentLanguage()}`);
+  }
+}
@@ -1,25 +1,32 @@
 import json
 import os
-from typing import Any, Callable
+from typing import Any, Callable, List
 from pluto_client import CloudEvent
+from pluto_client.clients.shared.queue_subscriber import handle_events
 
 
 def handler(event: Any, context: Any):
     account_id = context.invoked_function_arn.split(":")[4]
     os.environ["AWS_ACCOUNT_ID"] = account_id
 
+    events: List[CloudEvent] = []
     for record in event["Records"]:
         if "Sns" not in record:
             raise ValueError(f"Unsupported event type {json.dumps(record)}")
 
         payload = record["Sns"]["Message"]
         data = json.loads(payload)
-        cloud_event = CloudEvent(timestamp=data["timestamp"], data=data["data"])
-        if os.environ.get("DEBUG"):
-            print("Pluto: Handling event: ", cloud_event)
+        events.append(CloudEvent(timestamp=data["timestamp"], data=data["data"]))
+    if os.environ.get("DEBUG"):
+        print("Pluto: Handling events: ", events)
 
-        try:
-            user_handler: Callable[[CloudEvent], None] = globals()["__handler_"]
-            user_handler(cloud_event)
-        except Exception as e:
-            print("Pluto: Failed to handle event: ", cloud_event, e)
+    user_handler: Callable[..., None] = globals()["__handler_"]
+    failures = handle_events(user_handler, events)
+    if failures:
+        # Fail the invocation, so the platform retries it and sends it to the dead-letter queue once
+        # the retries are exhausted.
+        index, error = failures[0]
+        raise RuntimeError(
+            f"Failed to handle {len(failures)} of {len(events)} events, "
+            f"the first failed one is: {events[index]}"
+        ) from error
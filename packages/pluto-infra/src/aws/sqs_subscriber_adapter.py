@@ -0,0 +1,32 @@
+import json
+import os
+from typing import Any, Callable, Dict, List
+from pluto_client import CloudEvent
+from pluto_client.clients.shared.queue_subscriber import handle_events
+
+
+def handler(event: Any, context: Any) -> Dict[str, Any]:
+    account_id = context.invoked_function_arn.split(":")[4]
+    os.environ["AWS_ACCOUNT_ID"] = account_id
+
+    message_ids: List[str] = []
+    events: List[CloudEvent] = []
+    for record in event["Records"]:
+        if record.get("eventSource") != "aws:sqs":
+            raise ValueError(f"Unsupported event type {json.dumps(record)}")
+
+        try:
+            data = json.loads(record["body"])
+            events.append(CloudEvent(timestamp=data["timestamp"], data=data["data"]))
+            message_ids.append(record["messageId"])
+        except Exception as e:
+            # Not sent by Pluto, so it can never be handled. It's dropped with the rest of the
+            # batch, instead of being received again and again until it expires.
+            print("Pluto: Dropped a message that failed to parse: ", record["body"], e)
+    if os.environ.get("DEBUG"):
+        print("Pluto: Handling events: ", events)
+
+    user_handler: Callable[..., None] = globals()["__handler_"]
+    failures = handle_events(user_handler, events)
+    # Only the failed messages are returned to the queue, the rest of the batch is deleted.
+    return {"batchItemFailures": [{"itemIdentifier": message_ids[index]} for index, _ in failures]}
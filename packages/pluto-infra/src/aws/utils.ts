@@ -1,4 +1,5 @@
 import * as pulumi from "@pulumi/pulumi";
+import { FunctionOptions, QueueOptions } from "@plutolang/pluto";
 
 export function currentAwsRegion(): string {
   const awsConfig = new pulumi.Config("aws");
@@ -13,3 +14,94 @@ export function currentAwsRegion(): string {
   }
   return region;
 }
+
+/**
+ * The settings of the AWS SDK clients in the function options, with their Python-style names and
+ * the environment variables the Python clients read them from.
+ */
+const AWS_CLIENT_OPTIONS: Record<string, [string, string]> = {
+  awsMaxPoolConnections: ["aws_max_pool_connections", "PLUTO_AWS_MAX_POOL_CONNECTIONS"],
+  awsTcpKeepalive: ["aws_tcp_keepalive", "PLUTO_AWS_TCP_KEEPALIVE"],
+  awsConnectTimeout: ["aws_connect_timeout", "PLUTO_AWS_CONNECT_TIMEOUT"],
+  awsReadTimeout: ["aws_read_timeout", "PLUTO_AWS_READ_TIMEOUT"],
+  awsRetryMode: ["aws_retry_mode", "PLUTO_AWS_RETRY_MODE"],
+  awsMaxAttempts: ["aws_max_attempts", "PLUTO_AWS_MAX_ATTEMPTS"],
+};
+
+/**
+ * Adapts the options of a function to the correct names for TypeScript.
+ * The option names for TypeScript and Python are different, so this function converts Python-style
+ * option names to TypeScript-style option names.
+ *
+ * @param opts - The options object that may contain Python-style option names.
+ * @returns The adapted options object with TypeScript-style option names.
+ */
+export function adaptFunctionOptions(opts: any): FunctionOptions {
+  for (const [name, [pythonName]] of Object.entries(AWS_CLIENT_OPTIONS)) {
+    if (opts[pythonName] !== undefined && opts[pythonName] !== null) {
+      opts[name] = opts[pythonName];
+    }
+  }
+  return opts;
+}
+
+/**
+ * Build the environment variables of a function, from which the Python clients read the settings
+ * of the AWS SDK clients.
+ */
+export function genAwsClientEnvs(options: FunctionOptions): Record<string, string> {
+  const envs: Record<string, string> = {};
+  for (const [name, [, envName]] of Object.entries(AWS_CLIENT_OPTIONS)) {
+    const value = (options as any)[name];
+    if (value !== undefined && value !== null) {
+      envs[envName] = `${value}`;
+    }
+  }
+  return envs;
+}
+
+/**
+ * Adapts the options of a queue to the correct names for TypeScript.
+ * The option names for TypeScript and Python are different, so this function converts Python-style
+ * option names to TypeScript-style option names.
+ *
+ * @param opts - The options object that may contain Python-style option names.
+ * @returns The adapted options object with TypeScript-style option names.
+ */
+export function adaptQueueOptions(opts?: any): QueueOptions | undefined {
+  if (opts === undefined) {
+    return;
+  }
+
+  if (opts.batch_handler) {
+    opts.batchHandler = opts.batch_handler;
+  }
+  if (opts.handler_concurrency) {
+    opts.handlerConcurrency = opts.handler_concurrency;
+  }
+  if (opts.sqs_batch_size) {
+    opts.sqsBatchSize = opts.sqs_batch_size;
+  }
+  if (opts.sqs_batch_window) {
+    opts.sqsBatchWindow = opts.sqs_batch_window;
+  }
+  if (opts.sqs_max_concurrency) {
+    opts.sqsMaxConcurrency = opts.sqs_max_concurrency;
+  }
+  return opts;
+}
+
+/**
+ * Build the environment variables of the subscriber of a queue, from which the Python adapter reads
+ * the handling options.
+ */
+export function genQueueSubscriberEnvs(options?: QueueOptions): Record<string, string> {
+  const envs: Record<string, string> = {};
+  if (options?.batchHandler) {
+    envs["PLUTO_QUEUE_BATCH_HANDLER"] = "true";
+  }
+  if (options?.handlerConcurrency) {
+    envs["PLUTO_QUEUE_HANDLER_CONCURRENCY"] = `${options.handlerConcurrency}`;
+  }
+  return envs;
+}
@@ -38,6 +38,11 @@ export abstract class Queue {
     name: string,
     options?: QueueOptions
   ): Promise<IQueueInfraImpl> {
+    if (utils.currentPlatformType() === PlatformType.AWS && options?.service === "SQS") {
+      const klass = (await import("./aws")).SQSQueue;
+      return new klass(name, options);
+    }
+
     return implClassMap.createInstanceOrThrow(
       utils.currentPlatformType(),
       utils.currentEngineType(),
@@ -1,7 +1,3 @@
-import * as os from "os";
-import * as path from "path";
-import * as fs from "fs-extra";
-import { PythonShell } from "python-shell";
 import { IResourceInfra, LanguageType } from "@plutolang/base";
 import {
   AnyFunction,
@@ -12,10 +8,12 @@ import {
 } from "@plutolang/pluto";
 import { ComputeClosure } from "@plutolang/base/closure";
 import { currentLanguage, genResourceId } from "@plutolang/base/utils";
+import { PythonWorkerPool } from "./python-worker";
 
 export class SimFunction implements IResourceInfra, IFunctionClient<AnyFunction>, IFunctionInfra {
   public readonly id: string;
   private readonly closure: ComputeClosure<AnyFunction>;
+  private pythonPool?: PythonWorkerPool;
 
   constructor(handler: ComputeClosure<AnyFunction>, name?: string, options?: FunctionOptions) {
     this.id = genResourceId(Function.fqn, name ?? "default");
@@ -35,7 +33,9 @@ export class SimFunction implements IResourceInfra, IFunctionClient<AnyFunction>
     throw new Error("Method should not be called.");
   }
 
-  public async cleanup(): Promise<void> {}
+  public async cleanup(): Promise<void> {
+    await this.pythonPool?.close();
+  }
 
   public async invoke(...payload: any[]): Promise<any> {
     if (currentLanguage() === LanguageType.TypeScript) {
@@ -47,104 +47,14 @@ export class SimFunction implements IResourceInfra, IFunctionClient<AnyFunction>
     }
   }
 
-  // Craft a Python script to run the encapsulated function.
   private async executePythonBundle(...payload: any[]) {
-    const closureBase = path.dirname(this.closure.dirpath);
-    const closureName = path.basename(this.closure.dirpath);
-    const args = payload.map((arg) => JSON.stringify(arg));
-
-    const handlerText = PY_HANDLER_TEMPLATE.replaceAll("{CLOSURE_BASE}", closureBase)
-      .replaceAll("{CLOSURE_NAME}", closureName)
-      .replaceAll("{EXPORT_NAME}", this.closure.exportName)
-      .replaceAll("{ARGS}", args.join(", "));
-
-    const tempdir = fs.mkdtempSync(path.join(os.tmpdir(), this.id));
-    const tempfile = path.join(tempdir, "handler.py");
-    fs.writeFileSync(tempfile, handlerText);
-
-    const result = await executePythonFile(tempfile);
-    if (result === "None") {
-      return;
-    } else {
-      return JSON.parse(result ?? "");
+    // The workers import the closure once, and then serve the invocations until they're recycled.
+    if (!this.pythonPool) {
+      this.pythonPool = new PythonWorkerPool(this.closure.dirpath, this.closure.exportName);
     }
+    return await this.pythonPool.invoke(...payload);
   }
 
   public grantPermission() {}
   public postProcess(): void {}
 }
-
-function executePythonFile(filepath: string): Promise<string | undefined> {
-  return new Promise((resolve, reject) => {
-    const pyshell = new PythonShell(filepath, { mode: "text", pythonOptions: ["-u"] });
-
-    let resultMessage: string | undefined;
-    pyshell.on("message", function (message) {
-      // received a message sent from the Python script (a simple "print" statement)
-      if (message.startsWith("PLUTO_PYTHON_RESULT: ")) {
-        resultMessage = message.replace("PLUTO_PYTHON_RESULT: ", "");
-      } else {
-        console.log(message);
-      }
-    });
-
-    // end the input stream and allow the process to exit
-    pyshell.end(function (err, code, signal) {
-      if (err) {
-        reject(err);
-      }
-
-      if (code !== 0) {
-        reject(`The exit code was: ${code}, the signal was: ${signal}`);
-      }
-
-      resolve(resultMessage);
-    });
-  });
-}
-
-const PY_HANDLER_TEMPLATE = `
-import sys
-import json
-import types
-
-
-def is_jsonable(x):
-  try:
-    json.dumps(x)
-    return True
-  except (TypeError, OverflowError):
-    return False
-
-
-def process_args(args):
-  processed_args = []
-  for arg in args:
-    if isinstance(arg, dict):
-      processed_args.append(types.SimpleNamespace(**arg))
-    else:
-      processed_args.append(arg)
-  return processed_args
-
-
-def serialize_result(result):
-  if result is None:
-    return "None"
-  elif is_jsonable(result):
-    return json.dumps(result)
-  elif "__dict__" in dir(result):
-    return json.dumps(result.__dict__)
-  else:
-    return str(result)
-
-
-sys.path.insert(0, "{CLOSURE_BASE}")
-sys.path.insert(0, "{CLOSURE_BASE}/{CLOSURE_NAME}")
-sys.path.insert(0, "{CLOSURE_BASE}/{CLOSURE_NAME}/site-packages")
-from {CLOSURE_NAME} import {EXPORT_NAME}
-
-args = process_args([{ARGS}])
-result = {EXPORT_NAME}(*args)
-
-print(f"PLUTO_PYTHON_RESULT: {serialize_result(result)}")
-`;
@@ -0,0 +1,230 @@
+import * as path from "path";
+import * as fs from "fs-extra";
+import * as readline from "readline";
+
+const SNAPSHOT_FILE = "snapshot.ndjson";
+const LOG_FILE_PATTERN = /^log-(\d+)\.ndjson$/;
+
+/**
+ * The minimum number of records in the logs before a compaction is started. Beyond it, the logs
+ * are compacted once they hold more records than the number of keys in the table.
+ */
+const COMPACTION_MIN_RECORDS = 10000;
+
+/** The size of the chunks written to the snapshot file. */
+const SNAPSHOT_CHUNK_SIZE = 1 << 20;
+
+type LogRecord = ["set", string, any];
+
+interface SnapshotHeader {
+  generation: number;
+}
+
+/**
+ * Persist the entries of a simulated KVStore in a directory, so that they outlive the simulator.
+ *
+ * Every change is appended to a log file as a line of JSON. Once the logs hold more records than
+ * the table has keys, they are compacted in the background: a new log is started, the table is
+ * written to a snapshot, and the logs covered by the snapshot are removed. On startup, the table is
+ * restored from the snapshot and the logs written after it.
+ *
+ * The files of the directory are:
+ * - `snapshot.ndjson`: a header line with the generation of the first log not covered by the
+ *   snapshot, followed by one `[key, value]` line per entry.
+ * - `log-<generation>.ndjson`: one record line per change. A new generation is started on each
+ *   startup and each compaction, so a log never has to be appended after a torn write.
+ */
+export class KVStoreLog {
+  private fd?: number;
+  private generation = 0;
+  private records = 0;
+  private pending: string[] = [];
+  private flushScheduled = false;
+  private compaction?: Promise<void>;
+
+  constructor(private readonly dir: string) {}
+
+  /**
+   * Restore the entries persisted in the directory into the table, and start a new log for the
+   * following changes.
+   */
+  public async open(table: Map<string, any>): Promise<void> {
+    await fs.ensureDir(this.dir);
+
+    let firstGeneration = 0;
+    const snapshotPath = path.join(this.dir, SNAPSHOT_FILE);
+    if (await fs.pathExists(snapshotPath)) {
+      let header: SnapshotHeader | undefined;
+      await readLines(snapshotPath, (line) => {
+        if (header === undefined) {
+          header = JSON.parse(line);
+        } else {
+          const [key, value] = JSON.parse(line);
+          table.set(key, value);
+        }
+      });
+      firstGeneration = header?.generation ?? 0;
+    }
+
+    let lastGeneration = firstGeneration;
+    for (const generation of await this.listGenerations()) {
+      const logPath = this.logPath(generation);
+      if (generation < firstGeneration) {
+        // Covered by the snapshot, left behind by an interrupted compaction.
+        await fs.remove(logPath);
+        continue;
+      }
+
+      await readLines(logPath, (line, last) => {
+        let record: LogRecord;
+        try {
+          record = JSON.parse(line);
+        } catch (e) {
+          if (last) {
+            // The simulator stopped in the middle of a write, the change is lost.
+            return;
+          }
+          throw new Error(`The KVStore log '${logPath}' is corrupted: ${e}`);
+        }
+        this.apply(table, record);
+        this.records++;
+      });
+      lastGeneration = generation;
+    }
+
+    this.generation = lastGeneration + 1;
+  }
+
+  public set(key: string, value: any) {
+    this.append(["set", key, value]);
+  }
+
+  /**
+   * Compact the logs in the background if they have grown bigger than the table.
+   */
+  public maybeCompact(table: Map<string, any>) {
+    if (this.compaction || this.records < Math.max(COMPACTION_MIN_RECORDS, table.size)) {
+      return;
+    }
+
+    this.compaction = this.compact(table)
+      .catch((e) => console.error(`Failed to compact the KVStore log in '${this.dir}':`, e))
+      .finally(() => (this.compaction = undefined));
+  }
+
+  public async close(): Promise<void> {
+    await this.compaction;
+    this.flush();
+    this.closeLog();
+  }
+
+  private append(record: LogRecord) {
+    this.pending.push(JSON.stringify(record) + "\n");
+    this.records++;
+    // Write the changes made in the same tick together.
+    if (!this.flushScheduled) {
+      this.flushScheduled = true;
+      setImmediate(() => this.flush());
+    }
+  }
+
+  private flush() {
+    this.flushScheduled = false;
+    if (this.pending.length === 0) {
+      return;
+    }
+    // The log is created on the first write, so the restarts without changes leave no empty logs.
+    this.fd ??= fs.openSync(this.logPath(this.generation), "a");
+    fs.writeSync(this.fd, this.pending.join(""));
+    this.pending = [];
+  }
+
+  private apply(table: Map<string, any>, record: LogRecord) {
+    const [op, key, value] = record;
+    switch (op) {
+      case "set":
+        table.set(key, value);
+        break;
+      default:
+        throw new Error(`Unknown operation '${op}' in the KVStore log.`);
+    }
+  }
+
+  private async compact(table: Map<string, any>): Promise<void> {
+    // Switch to a new log, the snapshot covers all the changes made before it.
+    const generation = this.generation + 1;
+    this.flush();
+    this.closeLog();
+    this.generation = generation;
+    this.records = 0;
+
+    const entries = Array.from(table);
+    const tmpPath = path.join(this.dir, `${SNAPSHOT_FILE}.tmp`);
+    const file = await fs.promises.open(tmpPath, "w");
+    try {
+      let chunk = JSON.stringify({ generation } as SnapshotHeader) + "\n";
+      for (const entry of entries) {
+        chunk += JSON.stringify(entry) + "\n";
+        if (chunk.length >= SNAPSHOT_CHUNK_SIZE) {
+          await file.write(chunk);
+          chunk = "";
+        }
+      }
+      await file.write(chunk);
+      await file.sync();
+    } finally {
+      await file.close();
+    }
+    await fs.rename(tmpPath, path.join(this.dir, SNAPSHOT_FILE));
+
+    for (const old of await this.listGenerations()) {
+      if (old < generation) {
+        await fs.remove(this.logPath(old));
+      }
+    }
+  }
+
+  private closeLog() {
+    if (this.fd !== undefined) {
+      fs.closeSync(this.fd);
+      this.fd = undefined;
+    }
+  }
+
+  private async listGenerations(): Promise<number[]> {
+    const generations: number[] = [];
+    for (const file of await fs.readdir(this.dir)) {
+      const matched = LOG_FILE_PATTERN.exec(file);
+      if (matched) {
+        generations.push(parseInt(matched[1]));
+      }
+    }
+    return generations.sort((a, b) => a - b);
+  }
+
+  private logPath(generation: number): string {
+    return path.join(this.dir, `log-${generation}.ndjson`);
+  }
+}
+
+/**
+ * Read the lines of a file one by one, without loading the whole file into memory.
+ */
+async function readLines(filepath: string, onLine: (line: string, last: boolean) => void) {
+  const lines = readline.createInterface({
+    input: fs.createReadStream(filepath, { encoding: "utf-8" }),
+    crlfDelay: Infinity,
+  });
+
+  // Hold back one line to tell the callback whether it's the last one.
+  let previous: string | undefined;
+  for await (const line of lines) {
+    if (previous !== undefined) {
+      onLine(previous, false);
+    }
+    previous = line.length > 0 ? line : undefined;
+  }
+  if (previous !== undefined) {
+    onLine(previous, true);
+  }
+}
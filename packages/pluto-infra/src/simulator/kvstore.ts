@@ -1,17 +1,56 @@
+import * as path from "path";
+import { isDeepStrictEqual } from "util";
 import { IResourceInfra } from "@plutolang/base";
 import { genResourceId } from "@plutolang/base/utils";
 import { IKVStoreClient, IKVStoreInfra, KVStore, KVStoreOptions } from "@plutolang/pluto";
+import { KVStoreLog } from "./kvstore-log";
+
+/**
+ * Adapts the options to the correct names for TypeScript.
+ * The option names for TypeScript and Python are different, so this function converts Python-style
+ * option names to TypeScript-style option names.
+ *
+ * @param opts - The options object that may contain Python-style option names.
+ * @returns The adapted options object with TypeScript-style option names.
+ */
+function adaptOptions(opts?: any): KVStoreOptions | undefined {
+  if (opts === undefined) {
+    return;
+  }
+
+  if (opts.sim_persistent) {
+    opts.simPersistent = opts.sim_persistent;
+  }
+  return opts;
+}
 
 export class SimKVStore implements IResourceInfra, IKVStoreClient, IKVStoreInfra {
   public readonly id: string;
 
   private readonly table: Map<string, any>;
+  private readonly log?: KVStoreLog;
+  /** The keys in ascending order, built on the first scan and maintained from then on. */
+  private sortedKeys?: string[];
 
   constructor(name: string, opts?: KVStoreOptions) {
+    opts = adaptOptions(opts);
+
     this.id = genResourceId(KVStore.fqn, name);
     this.table = new Map();
-    name;
-    opts;
+
+    if (opts?.simPersistent) {
+      if (!process.env.WORK_DIR) {
+        throw new Error("WORK_DIR is not set, the KVStore cannot be persisted.");
+      }
+      this.log = new KVStoreLog(path.join(process.env.WORK_DIR, "simulator", "kvstore", this.id));
+    }
+  }
+
+  public async init() {
+    if (this.log) {
+      await this.log.open(this.table);
+      this.log.maybeCompact(this.table);
+    }
   }
 
   public addEventHandler(op: string, args: any[]): void {
@@ -20,7 +59,9 @@ export class SimKVStore implements IResourceInfra, IKVStoreClient, IKVStoreInfra
     throw new Error("Method should not be called.");
   }
 
-  public async cleanup(): Promise<void> {}
+  public async cleanup(): Promise<void> {
+    await this.log?.close();
+  }
 
   public async get(key: string): Promise<string> {
     if (!this.table.has(key)) {
@@ -30,9 +71,138 @@ export class SimKVStore implements IResourceInfra, IKVStoreClient, IKVStoreInfra
   }
 
   public async set(key: string, val: string): Promise<void> {
+    this.write(key, val);
+  }
+
+  /**
+   * Get the values of multiple keys in bulk, for the `get_many` of the Python clients. The keys that
+   * don't exist are left out of the returned object.
+   */
+  public async getMany(keys: string[]): Promise<Record<string, string>> {
+    const result: Record<string, string> = {};
+    for (const key of keys) {
+      if (this.table.has(key)) {
+        result[key] = this.table.get(key);
+      }
+    }
+    return result;
+  }
+
+  /**
+   * Set the values of multiple keys in bulk, for the `set_many` of the Python clients.
+   */
+  public async setMany(items: Record<string, string>): Promise<void> {
+    for (const [key, val] of Object.entries(items)) {
+      this.put(key, val);
+      this.log?.set(key, val);
+    }
+    this.log?.maybeCompact(this.table);
+  }
+
+  /**
+   * Atomically add the delta to the numeric value of the key, for the `incr` of the Python clients.
+   * A key that doesn't exist starts from 0.
+   */
+  public async incr(key: string, delta: number = 1): Promise<number> {
+    const current = this.table.has(key) ? this.table.get(key) : 0;
+    if (typeof current !== "number") {
+      throw new Error(`The value of the key '${key}' is not a number.`);
+    }
+    const value = current + delta;
+    this.write(key, value);
+    return value;
+  }
+
+  /**
+   * Set the value of the key only if its current value equals the expected one, for the `set_if` of
+   * the Python clients. If the expected value is null, the key must not exist.
+   */
+  public async setIf(key: string, val: string, expected?: string | null): Promise<boolean> {
+    // The Python clients may store the objects with the JSON codec, so they're compared by value.
+    const matched =
+      expected == null ? !this.table.has(key) : isDeepStrictEqual(this.table.get(key), expected);
+    if (matched) {
+      this.write(key, val);
+    }
+    return matched;
+  }
+
+  /**
+   * Get a page of the entries in the order of their keys, for the clients to scan the KVStore.
+   *
+   * @param prefix - Only the keys starting with the prefix are returned, if provided.
+   * @param startAfter - The page starts after this key, or from the first key if not provided.
+   * @param limit - The maximum number of entries in the page.
+   * @returns The entries of the page, and the key to start the next page after, if there are more.
+   */
+  public async scanPage(
+    prefix: string | null,
+    startAfter: string | null,
+    limit: number
+  ): Promise<{ items: [string, any][]; lastKey?: string }> {
+    if (limit <= 0) {
+      throw new Error("The page size should be greater than 0.");
+    }
+    if (this.sortedKeys === undefined) {
+      this.sortedKeys = Array.from(this.table.keys()).sort(compareKeys);
+    }
+    const keys = this.sortedKeys;
+
+    prefix = prefix ?? "";
+    let i = lowerBound(keys, startAfter !== null && startAfter >= prefix ? startAfter : prefix);
+    if (i < keys.length && keys[i] === startAfter) {
+      i++;
+    }
+
+    const items: [string, any][] = [];
+    for (; i < keys.length && items.length < limit && keys[i].startsWith(prefix); i++) {
+      items.push([keys[i], this.table.get(keys[i])]);
+    }
+
+    const more = i < keys.length && keys[i].startsWith(prefix);
+    return { items, lastKey: more ? items[items.length - 1][0] : undefined };
+  }
+
+  /**
+   * Write the value of the key. It's done synchronously, so the read-modify-write operations are
+   * atomic.
+   */
+  private write(key: string, val: any) {
+    this.put(key, val);
+    if (this.log) {
+      this.log.set(key, val);
+      this.log.maybeCompact(this.table);
+    }
+  }
+
+  private put(key: string, val: any) {
+    if (this.sortedKeys !== undefined && !this.table.has(key)) {
+      this.sortedKeys.splice(lowerBound(this.sortedKeys, key), 0, key);
+    }
     this.table.set(key, val);
   }
 
   public grantPermission(): void {}
   public postProcess(): void {}
 }
+
+function compareKeys(a: string, b: string): number {
+  return a < b ? -1 : a > b ? 1 : 0;
+}
+
+/**
+ * Find the index of the first key that is not less than the target in the sorted keys.
+ */
+function lowerBound(keys: string[], target: string): number {
+  let lo = 0;
+  let hi = keys.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (keys[mid] < target) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+}
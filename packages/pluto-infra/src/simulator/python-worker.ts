@@ -0,0 +1,368 @@
+import * as os from "os";
+import * as path from "path";
+import * as fs from "fs-extra";
+import { ChildProcess, spawn } from "child_process";
+import { PythonShell } from "python-shell";
+
+/**
+ * The key of the envelope wrapping a batch of events passed to a Python batch handler. The events
+ * in it are converted to objects like the single events, while the other lists are passed as they
+ * are.
+ */
+export const BATCH_ENVELOPE_KEY = "__pluto_batch__";
+
+/** The size of the header of a frame, which holds the length of the payload. */
+const FRAME_HEADER_SIZE = 4;
+
+/**
+ * The number of worker processes kept for each closure. It can be overridden by the
+ * `PLUTO_SIMULATOR_PY_WORKERS` environment variable.
+ */
+const DEFAULT_POOL_SIZE = Math.max(1, Math.min(4, os.cpus().length));
+
+/**
+ * The number of invocations a worker serves before it's replaced by a fresh one, which bounds the
+ * memory leaked by the user code. It can be overridden by the
+ * `PLUTO_SIMULATOR_PY_WORKER_MAX_INVOCATIONS` environment variable, and 0 disables the recycling.
+ */
+const DEFAULT_MAX_INVOCATIONS = 1000;
+
+export interface PythonWorkerPoolOptions {
+  /** The maximum number of worker processes serving the closure concurrently. */
+  size?: number;
+  /** The number of invocations a worker serves before it's recycled, 0 means never. */
+  maxInvocations?: number;
+}
+
+interface WorkerReply {
+  result?: any;
+  error?: { name: string; message: string; stack: string };
+}
+
+/**
+ * A Python process that imports the closure once and then serves the invocations sent to it. The
+ * invocations and their replies are frames of a 4-byte big-endian length followed by a UTF-8
+ * encoded JSON payload, sent through the stdin and stdout of the process. The worker redirects the
+ * output of the user code to stderr, which is forwarded to the console.
+ */
+class PythonWorker {
+  public invocations = 0;
+
+  private readonly proc: ChildProcess;
+  private exited = false;
+  private buffered = Buffer.alloc(0);
+  private pending?: { resolve: (reply: WorkerReply) => void; reject: (e: Error) => void };
+
+  constructor(scriptPath: string, closureDir: string, exportName: string) {
+    const closureBase = path.dirname(closureDir);
+    const closureName = path.basename(closureDir);
+    this.proc = spawn(
+      PythonShell.defaultPythonPath,
+      ["-u", scriptPath, closureBase, closureName, exportName],
+      { stdio: ["pipe", "pipe", "pipe"] }
+    );
+
+    this.proc.stdout!.on("data", (chunk: Buffer) => this.onData(chunk));
+    this.proc.stderr!.setEncoding("utf-8");
+    this.proc.stderr!.on("data", (text: string) => {
+      // Keep the output of the user code visible, as it was when every invocation had its own
+      // interpreter.
+      process.stdout.write(text);
+    });
+    // The failed writes are reported by the exit of the process.
+    this.proc.stdin!.on("error", () => {});
+    this.proc.on("error", (e) => this.onExit(e));
+    this.proc.on("exit", (code, signal) => {
+      const reason = `the exit code was: ${code}, the signal was: ${signal}`;
+      this.onExit(new Error(`The Python worker exited, ${reason}`));
+    });
+  }
+
+  public get alive(): boolean {
+    return !this.exited;
+  }
+
+  public invoke(args: any[]): Promise<WorkerReply> {
+    if (this.exited) {
+      return Promise.reject(new Error("The Python worker has exited."));
+    }
+    if (this.pending) {
+      return Promise.reject(new Error("The Python worker is busy."));
+    }
+
+    this.invocations++;
+    return new Promise((resolve, reject) => {
+      this.pending = { resolve, reject };
+      const payload = Buffer.from(JSON.stringify({ args }), "utf-8");
+      const header = Buffer.alloc(FRAME_HEADER_SIZE);
+      header.writeUInt32BE(payload.length, 0);
+      this.proc.stdin!.write(Buffer.concat([header, payload]));
+    });
+  }
+
+  public kill() {
+    if (!this.exited) {
+      // Closing the stdin lets the worker exit on its own, the signal is for the busy ones.
+      this.proc.stdin!.end();
+      this.proc.kill();
+    }
+  }
+
+  private onData(chunk: Buffer) {
+    this.buffered = this.buffered.length === 0 ? chunk : Buffer.concat([this.buffered, chunk]);
+    while (this.buffered.length >= FRAME_HEADER_SIZE) {
+      const length = this.buffered.readUInt32BE(0);
+      if (this.buffered.length < FRAME_HEADER_SIZE + length) {
+        break;
+      }
+
+      const payload = this.buffered.subarray(FRAME_HEADER_SIZE, FRAME_HEADER_SIZE + length);
+      this.buffered = this.buffered.subarray(FRAME_HEADER_SIZE + length);
+
+      const pending = this.pending;
+      this.pending = undefined;
+      try {
+        pending?.resolve(JSON.parse(payload.toString("utf-8")));
+      } catch (e) {
+        // The stream can't be resynchronized after a malformed frame.
+        pending?.reject(new Error(`Received a malformed frame from the Python worker: ${e}`));
+        this.kill();
+        return;
+      }
+    }
+  }
+
+  private onExit(e: Error) {
+    this.exited = true;
+    const pending = this.pending;
+    this.pending = undefined;
+    pending?.reject(e);
+  }
+}
+
+/**
+ * A pool of Python worker processes for one closure. The workers are started on demand, and each
+ * serves one invocation at a time, so the pool size bounds the concurrency of the closure. The
+ * invocations beyond it wait for a worker to become idle.
+ */
+export class PythonWorkerPool {
+  private readonly size: number;
+  private readonly maxInvocations: number;
+
+  private readonly workers: Set<PythonWorker> = new Set();
+  private readonly idle: PythonWorker[] = [];
+  private readonly waiters: {
+    resolve: (worker: PythonWorker) => void;
+    reject: (error: Error) => void;
+  }[] = [];
+  private closed = false;
+
+  constructor(
+    private readonly closureDir: string,
+    private readonly exportName: string,
+    options?: PythonWorkerPoolOptions
+  ) {
+    this.size =
+      options?.size ?? parseInt(process.env.PLUTO_SIMULATOR_PY_WORKERS ?? `${DEFAULT_POOL_SIZE}`);
+    this.maxInvocations =
+      options?.maxInvocations ??
+      parseInt(
+        process.env.PLUTO_SIMULATOR_PY_WORKER_MAX_INVOCATIONS ?? `${DEFAULT_MAX_INVOCATIONS}`
+      );
+    if (!(this.size > 0)) {
+      throw new Error(`The size of the Python worker pool should be greater than 0.`);
+    }
+  }
+
+  public async invoke(...args: any[]): Promise<any> {
+    const worker = await this.acquire();
+    let reply: WorkerReply;
+    try {
+      reply = await worker.invoke(args);
+    } finally {
+      this.release(worker);
+    }
+
+    if (reply.error) {
+      const error = new Error(reply.error.message);
+      error.name = reply.error.name;
+      error.stack = reply.error.stack;
+      throw error;
+    }
+    return reply.result ?? undefined;
+  }
+
+  public async close(): Promise<void> {
+    this.closed = true;
+    for (const worker of this.workers) {
+      worker.kill();
+    }
+    this.workers.clear();
+    this.idle.length = 0;
+
+    // The callers waiting for a worker would never get one.
+    for (const waiter of this.waiters.splice(0)) {
+      waiter.reject(new Error("The Python worker pool has been closed."));
+    }
+  }
+
+  private acquire(): Promise<PythonWorker> {
+    if (this.closed) {
+      return Promise.reject(new Error("The Python worker pool has been closed."));
+    }
+
+    while (this.idle.length > 0) {
+      const worker = this.idle.pop()!;
+      if (worker.alive) {
+        return Promise.resolve(worker);
+      }
+      this.workers.delete(worker);
+    }
+
+    if (this.workers.size < this.size) {
+      return Promise.resolve(this.spawn());
+    }
+    return new Promise((resolve, reject) => this.waiters.push({ resolve, reject }));
+  }
+
+  private release(worker: PythonWorker) {
+    if (this.closed) {
+      return;
+    }
+
+    if (!worker.alive || (this.maxInvocations > 0 && worker.invocations >= this.maxInvocations)) {
+      worker.kill();
+      this.workers.delete(worker);
+      // Hand a fresh worker to the next waiter, if any.
+      const waiter = this.waiters.shift();
+      waiter?.resolve(this.spawn());
+      return;
+    }
+
+    const waiter = this.waiters.shift();
+    if (waiter) {
+      waiter.resolve(worker);
+    } else {
+      this.idle.push(worker);
+    }
+  }
+
+  private spawn(): PythonWorker {
+    const worker = new PythonWorker(workerScriptPath(), this.closureDir, this.exportName);
+    this.workers.add(worker);
+    return worker;
+  }
+}
+
+let scriptDir: string | undefined;
+
+/**
+ * Write the worker script into a temporary directory once per process. The directory is removed
+ * when the process exits.
+ */
+function workerScriptPath(): string {
+  if (!scriptDir) {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), "pluto-py-worker-"));
+    fs.writeFileSync(path.join(dir, "worker.py"), PY_WORKER_SCRIPT);
+    process.once("exit", () => fs.removeSync(dir));
+    scriptDir = dir;
+  }
+  return path.join(scriptDir, "worker.py");
+}
+
+const PY_WORKER_SCRIPT = `
+import os
+import sys
+import json
+import types
+import struct
+import importlib
+import traceback
+
+FRAME_HEADER = struct.Struct(">I")
+BATCH_ENVELOPE_KEY = "${BATCH_ENVELOPE_KEY}"
+
+
+def is_jsonable(x):
+  try:
+    json.dumps(x)
+    return True
+  except (TypeError, OverflowError):
+    return False
+
+
+def process_args(args):
+  processed_args = []
+  for arg in args:
+    if isinstance(arg, dict) and list(arg.keys()) == [BATCH_ENVELOPE_KEY]:
+      # A batch of events delivered by a simulated queue to a batch handler.
+      processed_args.append([types.SimpleNamespace(**evt) for evt in arg[BATCH_ENVELOPE_KEY]])
+    elif isinstance(arg, dict):
+      processed_args.append(types.SimpleNamespace(**arg))
+    else:
+      processed_args.append(arg)
+  return processed_args
+
+
+def serialize_result(result):
+  if result is None or is_jsonable(result):
+    return result
+  elif "__dict__" in dir(result):
+    return result.__dict__
+  else:
+    return str(result)
+
+
+def read_exactly(stream, size):
+  buf = bytearray()
+  while len(buf) < size:
+    chunk = stream.read(size - len(buf))
+    if not chunk:
+      return None
+    buf += chunk
+  return bytes(buf)
+
+
+def main(closure_base, closure_name, export_name):
+  # The frames are written to the original stdout, and the output of the user code goes to stderr,
+  # so a print can't corrupt the stream.
+  proto_in = sys.stdin.buffer
+  proto_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb", buffering=0)
+  os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+  sys.path.insert(0, closure_base)
+  sys.path.insert(0, os.path.join(closure_base, closure_name))
+  sys.path.insert(0, os.path.join(closure_base, closure_name, "site-packages"))
+  handler = getattr(importlib.import_module(closure_name), export_name)
+
+  while True:
+    header = read_exactly(proto_in, FRAME_HEADER.size)
+    if header is None:
+      return
+    (length,) = FRAME_HEADER.unpack(header)
+    body = read_exactly(proto_in, length)
+    if body is None:
+      # The frame is truncated, the pool is closed while writing it.
+      return
+    request = json.loads(body)
+
+    try:
+      result = handler(*process_args(request["args"]))
+      reply = {"result": serialize_result(result)}
+    except Exception as e:
+      traceback.print_exc()
+      reply = {
+        "error": {
+          "name": type(e).__name__,
+          "message": str(e),
+          "stack": traceback.format_exc(),
+        }
+      }
+
+    payload = json.dumps(reply).encode("utf-8")
+    proto_out.write(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+if __name__ == "__main__":
+  main(*sys.argv[1:4])
+`;
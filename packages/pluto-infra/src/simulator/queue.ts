@@ -1,6 +1,6 @@
-import { IResourceInfra } from "@plutolang/base";
+import { IResourceInfra, LanguageType } from "@plutolang/base";
 import { ComputeClosure } from "@plutolang/base/closure";
-import { genResourceId } from "@plutolang/base/utils";
+import { currentLanguage, genResourceId } from "@plutolang/base/utils";
 import {
   Queue,
   CloudEvent,
@@ -8,22 +8,94 @@ import {
   IQueueClient,
   IQueueInfra,
   QueueOptions,
+  QueuePushFailure,
 } from "@plutolang/pluto";
 import { SimFunction } from "./function";
+import { BATCH_ENVELOPE_KEY } from "./python-worker";
 
+const DEFAULT_BUFFER_SIZE = 1000;
+const DEFAULT_BATCH_SIZE = 1;
+const DEFAULT_BATCH_WINDOW = 0;
+const DEFAULT_CONCURRENCY = 4;
+const DEFAULT_PUSH_TIMEOUT = 30 * 1000;
+
+/**
+ * Adapts the options to the correct names for TypeScript.
+ * The option names for TypeScript and Python are different, so this function converts Python-style
+ * option names to TypeScript-style option names.
+ *
+ * @param opts - The options object that may contain Python-style option names.
+ * @returns The adapted options object with TypeScript-style option names.
+ */
+function adaptOptions(opts?: any): QueueOptions | undefined {
+  if (opts === undefined) {
+    return;
+  }
+
+  if (opts.batch_handler) {
+    opts.batchHandler = opts.batch_handler;
+  }
+  if (opts.sim_buffer_size) {
+    opts.simBufferSize = opts.sim_buffer_size;
+  }
+  if (opts.sim_batch_size) {
+    opts.simBatchSize = opts.sim_batch_size;
+  }
+  if (opts.sim_batch_window) {
+    opts.simBatchWindow = opts.sim_batch_window;
+  }
+  if (opts.sim_concurrency) {
+    opts.simConcurrency = opts.sim_concurrency;
+  }
+  if (opts.sim_push_timeout) {
+    opts.simPushTimeout = opts.sim_push_timeout;
+  }
+  return opts;
+}
+
+/**
+ * An in-memory queue. The pushed messages are buffered, and a dispatcher delivers them to the
+ * subscriber in the background, so the producer doesn't wait for the subscriber to handle them,
+ * just like with SNS and Lambda. When the buffer is full, the pushes wait until there is room.
+ */
 export class SimQueue implements IResourceInfra, IQueueInfra, IQueueClient {
   public readonly id: string;
 
   public readonly topicName: string;
-  private readonly messages: CloudEvent[];
   private subscriber?: SimFunction;
 
+  private readonly bufferSize: number;
+  private readonly batchSize: number;
+  private readonly batchWindow: number;
+  private readonly concurrency: number;
+  private readonly pushTimeout: number;
+  private readonly batchHandler: boolean;
+
+  private readonly buffer: CloudEvent[] = [];
+  /** The pushes waiting for room in the buffer. */
+  private readonly spaceWaiters: (() => void)[] = [];
+  /** The batches being delivered to the subscriber. */
+  private readonly deliveries: Set<Promise<void>> = new Set();
+  private windowTimer?: NodeJS.Timeout;
+  private stopped = false;
+
   constructor(name: string, opts?: QueueOptions) {
-    this.id = genResourceId(Queue.fqn, name);
+    opts = adaptOptions(opts);
 
+    this.id = genResourceId(Queue.fqn, name);
     this.topicName = name;
-    this.messages = [];
-    opts;
+
+    this.bufferSize = opts?.simBufferSize ?? DEFAULT_BUFFER_SIZE;
+    this.batchSize = opts?.simBatchSize ?? DEFAULT_BATCH_SIZE;
+    this.batchWindow = opts?.simBatchWindow ?? DEFAULT_BATCH_WINDOW;
+    this.concurrency = opts?.simConcurrency ?? DEFAULT_CONCURRENCY;
+    this.pushTimeout = opts?.simPushTimeout ?? DEFAULT_PUSH_TIMEOUT;
+    this.batchHandler = opts?.batchHandler ?? false;
+    if (this.bufferSize <= 0 || this.batchSize <= 0 || this.concurrency <= 0) {
+      throw new Error(
+        `The buffer size, batch size and concurrency of '${name}' should be greater than 0.`
+      );
+    }
   }
 
   public subscribe(subscriber: ComputeClosure<EventHandler>): void {
@@ -33,19 +105,146 @@ export class SimQueue implements IResourceInfra, IQueueInfra, IQueueClient {
     this.subscriber = new SimFunction(subscriber);
   }
 
-  public async cleanup(): Promise<void> {}
+  public async cleanup(): Promise<void> {
+    this.stopped = true;
+    clearTimeout(this.windowTimer);
+    this.spaceWaiters.splice(0).forEach((wake) => wake());
+
+    await Promise.all(this.deliveries);
+    if (this.buffer.length > 0 && process.env.DEBUG) {
+      console.log(`Dropped ${this.buffer.length} undelivered messages of '${this.topicName}'.`);
+    }
+    this.buffer.length = 0;
+    await this.subscriber?.cleanup();
+  }
 
   public async push(msg: string): Promise<void> {
-    const evt: CloudEvent = {
-      timestamp: Date.now(),
-      data: msg,
-    };
-    this.messages.push(evt);
+    if (!this.subscriber) {
+      throw new Error("No subscriber for message queue.");
+    }
+
+    while (this.buffer.length >= this.bufferSize && !this.stopped) {
+      await this.waitForSpace();
+    }
+    if (this.stopped) {
+      throw new Error(`The message queue '${this.topicName}' has been stopped.`);
+    }
+
+    this.buffer.push({ timestamp: Date.now(), data: msg });
+    this.dispatch();
+  }
 
+  public async pushMany(msgs: string[]): Promise<QueuePushFailure[]> {
     if (!this.subscriber) {
       throw new Error("No subscriber for message queue.");
     }
-    await this.subscriber.invoke(evt);
+
+    // The messages are buffered in order. Once the buffer stays full for longer than the push
+    // timeout, the remaining messages are reported as failed instead of waiting any longer.
+    const deadline = Date.now() + this.pushTimeout;
+    const failures: QueuePushFailure[] = [];
+    for (let index = 0; index < msgs.length; index++) {
+      while (this.buffer.length >= this.bufferSize && !this.stopped) {
+        const remaining = deadline - Date.now();
+        if (remaining <= 0 || !(await this.waitForSpace(remaining))) {
+          break;
+        }
+      }
+
+      if (this.stopped) {
+        failures.push({
+          index,
+          code: "QueueStopped",
+          reason: `The message queue '${this.topicName}' has been stopped.`,
+        });
+      } else if (this.buffer.length >= this.bufferSize) {
+        failures.push({
+          index,
+          code: "Timeout",
+          reason: `Timed out after ${this.pushTimeout} ms waiting for room in the buffer.`,
+        });
+      } else {
+        this.buffer.push({ timestamp: Date.now(), data: msgs[index] });
+        this.dispatch();
+      }
+    }
+    return failures;
+  }
+
+  /**
+   * Wait until a batch is taken out of the buffer or the queue is stopped.
+   *
+   * @param timeout - The maximum time in milliseconds to wait, no limit if not provided.
+   * @returns Whether it was woken up before the timeout.
+   */
+  private waitForSpace(timeout?: number): Promise<boolean> {
+    return new Promise<boolean>((resolve) => {
+      let timer: NodeJS.Timeout | undefined;
+      const wake = () => {
+        clearTimeout(timer);
+        resolve(true);
+      };
+      if (timeout !== undefined) {
+        timer = setTimeout(() => {
+          const waiter = this.spaceWaiters.indexOf(wake);
+          if (waiter >= 0) {
+            this.spaceWaiters.splice(waiter, 1);
+          }
+          resolve(false);
+        }, timeout);
+      }
+      this.spaceWaiters.push(wake);
+    });
+  }
+
+  /**
+   * Start delivering the buffered messages, as long as the concurrency allows. A partial batch is
+   * held back until the batching window elapses, unless `force` is set.
+   */
+  private dispatch(force: boolean = false) {
+    while (!this.stopped && this.deliveries.size < this.concurrency && this.buffer.length > 0) {
+      if (!force && this.buffer.length < this.batchSize && this.batchWindow > 0) {
+        this.windowTimer ??= setTimeout(() => {
+          this.windowTimer = undefined;
+          this.dispatch(true);
+        }, this.batchWindow);
+        return;
+      }
+
+      const batch = this.buffer.splice(0, this.batchSize);
+      this.spaceWaiters.splice(0, batch.length).forEach((wake) => wake());
+      this.deliver(batch);
+    }
+  }
+
+  private deliver(batch: CloudEvent[]) {
+    const delivery = (async () => {
+      if (this.batchHandler) {
+        try {
+          // The Python worker only converts the events of an explicit batch into objects, the
+          // other lists are passed as they are.
+          const payload =
+            currentLanguage() === LanguageType.Python ? { [BATCH_ENVELOPE_KEY]: batch } : batch;
+          await this.subscriber!.invoke(payload);
+        } catch (e) {
+          console.error(`Failed to deliver a batch of '${this.topicName}' to the subscriber:`, e);
+        }
+        return;
+      }
+
+      for (const evt of batch) {
+        try {
+          await this.subscriber!.invoke(evt);
+        } catch (e) {
+          // Like SNS, the failure is not reported to the producer.
+          console.error(`Failed to deliver a message of '${this.topicName}' to the subscriber:`, e);
+        }
+      }
+    })().finally(() => {
+      this.deliveries.delete(delivery);
+      this.dispatch();
+    });
+    this.deliveries.add(delivery);
   }
 
   public grantPermission(): void {}
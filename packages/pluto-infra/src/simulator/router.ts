@@ -46,6 +46,7 @@ export class SimRouter implements IResourceInfra, IRouterInfra, IRouterClient {
   private httpServer?: http.Server;
   private host: string;
   private port: number;
+  private readonly functions: SimFunction[] = [];
 
   public outputs?: string;
 
@@ -127,6 +128,7 @@ export class SimRouter implements IResourceInfra, IRouterInfra, IRouterClient {
     const closure = args[1] as ComputeClosure<RequestHandler>;
 
     const func = new SimFunction(closure);
+    this.functions.push(func);
 
     this.expressApp![method](
       path,
@@ -157,6 +159,7 @@ export class SimRouter implements IResourceInfra, IRouterInfra, IRouterClient {
     if (this.httpServer) {
       this.httpServer.close();
     }
+    await Promise.all(this.functions.map((func) => func.cleanup()));
   }
 
   public grantPermission() {}
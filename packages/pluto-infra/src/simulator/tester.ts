@@ -33,7 +33,9 @@ export class SimTester implements IResourceInfra, ITesterClient, ITesterInfra {
     this.testFnMap[description] = new SimFunction(closure);
   }
 
-  public async cleanup(): Promise<void> {}
+  public async cleanup(): Promise<void> {
+    await Promise.all(Object.values(this.testFnMap).map((func) => func.cleanup()));
+  }
 
   public async listTests(): Promise<TestCase[]> {
     return this.testCases;
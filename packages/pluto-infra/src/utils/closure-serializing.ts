@@ -1,7 +1,13 @@
 import * as fs from "fs-extra";
 import * as path from "path";
+import { createHash } from "crypto";
 import * as pulumi from "@pulumi/pulumi";
-import { ComputeClosure, Dependency, isComputeClosure } from "@plutolang/base/closure";
+import {
+  BUNDLE_MANIFEST_FILE,
+  ComputeClosure,
+  Dependency,
+  isComputeClosure,
+} from "@plutolang/base/closure";
 import { AnyFunction } from "@plutolang/pluto";
 
 interface NestedDependencies {
@@ -196,6 +202,56 @@ var __handler_ = async (...args) => {
   fs.writeFileSync(entrypointFilePath, userClosureImportStat + entrypointFileContent);
 }
 
+/**
+ * The version of the layout dumped by `dumpClosureToDir_python`. Bump it when the dumped content
+ * changes, so the closures dumped by the previous versions aren't reused.
+ */
+const DUMP_FORMAT_VERSION = 1;
+
+/**
+ * Hash a Python closure and its inner closures, from the content of the file closures and the
+ * bundle manifests of the directory closures. The hash is the same as long as the closures dump the
+ * same content, so the dumping and the uploading of the unchanged closures can be skipped.
+ *
+ * The dump format version and the version of this package are hashed as well, so the closures are
+ * dumped again once the SDK is upgraded.
+ *
+ * @returns The hash, or undefined if a directory closure has no bundle manifest.
+ */
+export function hashClosure_python(closure: ComputeClosure<AnyFunction>): string | undefined {
+  const hash = createHash("sha256");
+  hash.update(JSON.stringify([DUMP_FORMAT_VERSION, getPackageVersion()]));
+  let current: ComputeClosure<AnyFunction> | undefined = closure;
+  while (current) {
+    hash.update(JSON.stringify([current.exportName, current.placeholder ?? null]));
+    if (current.dirpath === "inline") {
+      return;
+    }
+
+    if (fs.statSync(current.dirpath).isDirectory()) {
+      const manifestPath = path.join(current.dirpath, BUNDLE_MANIFEST_FILE);
+      if (!fs.existsSync(manifestPath)) {
+        return;
+      }
+      hash.update(fs.readJsonSync(manifestPath).hash);
+    } else {
+      hash.update(fs.readFileSync(current.dirpath));
+    }
+    current = current.innerClosure;
+  }
+  return hash.digest("hex").slice(0, 16);
+}
+
+let packageVersion: string | undefined;
+
+function getPackageVersion(): string {
+  if (packageVersion === undefined) {
+    // The same relative path from both `src/utils` and `dist/utils`.
+    packageVersion = fs.readJsonSync(path.resolve(__dirname, "../../package.json")).version;
+  }
+  return packageVersion!;
+}
+
 export async function dumpClosureToDir_python(
   workdir: string,
   closure: ComputeClosure<AnyFunction>,
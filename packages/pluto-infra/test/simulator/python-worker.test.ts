@@ -0,0 +1,65 @@
+import os from "os";
+import path from "path";
+import fs from "fs-extra";
+import { afterAll, beforeAll, describe, expect, test } from "vitest";
+import { BATCH_ENVELOPE_KEY, PythonWorkerPool } from "../../src/simulator/python-worker";
+
+const SLOW_HANDLER = `
+import time
+
+
+def handler(seconds):
+    time.sleep(seconds)
+    return seconds
+`;
+
+const DESCRIBE_HANDLER = `
+def describe(arg):
+    if isinstance(arg, list):
+        return [describe(item) for item in arg]
+    return type(arg).__name__
+`;
+
+let basedir: string;
+beforeAll(() => {
+  basedir = fs.mkdtempSync(path.join(os.tmpdir(), "pluto-infra-test-py-worker-"));
+});
+
+afterAll(() => {
+  fs.removeSync(basedir);
+});
+
+describe("Python worker pool", () => {
+  test("should reject the callers waiting for a worker once closed", async () => {
+    const closureDir = path.join(basedir, "slow_closure");
+    fs.outputFileSync(path.join(closureDir, "__init__.py"), SLOW_HANDLER);
+
+    const pool = new PythonWorkerPool(closureDir, "handler", { size: 1 });
+    const running = pool.invoke(5);
+    // The only worker is busy, so this caller waits for it.
+    const waiting = pool.invoke(0);
+
+    await pool.close();
+    await expect(waiting).rejects.toThrow("closed");
+    await running.catch(() => {});
+  }, /* timeout */ 30000);
+
+  test("should pass a list payload as it is", async () => {
+    const closureDir = path.join(basedir, "describe_closure");
+    fs.outputFileSync(path.join(closureDir, "__init__.py"), DESCRIBE_HANDLER);
+
+    const pool = new PythonWorkerPool(closureDir, "describe", { size: 1 });
+    try {
+      // A dict is converted to an object, but the dicts in a plain list are kept as dicts.
+      expect(await pool.invoke({ a: 1 })).toBe("SimpleNamespace");
+      expect(await pool.invoke([{ a: 1 }, { b: 2 }])).toEqual(["dict", "dict"]);
+      // Only the events of a batch envelope are converted.
+      expect(await pool.invoke({ [BATCH_ENVELOPE_KEY]: [{ data: "a" }, { data: "b" }] })).toEqual([
+        "SimpleNamespace",
+        "SimpleNamespace",
+      ]);
+    } finally {
+      await pool.close();
+    }
+  }, /* timeout */ 30000);
+});
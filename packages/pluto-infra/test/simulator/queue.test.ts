@@ -0,0 +1,95 @@
+import os from "os";
+import path from "path";
+import fs from "fs-extra";
+import { afterAll, beforeAll, describe, expect, test } from "vitest";
+import { LanguageType } from "@plutolang/base";
+import { createClosure } from "@plutolang/base/closure";
+import { SimQueue } from "../../src/simulator/queue";
+
+const BATCH_HANDLER = `
+import json
+import os
+
+
+def handler(events):
+    output = os.environ["PLUTO_TEST_OUTPUT"]
+    with open(output + ".tmp", "w") as f:
+        json.dump([evt.data for evt in events], f)
+    os.replace(output + ".tmp", output)
+`;
+
+const SLOW_HANDLER = `
+import time
+
+
+def handler(evt):
+    time.sleep(3)
+`;
+
+let basedir: string;
+beforeAll(() => {
+  basedir = fs.mkdtempSync(path.join(os.tmpdir(), "pluto-infra-test-sim-queue-"));
+  process.env.PLUTO_PROJECT_NAME = "test-project";
+  process.env.PLUTO_STACK_NAME = "test-stack";
+  process.env.PLUTO_LANGUAGE_TYPE = LanguageType.Python;
+});
+
+afterAll(() => {
+  fs.removeSync(basedir);
+});
+
+async function waitForFile(filepath: string, timeout: number) {
+  const deadline = Date.now() + timeout;
+  while (!fs.existsSync(filepath)) {
+    if (Date.now() > deadline) {
+      throw new Error(`Timed out waiting for '${filepath}'.`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, 50));
+  }
+}
+
+describe("simulated queue with a Python subscriber", () => {
+  test("should deliver a batch of events to a batch handler", async () => {
+    const closureDir = path.join(basedir, "batch_closure");
+    fs.outputFileSync(path.join(closureDir, "__init__.py"), BATCH_HANDLER);
+    const output = path.join(basedir, "batch-output.json");
+    process.env.PLUTO_TEST_OUTPUT = output;
+
+    const queue = new SimQueue("batch", {
+      batchHandler: true,
+      simBatchSize: 3,
+      simBatchWindow: 1000,
+    });
+    queue.subscribe(createClosure(() => {}, { dirpath: closureDir, exportName: "handler" }));
+
+    try {
+      await queue.pushMany(["a", "b", "c"]);
+      await waitForFile(output, 20000);
+      // The events are passed as objects, whose attributes can be accessed like the CloudEvents.
+      expect(fs.readJsonSync(output)).toEqual(["a", "b", "c"]);
+    } finally {
+      await queue.cleanup();
+    }
+  }, /* timeout */ 30000);
+
+  test("should report the messages that time out waiting for room in the buffer", async () => {
+    const closureDir = path.join(basedir, "slow_closure");
+    fs.outputFileSync(path.join(closureDir, "__init__.py"), SLOW_HANDLER);
+
+    const queue = new SimQueue("slow", {
+      simBufferSize: 1,
+      simConcurrency: 1,
+      simPushTimeout: 500,
+    });
+    queue.subscribe(createClosure(() => {}, { dirpath: closureDir, exportName: "handler" }));
+
+    try {
+      // The first message is being delivered and the second one fills the buffer, so the third one
+      // can't be buffered before the timeout.
+      const failures = await queue.pushMany(["a", "b", "c"]);
+      expect(failures).toEqual([{ index: 2, code: "Timeout", reason: expect.any(String) }]);
+    } finally {
+      await queue.cleanup();
+    }
+  }, /* timeout */ 30000);
+});
@@ -1,13 +1,45 @@
-from .queue import Queue, QueueOptions, CloudEvent
-from .kvstore import KVStore, KVStoreOptions
-from .function import Function, FunctionOptions
-from .router import Router, RouterOptions, HttpRequest, HttpResponse
-from .bucket import Bucket, BucketOptions
-from .schedule import Schedule, ScheduleOptions
-from .website import Website, WebsiteOptions
-from .secret import Secret
-from .reactapp import ReactApp, ReactAppOptions
-from .tester import Tester, TesterOptions
+from typing import TYPE_CHECKING, Dict
+from .utils import lazy_attrs
+
+# The resource modules are loaded on first access to their attributes (PEP 562), so that
+# `from pluto_client import Router` only loads the router module. The imports below are only seen
+# by type checkers and the deducer.
+if TYPE_CHECKING:
+    from .queue import Queue, QueueOptions, CloudEvent
+    from .kvstore import KVStore, KVStoreOptions
+    from .function import Function, FunctionOptions
+    from .router import Router, RouterOptions, HttpRequest, HttpResponse
+    from .bucket import Bucket, BucketOptions
+    from .schedule import Schedule, ScheduleOptions
+    from .website import Website, WebsiteOptions
+    from .secret import Secret
+    from .reactapp import ReactApp, ReactAppOptions
+    from .tester import Tester, TesterOptions
+
+_attr_modules: Dict[str, str] = {
+    "Queue": ".queue",
+    "QueueOptions": ".queue",
+    "CloudEvent": ".queue",
+    "KVStore": ".kvstore",
+    "KVStoreOptions": ".kvstore",
+    "Function": ".function",
+    "FunctionOptions": ".function",
+    "Router": ".router",
+    "RouterOptions": ".router",
+    "HttpRequest": ".router",
+    "HttpResponse": ".router",
+    "Bucket": ".bucket",
+    "BucketOptions": ".bucket",
+    "Schedule": ".schedule",
+    "ScheduleOptions": ".schedule",
+    "Website": ".website",
+    "WebsiteOptions": ".website",
+    "Secret": ".secret",
+    "ReactApp": ".reactapp",
+    "ReactAppOptions": ".reactapp",
+    "Tester": ".tester",
+    "TesterOptions": ".tester",
+}
 
 __all__ = [
     "Queue",
@@ -33,3 +65,5 @@ __all__ = [
     "Tester",
     "TesterOptions",
 ]
+
+__getattr__, __dir__ = lazy_attrs(globals(), _attr_modules)
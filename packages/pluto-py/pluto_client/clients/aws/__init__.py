@@ -1,15 +1,35 @@
-from .queue_sns import SNSQueue
-from .kvstore_dynamodb import DynamoKVStore
-from .sagemaker import SageMaker
-from .function_lambda import LambdaFunction
-from .bucket_s3 import S3Bucket
-from .secret_secretsmgr import Secret
+from typing import TYPE_CHECKING, Dict
+from ...utils import lazy_attrs
+
+# The client modules are loaded on first access, so that a closure only imports the modules, and
+# the SDK parts, of the resource types it uses.
+if TYPE_CHECKING:
+    from .queue_sns import SNSQueue
+    from .queue_sqs import SQSQueue
+    from .kvstore_dynamodb import DynamoKVStore
+    from .sagemaker import SageMaker
+    from .function_lambda import LambdaFunction
+    from .bucket_s3 import S3Bucket
+    from .secret_secretsmgr import Secret
+
+_attr_modules: Dict[str, str] = {
+    "SNSQueue": ".queue_sns",
+    "SQSQueue": ".queue_sqs",
+    "DynamoKVStore": ".kvstore_dynamodb",
+    "SageMaker": ".sagemaker",
+    "LambdaFunction": ".function_lambda",
+    "S3Bucket": ".bucket_s3",
+    "Secret": ".secret_secretsmgr",
+}
 
 __all__ = [
     "SNSQueue",
+    "SQSQueue",
     "DynamoKVStore",
     "SageMaker",
     "LambdaFunction",
     "S3Bucket",
     "Secret",
 ]
+
+__getattr__, __dir__ = lazy_attrs(globals(), _attr_modules)
@@ -1,16 +1,19 @@
-import boto3
+from functools import cached_property
 from typing import Optional
 from pluto_base import utils
 from botocore.exceptions import NoCredentialsError, ClientError
 from ...bucket import Bucket, BucketOptions, IBucketClient
-from .utils import gen_aws_resource_name
+from .utils import gen_aws_resource_name, get_aws_client
 
 
 class S3Bucket(IBucketClient):
     def __init__(self, name: str, opts: Optional[BucketOptions] = None):
         self.__id = utils.gen_resource_id(Bucket.fqn, name)
         self.__bucket_name = gen_aws_resource_name(self.__id)
-        self.__client = boto3.client("s3")
+
+    @cached_property
+    def __client(self):
+        return get_aws_client("s3")
 
     def put(self, file_key: str, file_path: str):
         try:
@@ -1,8 +1,7 @@
 import json
-import boto3
 from typing import Optional, Any
 from pluto_base.utils import gen_resource_id, get_env_val_for_property
-from .utils import gen_aws_resource_name
+from .utils import gen_aws_resource_name, get_aws_client
 from ...function import (
     FnHandler,
     FunctionOptions,
@@ -34,7 +33,7 @@ class LambdaFunction(IFunctionClient[FnHandler]):
         return get_env_val_for_property(self.__id, "url")
 
     def invoke(self, *args, **kwargs) -> Any:
-        lambda_client = boto3.client("lambda")
+        lambda_client = get_aws_client("lambda")
         params = {
             "FunctionName": self.__lambda_name,
             "InvocationType": "RequestResponse",
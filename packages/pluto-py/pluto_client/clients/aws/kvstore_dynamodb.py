@@ -1,15 +1,48 @@
-from typing import Optional
-import boto3
+import time
+from decimal import Decimal
+from functools import cached_property, partial
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from boto3.dynamodb.types import Binary, TypeDeserializer, TypeSerializer
 from pluto_base import utils
-from ...kvstore import IKVStoreClient, KVStore, KVStoreOptions
-from .utils import gen_aws_resource_name
+from ...kvstore import DEFAULT_SCAN_PAGE_SIZE, IKVStoreClient, KVStore, KVStoreOptions
+from .utils import (
+    gen_aws_resource_name,
+    get_aws_client,
+    get_aws_resource,
+    iterate_in_parallel,
+    map_in_parallel,
+)
+
+BATCH_GET_MAX_KEYS = 100
+"""The maximum number of keys in a BatchGetItem request."""
+
+BATCH_WRITE_MAX_ITEMS = 25
+"""The maximum number of items in a BatchWriteItem request."""
+
+BATCH_MAX_RETRIES = 8
+"""The number of times the unprocessed keys or items of a batch request are retried."""
+
+BATCH_RETRY_BASE_DELAY = 0.05
+"""The delay in seconds before the first retry, it doubles with each following retry."""
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
 
 
 class DynamoKVStore(IKVStoreClient):
     def __init__(self, name: str, opts: Optional[KVStoreOptions] = None):
         self.__id = utils.gen_resource_id(KVStore.fqn, name)
         self.__table_name = gen_aws_resource_name(self.__id)
-        self.__client = boto3.resource("dynamodb").Table(self.__table_name)
+
+    @cached_property
+    def __client(self):
+        return get_aws_resource("dynamodb").Table(self.__table_name)
+
+    @cached_property
+    def __dynamodb(self):
+        # The batch requests are sent from multiple threads, which requires the thread-safe client
+        # instead of the table resource.
+        return get_aws_client("dynamodb")
 
     @property
     def aws_table_name(self) -> str:
@@ -19,11 +52,186 @@ class DynamoKVStore(IKVStoreClient):
     def aws_partition_key(self) -> str:
         return "Id"
 
-    def get(self, key: str) -> str:
+    def get(self, key: str) -> Any:
         response = self.__client.get_item(Key={self.aws_partition_key: key})
         if "Item" not in response:
             raise ValueError(f"There is no target key-value pair, Key: {key}.")
-        return response["Item"]["Value"]
+        return _from_dynamo(response["Item"]["Value"])
+
+    def set(self, key: str, val: Any):
+        self.__client.put_item(Item={"Id": key, "Value": _to_dynamo(val)})
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        # A batch request can't contain the same key twice.
+        unique_keys = list(dict.fromkeys(keys))
+        chunks = [
+            unique_keys[i : i + BATCH_GET_MAX_KEYS]
+            for i in range(0, len(unique_keys), BATCH_GET_MAX_KEYS)
+        ]
+
+        result: Dict[str, Any] = {}
+        for found in map_in_parallel(self.__batch_get, chunks):
+            result.update(found)
+        return result
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        entries = list(items.items())
+        chunks = [
+            entries[i : i + BATCH_WRITE_MAX_ITEMS]
+            for i in range(0, len(entries), BATCH_WRITE_MAX_ITEMS)
+        ]
+        map_in_parallel(self.__batch_write, chunks)
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        response = self.__client.update_item(
+            Key={self.aws_partition_key: key},
+            UpdateExpression="ADD #v :delta",
+            ExpressionAttributeNames={"#v": "Value"},
+            ExpressionAttributeValues={":delta": delta},
+            ReturnValues="UPDATED_NEW",
+        )
+        # The numbers are returned as Decimal.
+        return int(response["Attributes"]["Value"])
+
+    def set_if(self, key: str, val: Any, expected: Optional[Any] = None) -> bool:
+        params: Dict[str, Any] = {"Item": {self.aws_partition_key: key, "Value": _to_dynamo(val)}}
+        if expected is None:
+            params["ConditionExpression"] = "attribute_not_exists(#pk)"
+            params["ExpressionAttributeNames"] = {"#pk": self.aws_partition_key}
+        else:
+            params["ConditionExpression"] = "#v = :expected"
+            params["ExpressionAttributeNames"] = {"#v": "Value"}
+            params["ExpressionAttributeValues"] = {":expected": _to_dynamo(expected)}
+
+        try:
+            self.__client.put_item(**params)
+            return True
+        except self.__client.meta.client.exceptions.ConditionalCheckFailedException:
+            return False
+
+    def scan(
+        self,
+        prefix: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+    ) -> Iterator[Tuple[str, Any]]:
+        if segments <= 0:
+            raise ValueError("The number of segments should be greater than 0.")
+
+        producers = [
+            partial(self.__scan_segment, prefix, page_size, segment, segments)
+            for segment in range(segments)
+        ]
+        for page in iterate_in_parallel(producers):
+            yield from page
+
+    def __scan_segment(
+        self, prefix: Optional[str], page_size: int, segment: int, segments: int
+    ) -> Iterator[List[Tuple[str, Any]]]:
+        pk = self.aws_partition_key
+        params: Dict[str, Any] = {"TableName": self.__table_name, "Limit": page_size}
+        if segments > 1:
+            params["Segment"] = segment
+            params["TotalSegments"] = segments
+        if prefix:
+            params["FilterExpression"] = "begins_with(#pk, :prefix)"
+            params["ExpressionAttributeNames"] = {"#pk": pk}
+            params["ExpressionAttributeValues"] = {":prefix": _serializer.serialize(prefix)}
+
+        while True:
+            response = self.__dynamodb.scan(**params)
+            page = [
+                (_deserializer.deserialize(item[pk]), _deserialize(item["Value"]))
+                for item in response.get("Items", [])
+            ]
+            # The limit is applied before the filter, so a page can be empty.
+            if page:
+                yield page
+
+            if "LastEvaluatedKey" not in response:
+                return
+            params["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+    def __batch_get(self, keys: List[str]) -> Dict[str, Any]:
+        pk = self.aws_partition_key
+        request: Dict[str, Any] = {
+            self.__table_name: {"Keys": [{pk: _serializer.serialize(key)} for key in keys]}
+        }
+
+        found: Dict[str, Any] = {}
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = self.__dynamodb.batch_get_item(RequestItems=request)
+            for item in response.get("Responses", {}).get(self.__table_name, []):
+                found[_deserializer.deserialize(item[pk])] = _deserialize(item["Value"])
+
+            request = response.get("UnprocessedKeys") or {}
+            if not request:
+                return found
+            _backoff(attempt)
+
+        unprocessed = len(request[self.__table_name]["Keys"])
+        raise RuntimeError(
+            f"Failed to get {unprocessed} keys from '{self.__table_name}', they were left "
+            f"unprocessed after {BATCH_MAX_RETRIES} retries."
+        )
+
+    def __batch_write(self, entries: List[Any]) -> None:
+        pk = self.aws_partition_key
+        request: Dict[str, Any] = {
+            self.__table_name: [
+                {
+                    "PutRequest": {
+                        "Item": {
+                            pk: _serializer.serialize(key),
+                            "Value": _serializer.serialize(_to_dynamo(val)),
+                        }
+                    }
+                }
+                for key, val in entries
+            ]
+        }
+
+        for attempt in range(BATCH_MAX_RETRIES + 1):
+            response = self.__dynamodb.batch_write_item(RequestItems=request)
+            request = response.get("UnprocessedItems") or {}
+            if not request:
+                return
+            _backoff(attempt)
+
+        unprocessed = len(request[self.__table_name])
+        raise RuntimeError(
+            f"Failed to write {unprocessed} items to '{self.__table_name}', they were left "
+            f"unprocessed after {BATCH_MAX_RETRIES} retries."
+        )
+
+
+def _to_dynamo(val: Any) -> Any:
+    # DynamoDB has no float type, the numbers are stored as Decimal.
+    if isinstance(val, float):
+        return Decimal(str(val))
+    if isinstance(val, dict):
+        return {k: _to_dynamo(v) for k, v in val.items()}
+    if isinstance(val, (list, tuple)):
+        return [_to_dynamo(v) for v in val]
+    return val
+
+
+def _from_dynamo(val: Any) -> Any:
+    if isinstance(val, Decimal):
+        return int(val) if val == val.to_integral_value() else float(val)
+    if isinstance(val, Binary):
+        return val.value
+    if isinstance(val, dict):
+        return {k: _from_dynamo(v) for k, v in val.items()}
+    if isinstance(val, list):
+        return [_from_dynamo(v) for v in val]
+    return val
+
+
+def _deserialize(attr: Dict[str, Any]) -> Any:
+    return _from_dynamo(_deserializer.deserialize(attr))
+
 
-    def set(self, key: str, val: str):
-        self.__client.put_item(Item={"Id": key, "Value": val})
+def _backoff(attempt: int):
+    if attempt < BATCH_MAX_RETRIES:
+        time.sleep(BATCH_RETRY_BASE_DELAY * (2**attempt))
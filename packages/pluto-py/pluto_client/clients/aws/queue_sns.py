@@ -1,19 +1,32 @@
 import os
 import json
 import time
-import boto3
-from typing import Optional
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
 from pluto_base.utils.resource_id import gen_resource_id
-from pluto_client.clients.aws.utils import gen_aws_resource_name, get_aws_account_id
-from ...queue import CloudEvent, IQueueClient, Queue, QueueOptions
+from pluto_client.clients.aws.utils import (
+    gen_aws_resource_name,
+    get_aws_account_id,
+    get_aws_client,
+    push_messages,
+)
+from ...queue import CloudEvent, IQueueClient, Queue, QueueOptions, QueuePushFailure
 
 
 class SNSQueue(IQueueClient):
     def __init__(self, name: str, opts: Optional[QueueOptions] = None) -> None:
         self.__id = gen_resource_id(Queue.fqn, name)
         self.__topic_name = gen_aws_resource_name(self.__id)
-        self.__topic_arn = self.__build_arn(self.__topic_name)
-        self.__client = boto3.client("sns")
+
+    @cached_property
+    def __client(self):
+        return get_aws_client("sns")
+
+    @cached_property
+    def __topic_arn(self) -> str:
+        # Building the ARN requires a network call to fetch the account ID, so it is deferred until
+        # the first push.
+        return self.__build_arn(self.__topic_name)
 
     def push(self, msg: str) -> None:
         event = CloudEvent(timestamp=time.time(), data=msg)
@@ -21,6 +34,20 @@ class SNSQueue(IQueueClient):
             TopicArn=self.__topic_arn, Message=json.dumps(event.__dict__)
         )
 
+    def push_many(self, msgs: List[str]) -> List[QueuePushFailure]:
+        # Resolve the ARN before the chunks are published concurrently, so it's fetched only once.
+        topic_arn = self.__topic_arn
+
+        def publish_batch(chunk: List[Tuple[int, str]]) -> Dict[str, Any]:
+            return self.__client.publish_batch(
+                TopicArn=topic_arn,
+                PublishBatchRequestEntries=[
+                    {"Id": str(index), "Message": body} for index, body in chunk
+                ],
+            )
+
+        return push_messages(msgs, publish_batch)
+
     def __build_arn(self, topic_name: str) -> str:
         region = os.environ.get("AWS_REGION")
         if not region:
@@ -29,3 +56,4 @@ class SNSQueue(IQueueClient):
         account_id = get_aws_account_id()
 
         return f"arn:aws:sns:{region}:{account_id}:{topic_name}"
+
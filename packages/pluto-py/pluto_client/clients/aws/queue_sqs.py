@@ -0,0 +1,41 @@
+import json
+import time
+from functools import cached_property
+from typing import Any, Dict, List, Optional, Tuple
+from pluto_base.utils.resource_id import gen_resource_id
+from pluto_client.clients.aws.utils import gen_aws_resource_name, get_aws_client, push_messages
+from ...queue import CloudEvent, IQueueClient, Queue, QueueOptions, QueuePushFailure
+
+
+class SQSQueue(IQueueClient):
+    def __init__(self, name: str, opts: Optional[QueueOptions] = None) -> None:
+        self.__id = gen_resource_id(Queue.fqn, name)
+        self.__queue_name = gen_aws_resource_name(self.__id)
+
+    @cached_property
+    def __client(self):
+        return get_aws_client("sqs")
+
+    @cached_property
+    def __queue_url(self) -> str:
+        # Fetching the URL requires a network call, so it is deferred until the first push. SQS
+        # returns the URL of the endpoint the client is configured with.
+        return self.__client.get_queue_url(QueueName=self.__queue_name)["QueueUrl"]
+
+    def push(self, msg: str) -> None:
+        event = CloudEvent(timestamp=time.time(), data=msg)
+        self.__client.send_message(
+            QueueUrl=self.__queue_url, MessageBody=json.dumps(event.__dict__)
+        )
+
+    def push_many(self, msgs: List[str]) -> List[QueuePushFailure]:
+        # Resolve the URL before the chunks are sent concurrently, so it's fetched only once.
+        queue_url = self.__queue_url
+
+        def send_batch(chunk: List[Tuple[int, str]]) -> Dict[str, Any]:
+            return self.__client.send_message_batch(
+                QueueUrl=queue_url,
+                Entries=[{"Id": str(index), "MessageBody": body} for index, body in chunk],
+            )
+
+        return push_messages(msgs, send_batch)
@@ -1,8 +1,8 @@
-import boto3
 import json
+from functools import cached_property
 from typing import Any, Optional
 from pluto_base.utils import gen_resource_id, get_env_val_for_property
-from .utils import gen_aws_resource_name
+from .utils import gen_aws_resource_name, get_aws_client
 from ...sagemaker import ISageMakerClient, SageMakerOptions, SageMaker as SageMakerProto
 
 
@@ -11,7 +11,10 @@ class SageMaker(ISageMakerClient):
         self, name: str, image_uri: str, opts: Optional[SageMakerOptions] = None
     ):
         self.__id = gen_resource_id(SageMakerProto.fqn, name)
-        self.client = boto3.client("sagemaker-runtime")
+
+    @cached_property
+    def client(self):
+        return get_aws_client("sagemaker-runtime")
 
     @property
     def endpoint_name(self) -> str:
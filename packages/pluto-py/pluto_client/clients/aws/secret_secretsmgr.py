@@ -1,6 +1,6 @@
-import boto3
+from functools import cached_property
 from pluto_base.utils.resource_id import gen_resource_id
-from pluto_client.clients.aws.utils import gen_aws_resource_name
+from pluto_client.clients.aws.utils import gen_aws_resource_name, get_aws_client
 from ...secret import ISecretClient, Secret as SecretProto
 
 
@@ -9,7 +9,10 @@ class Secret(ISecretClient):
         self.__name = name
         self.__id = gen_resource_id(SecretProto.fqn, name)
         self.__secret_name = gen_aws_resource_name(self.__id)
-        self.__client = boto3.client("secretsmanager")
+
+    @cached_property
+    def __client(self):
+        return get_aws_client("secretsmanager")
 
     def get(self) -> str:
         resp = self.__client.get_secret_value(SecretId=self.__secret_name)
@@ -1,10 +1,36 @@
+import os
 import re
 import json
 import boto3
 import hashlib
+import time
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from ...queue import CloudEvent, QueuePushFailure
 
 RESOURCE_NAME_MAX_LENGTH = 50
 
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+DEFAULT_RETRY_MODE = "standard"
+
+MAX_PARALLEL_REQUESTS = 8
+"""
+The maximum number of requests a bulk operation sends to AWS concurrently. It stays below the
+default size of the connection pool, so the requests don't wait for connections.
+"""
+
+MESSAGE_BATCH_MAX_ENTRIES = 10
+"""The maximum number of messages in an SNS PublishBatch or SQS SendMessageBatch request."""
+MESSAGE_BATCH_MAX_BYTES = 256 * 1024
+"""The maximum total size of the messages in an SNS PublishBatch or SQS SendMessageBatch request."""
+
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def gen_aws_resource_name(*parts: str) -> str:
     resource_full_id = re.sub(r"[^-0-9a-zA-Z]+", "-", "_".join(parts)).lower()
@@ -18,6 +44,228 @@ def gen_aws_resource_name(*parts: str) -> str:
         return (resource_full_id[start:end] + hash).strip("-")
 
 
+_session: Optional[boto3.session.Session] = None
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+_account_id: Optional[str] = None
+
+
+def get_aws_client(service: str, region: Optional[str] = None) -> Any:
+    """
+    Get the shared client of the AWS service in the region. The client is created once per process
+    and reused by all resources, so its connection pool and TLS sessions survive across calls and
+    invocations. The boto3 clients are thread-safe.
+
+    Args:
+        service (str): The name of the AWS service, e.g. "sns".
+        region (Optional[str]): The region of the client. Defaults to the region of the environment.
+    """
+    region = region or os.environ.get("AWS_REGION")
+    key = (service, region)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _get_session().client(
+                service, region_name=region, config=get_aws_config()  # type: ignore
+            )
+            _clients[key] = client
+        return client
+
+
+def get_aws_resource(service: str, region: Optional[str] = None) -> Any:
+    """
+    Create a resource of the AWS service with the shared client configuration. Unlike the clients,
+    the boto3 resources aren't thread-safe, so they are not shared.
+    """
+    region = region or os.environ.get("AWS_REGION")
+    with _clients_lock:
+        return _get_session().resource(
+            service, region_name=region, config=get_aws_config()  # type: ignore
+        )
+
+
+def get_aws_config() -> Config:
+    """
+    Build the botocore configuration of the clients. It's tuned through the following environment
+    variables, which are set from the `aws_*` options of `FunctionOptions` on deployment:
+
+    - PLUTO_AWS_MAX_POOL_CONNECTIONS: The maximum number of connections to keep in a pool.
+    - PLUTO_AWS_TCP_KEEPALIVE: Whether to enable the TCP keep-alive, "true" or "false".
+    - PLUTO_AWS_CONNECT_TIMEOUT: The connection timeout in seconds.
+    - PLUTO_AWS_READ_TIMEOUT: The read timeout in seconds.
+    - PLUTO_AWS_RETRY_MODE: The retry mode, "legacy", "standard" or "adaptive".
+    - PLUTO_AWS_MAX_ATTEMPTS: The maximum number of attempts, including the initial one.
+    """
+    retries: Dict[str, Any] = {
+        "mode": os.environ.get("PLUTO_AWS_RETRY_MODE", DEFAULT_RETRY_MODE)
+    }
+    max_attempts = os.environ.get("PLUTO_AWS_MAX_ATTEMPTS")
+    if max_attempts:
+        retries["total_max_attempts"] = int(max_attempts)
+
+    options: Dict[str, Any] = {
+        "max_pool_connections": int(
+            os.environ.get(
+                "PLUTO_AWS_MAX_POOL_CONNECTIONS", DEFAULT_MAX_POOL_CONNECTIONS
+            )
+        ),
+        "tcp_keepalive": os.environ.get("PLUTO_AWS_TCP_KEEPALIVE", "true").lower()
+        == "true",
+        "retries": retries,
+    }
+    # Keep the botocore defaults of the timeouts unless they are set, since a synchronous Lambda
+    # invocation can last as long as the function's timeout.
+    connect_timeout = os.environ.get("PLUTO_AWS_CONNECT_TIMEOUT")
+    if connect_timeout:
+        options["connect_timeout"] = float(connect_timeout)
+    read_timeout = os.environ.get("PLUTO_AWS_READ_TIMEOUT")
+    if read_timeout:
+        options["read_timeout"] = float(read_timeout)
+
+    return Config(**options)
+
+
+def _get_session() -> boto3.session.Session:
+    # The caller must hold the lock, since creating clients from a session isn't thread-safe.
+    global _session
+    if _session is None:
+        _session = boto3.session.Session()
+    return _session
+
+
 def get_aws_account_id() -> str:
-    client = boto3.client("sts")  # type: ignore
-    return client.get_caller_identity().get("Account")  # type: ignore
+    global _account_id
+    if _account_id is None:
+        client = get_aws_client("sts")
+        _account_id = client.get_caller_identity().get("Account")
+    return _account_id  # type: ignore
+
+
+def map_in_parallel(fn: Callable[[T], R], chunks: Iterable[T]) -> List[R]:
+    """
+    Apply the function to each chunk of a bulk operation, sending up to `MAX_PARALLEL_REQUESTS`
+    requests concurrently. The results are in the order of the chunks. The shared clients are
+    thread-safe, so the function can use them directly.
+    """
+    chunks = list(chunks)
+    if len(chunks) <= 1:
+        return [fn(chunk) for chunk in chunks]
+
+    with ThreadPoolExecutor(max_workers=min(len(chunks), MAX_PARALLEL_REQUESTS)) as executor:
+        return list(executor.map(fn, chunks))
+
+
+def iterate_in_parallel(producers: List[Callable[[], Iterator[T]]]) -> Iterator[T]:
+    """
+    Run the producers on a thread each and yield their items as they arrive, e.g. the pages of the
+    segments of a scan. At most two items per producer are buffered, so the producers are paused
+    when the consumer falls behind. The producers are stopped once the consumer stops iterating.
+    """
+    if len(producers) == 1:
+        yield from producers[0]()
+        return
+
+    buffer: "queue.Queue[Tuple[str, Any]]" = queue.Queue(maxsize=2 * len(producers))
+    stopped = threading.Event()
+
+    def put(message: Tuple[str, Any]) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(message, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def run(producer: Callable[[], Iterator[T]]):
+        try:
+            for item in producer():
+                if not put(("item", item)):
+                    return
+            put(("done", None))
+        except BaseException as e:
+            put(("error", e))
+
+    executor = ThreadPoolExecutor(max_workers=len(producers))
+    try:
+        for producer in producers:
+            executor.submit(run, producer)
+
+        running = len(producers)
+        while running > 0:
+            kind, value = buffer.get()
+            if kind == "item":
+                yield value
+            elif kind == "done":
+                running -= 1
+            else:
+                raise value
+    finally:
+        stopped.set()
+        executor.shutdown(wait=False)
+
+
+def chunk_messages(bodies: List[str]) -> Iterator[List[Tuple[int, str]]]:
+    """
+    Split the messages into the chunks of a batch request to SNS or SQS, bounded by the number of
+    messages and their total size. Each message is paired with its index.
+    """
+    chunk: List[Tuple[int, str]] = []
+    size = 0
+    for index, body in enumerate(bodies):
+        body_size = len(body.encode("utf-8"))
+        if chunk and (
+            len(chunk) >= MESSAGE_BATCH_MAX_ENTRIES or size + body_size > MESSAGE_BATCH_MAX_BYTES
+        ):
+            yield chunk
+            chunk = []
+            size = 0
+        chunk.append((index, body))
+        size += body_size
+    if chunk:
+        yield chunk
+
+
+def push_messages(
+    msgs: List[str], send_batch: Callable[[List[Tuple[int, str]]], Dict[str, Any]]
+) -> List[QueuePushFailure]:
+    """
+    Push the messages to SNS or SQS in batch requests, sending up to `MAX_PARALLEL_REQUESTS`
+    requests concurrently.
+
+    Args:
+        msgs (List[str]): The messages to push, each is wrapped in a `CloudEvent`.
+        send_batch (Callable): Sends a chunk of messages, paired with their indexes, in one batch
+            request and returns the response. The indexes are used as the IDs of the entries.
+
+    Returns:
+        The messages that failed to be pushed.
+    """
+    timestamp = time.time()
+    bodies = [json.dumps(CloudEvent(timestamp=timestamp, data=msg).__dict__) for msg in msgs]
+
+    def send(chunk: List[Tuple[int, str]]) -> List[QueuePushFailure]:
+        try:
+            response = send_batch(chunk)
+        except ClientError as e:
+            # The whole chunk was rejected, e.g. it's too large or the queue doesn't exist.
+            error = e.response.get("Error", {})
+            code = error.get("Code", "Unknown")
+            reason = error.get("Message", str(e))
+            return [QueuePushFailure(index=index, code=code, reason=reason) for index, _ in chunk]
+
+        return [
+            QueuePushFailure(
+                index=int(failed["Id"]), code=failed["Code"], reason=failed.get("Message", "")
+            )
+            for failed in response.get("Failed", [])
+        ]
+
+    failures: List[QueuePushFailure] = []
+    for chunk_failures in map_in_parallel(send, chunk_messages(bodies)):
+        failures.extend(chunk_failures)
+    return failures
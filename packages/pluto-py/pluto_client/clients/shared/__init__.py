@@ -1,2 +1,28 @@
-from .router import RouterClient
-from .website import WebsiteClient
+from typing import TYPE_CHECKING, Dict
+from ...utils import lazy_attrs
+
+# The client modules are loaded on first access, so that a closure only imports the modules of the
+# resource types it uses, e.g. the codecs and the cache of a KVStore only if the KVStore uses them.
+if TYPE_CHECKING:
+    from .router import RouterClient
+    from .website import WebsiteClient
+    from .kvstore_cache import CachedKVStore
+    from .kvstore_codec import EncodedKVStore, get_codec
+
+_attr_modules: Dict[str, str] = {
+    "RouterClient": ".router",
+    "WebsiteClient": ".website",
+    "CachedKVStore": ".kvstore_cache",
+    "EncodedKVStore": ".kvstore_codec",
+    "get_codec": ".kvstore_codec",
+}
+
+__all__ = [
+    "RouterClient",
+    "WebsiteClient",
+    "CachedKVStore",
+    "EncodedKVStore",
+    "get_codec",
+]
+
+__getattr__, __dir__ = lazy_attrs(globals(), _attr_modules)
@@ -0,0 +1,236 @@
+import sys
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from ...kvstore import (
+    DEFAULT_SCAN_PAGE_SIZE,
+    IKVStoreClient,
+    KVStoreCacheStats,
+    KVStoreOptions,
+)
+
+DEFAULT_CACHE_MAX_ENTRIES = 1000
+DEFAULT_CACHE_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_CACHE_TTL = 60.0
+
+
+class LRUCache:
+    """
+    A thread-safe LRU cache, bounded by the number of entries and their approximate total size, in
+    which every entry expires after the TTL. The mutable values, e.g. dicts and lists, are copied in
+    and out, so the callers can't change the cached ones.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        if max_entries <= 0 or max_bytes <= 0 or ttl <= 0:
+            raise ValueError("The max entries, max bytes and TTL of the cache should be positive.")
+
+        self.__max_entries = max_entries
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__lock = threading.Lock()
+        # Ordered from the least to the most recently used. Each entry holds the value, the time it
+        # expires at, and its size.
+        self.__entries: OrderedDict[str, Tuple[Any, float, int]] = OrderedDict()
+        self.__bytes = 0
+        # The keys being loaded, with the number of loads in flight and the version of the key. The
+        # version is bumped by every write, so a load doesn't cache the value it read before it.
+        self.__loading: Dict[str, Tuple[int, int]] = {}
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns:
+            Whether the key is cached, and its value.
+        """
+        with self.__lock:
+            cached, val = self.__get(key)
+        return cached, _copy(val)
+
+    def load(
+        self, keys: List[str], fetch: Callable[[List[str]], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Get the values of the keys, fetching the ones that aren't cached and caching them. A fetched
+        value isn't cached if the key was written while it was being fetched, since the value may
+        be older than the written one.
+
+        Args:
+            keys (List[str]): The keys to get.
+            fetch (Callable): Fetches the values of the missing keys, leaving out the ones that
+                don't exist.
+
+        Returns:
+            The values of the keys that exist.
+        """
+        result: Dict[str, Any] = {}
+        versions: Dict[str, int] = {}
+        with self.__lock:
+            for key in keys:
+                cached, val = self.__get(key)
+                if cached:
+                    result[key] = val
+                elif key not in versions:
+                    count, version = self.__loading.get(key, (0, 0))
+                    self.__loading[key] = (count + 1, version)
+                    versions[key] = version
+        result = {key: _copy(val) for key, val in result.items()}
+        if not versions:
+            return result
+
+        found: Dict[str, Any] = {}
+        try:
+            found = fetch(list(versions))
+            result.update(found)
+            return result
+        finally:
+            with self.__lock:
+                for key, version in versions.items():
+                    count, current = self.__loading[key]
+                    if count == 1:
+                        del self.__loading[key]
+                    else:
+                        self.__loading[key] = (count - 1, current)
+                    if key in found and current == version:
+                        self.__put(key, _copy(found[key]))
+
+    def put(self, key: str, val: Any) -> None:
+        val = _copy(val)
+        with self.__lock:
+            self.__invalidate_loads(key)
+            self.__put(key, val)
+
+    def remove(self, key: str) -> None:
+        with self.__lock:
+            self.__invalidate_loads(key)
+            self.__remove(key)
+
+    def stats(self) -> KVStoreCacheStats:
+        with self.__lock:
+            return KVStoreCacheStats(
+                hits=self.__hits,
+                misses=self.__misses,
+                evictions=self.__evictions,
+                entries=len(self.__entries),
+                bytes=self.__bytes,
+            )
+
+    def __get(self, key: str) -> Tuple[bool, Any]:
+        # The caller must hold the lock.
+        entry = self.__entries.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+                return True, entry[0]
+            self.__remove(key)
+        self.__misses += 1
+        return False, None
+
+    def __put(self, key: str, val: Any):
+        # The caller must hold the lock.
+        size = _sizeof(key) + _sizeof(val)
+        self.__remove(key)
+        if size > self.__max_bytes:
+            return
+
+        self.__entries[key] = (val, time.monotonic() + self.__ttl, size)
+        self.__bytes += size
+        while len(self.__entries) > self.__max_entries or self.__bytes > self.__max_bytes:
+            oldest = next(iter(self.__entries))
+            self.__remove(oldest)
+            self.__evictions += 1
+
+    def __invalidate_loads(self, key: str):
+        # The caller must hold the lock.
+        loading = self.__loading.get(key)
+        if loading is not None:
+            self.__loading[key] = (loading[0], loading[1] + 1)
+
+    def __remove(self, key: str):
+        # The caller must hold the lock.
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__bytes -= entry[2]
+
+
+def _copy(val: Any) -> Any:
+    if isinstance(val, (dict, list, set, bytearray)):
+        return copy.deepcopy(val)
+    return val
+
+
+def _sizeof(obj: Any) -> int:
+    if isinstance(obj, (str, bytes)):
+        return len(obj)
+    return sys.getsizeof(obj)
+
+
+class CachedKVStore(IKVStoreClient):
+    """
+    Wrap the client of a KVStore with a read-through cache kept in the process. The values set
+    through this client are written to the KVStore and then to the cache.
+    """
+
+    def __init__(self, client: Any, opts: Optional[KVStoreOptions] = None):
+        self.__client = client
+        self.__cache = LRUCache(
+            max_entries=(opts and opts.cache_max_entries) or DEFAULT_CACHE_MAX_ENTRIES,
+            max_bytes=(opts and opts.cache_max_bytes) or DEFAULT_CACHE_MAX_BYTES,
+            ttl=(opts and opts.cache_ttl) or DEFAULT_CACHE_TTL,
+        )
+
+    @property
+    def aws_table_name(self) -> str:
+        return self.__client.aws_table_name
+
+    @property
+    def aws_partition_key(self) -> str:
+        return self.__client.aws_partition_key
+
+    def cache_stats(self) -> KVStoreCacheStats:
+        return self.__cache.stats()
+
+    def get(self, key: str) -> Any:
+        return self.__cache.load([key], lambda keys: {key: self.__client.get(key)})[key]
+
+    def set(self, key: str, val: Any) -> None:
+        self.__client.set(key, val)
+        self.__cache.put(key, val)
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        return self.__cache.load(keys, self.__client.get_many)
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        self.__client.set_many(items)
+        for key, val in items.items():
+            self.__cache.put(key, val)
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        val = self.__client.incr(key, delta)
+        # The counter is stored as a bare number, which the codec of the KVStore may not decode,
+        # e.g. msgpack, so the next get reads it through the codec instead of using the count.
+        self.__cache.remove(key)
+        return val
+
+    def set_if(self, key: str, val: Any, expected: Optional[Any] = None) -> bool:
+        written = self.__client.set_if(key, val, expected)
+        if written:
+            self.__cache.put(key, val)
+        else:
+            # The cached value is out of date, since it didn't match the current one.
+            self.__cache.remove(key)
+        return written
+
+    def scan(
+        self,
+        prefix: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+    ) -> Iterator[Tuple[str, Any]]:
+        # A scan usually reads every key once, caching the pairs would only evict the hot ones.
+        return self.__client.scan(prefix, page_size, segments)
@@ -0,0 +1,138 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ...kvstore import DEFAULT_SCAN_PAGE_SIZE, IKVStoreClient, KVStoreCacheStats
+
+
+class ValueCodec:
+    """
+    Convert the values of a KVStore to the values stored by the platform clients, which store the
+    strings, the bytes and the JSON-compatible values natively, e.g. as the String, Binary and Map
+    types of DynamoDB.
+    """
+
+    def encode(self, val: Any) -> Any:
+        raise NotImplementedError
+
+    def decode(self, stored: Any) -> Any:
+        raise NotImplementedError
+
+
+class StrCodec(ValueCodec):
+    def encode(self, val: Any) -> Any:
+        if not isinstance(val, str):
+            raise TypeError(f"The value should be a str, got {type(val).__name__}.")
+        return val
+
+    def decode(self, stored: Any) -> Any:
+        return stored
+
+
+class BytesCodec(ValueCodec):
+    def encode(self, val: Any) -> Any:
+        if not isinstance(val, (bytes, bytearray)):
+            raise TypeError(f"The value should be bytes, got {type(val).__name__}.")
+        return bytes(val)
+
+    def decode(self, stored: Any) -> Any:
+        return stored
+
+
+class JsonCodec(ValueCodec):
+    """
+    Store the JSON-compatible values as they are, the platform clients map them to their native
+    types, so there is no string to serialize and parse.
+    """
+
+    def encode(self, val: Any) -> Any:
+        return val
+
+    def decode(self, stored: Any) -> Any:
+        return stored
+
+
+class MsgpackCodec(ValueCodec):
+    """
+    Store the values in the MessagePack format, which is more compact than JSON. It requires the
+    `msgpack` package.
+    """
+
+    def __init__(self):
+        try:
+            import msgpack
+        except ImportError:
+            raise ImportError(
+                "The 'msgpack' codec requires the msgpack package, add it to the requirements."
+            )
+        self.__msgpack = msgpack
+
+    def encode(self, val: Any) -> Any:
+        return self.__msgpack.packb(val)
+
+    def decode(self, stored: Any) -> Any:
+        return self.__msgpack.unpackb(stored)
+
+
+CODECS = {
+    "str": StrCodec,
+    "bytes": BytesCodec,
+    "json": JsonCodec,
+    "msgpack": MsgpackCodec,
+}
+
+
+def get_codec(name: str) -> ValueCodec:
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}', the valid ones are: {', '.join(CODECS)}.")
+    return CODECS[name]()
+
+
+class EncodedKVStore(IKVStoreClient):
+    """
+    Wrap the client of a KVStore to encode the values with the codec before they are stored, and
+    decode them after they are read.
+    """
+
+    def __init__(self, client: Any, codec: ValueCodec):
+        self.__client = client
+        self.__codec = codec
+
+    @property
+    def aws_table_name(self) -> str:
+        return self.__client.aws_table_name
+
+    @property
+    def aws_partition_key(self) -> str:
+        return self.__client.aws_partition_key
+
+    def cache_stats(self) -> KVStoreCacheStats:
+        return self.__client.cache_stats()
+
+    def get(self, key: str) -> Any:
+        return self.__codec.decode(self.__client.get(key))
+
+    def set(self, key: str, val: Any) -> None:
+        self.__client.set(key, self.__codec.encode(val))
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found = self.__client.get_many(keys)
+        return {key: self.__codec.decode(stored) for key, stored in found.items()}
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        self.__client.set_many({key: self.__codec.encode(val) for key, val in items.items()})
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        # The counters are numbers in every platform, they're not encoded.
+        return self.__client.incr(key, delta)
+
+    def set_if(self, key: str, val: Any, expected: Optional[Any] = None) -> bool:
+        if expected is not None:
+            expected = self.__codec.encode(expected)
+        return self.__client.set_if(key, self.__codec.encode(val), expected)
+
+    def scan(
+        self,
+        prefix: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+    ) -> Iterator[Tuple[str, Any]]:
+        for key, stored in self.__client.scan(prefix, page_size, segments):
+            yield key, self.__codec.decode(stored)
@@ -0,0 +1,54 @@
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+from ...queue import CloudEvent
+
+# The environment variables are set by the queue from the options of the subscriber.
+BATCH_HANDLER_ENV = "PLUTO_QUEUE_BATCH_HANDLER"
+HANDLER_CONCURRENCY_ENV = "PLUTO_QUEUE_HANDLER_CONCURRENCY"
+
+# The pool is created on the first invocation and reused by the following ones of a warm container.
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def handle_events(
+    user_handler: Callable[..., None], events: List[CloudEvent]
+) -> List[Tuple[int, Exception]]:
+    """
+    Pass the events received by a subscriber of a queue to the user handler, either all at once to
+    a batch handler, or one by one, possibly on a thread pool.
+
+    Returns:
+        The indexes of the events that failed, and their errors.
+    """
+    if len(events) == 0:
+        return []
+
+    if os.environ.get(BATCH_HANDLER_ENV) == "true":
+        try:
+            user_handler(events)
+            return []
+        except Exception as e:
+            print("Pluto: Failed to handle the batch of events: ", events)
+            traceback.print_exception(type(e), e, e.__traceback__)
+            return [(index, e) for index in range(len(events))]
+
+    def handle(index: int) -> Optional[Tuple[int, Exception]]:
+        try:
+            user_handler(events[index])
+            return None
+        except Exception as e:
+            print("Pluto: Failed to handle event: ", events[index])
+            traceback.print_exception(type(e), e, e.__traceback__)
+            return (index, e)
+
+    concurrency = int(os.environ.get(HANDLER_CONCURRENCY_ENV, "1"))
+    if concurrency <= 1 or len(events) <= 1:
+        results = [handle(index) for index in range(len(events))]
+    else:
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=concurrency)
+        results = list(_executor.map(handle, range(len(events))))
+    return [failure for failure in results if failure is not None]
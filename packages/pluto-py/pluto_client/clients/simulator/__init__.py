@@ -0,0 +1,2 @@
+from .kvstore import SimKVStoreClient
+from .queue import SimQueueClient
@@ -0,0 +1,79 @@
+import base64
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from ...kvstore import DEFAULT_SCAN_PAGE_SIZE
+
+# The simulator is called over JSON, the bytes values are sent as an object tagged with this key.
+BINARY_TAG = "$binary"
+
+OP_NAMES = {
+    "get_many": "getMany",
+    "set_many": "setMany",
+    "set_if": "setIf",
+    "scan_page": "scanPage",
+}
+"""The names of the methods of the simulated KVStore, keyed by the names of the Python methods."""
+
+
+class SimKVStoreClient:
+    """
+    The client of a simulated KVStore. The operations are forwarded to the simulator, except for
+    the scan, which has to be driven by the client since a generator can't be sent back from the
+    simulator. The bytes values are tagged on the way in and out, since the calls are sent as JSON.
+    """
+
+    def __init__(self, client: Any):
+        self.__client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__client, name)
+
+    def get(self, key: str) -> Any:
+        return _from_wire(self.__client.get(key))
+
+    def set(self, key: str, val: Any) -> None:
+        self.__client.set(key, _to_wire(val))
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        found = self.__client.get_many(keys)
+        return {key: _from_wire(val) for key, val in found.items()}
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        self.__client.set_many({key: _to_wire(val) for key, val in items.items()})
+
+    # The simulator client only takes positional arguments, the ones with defaults are defined here
+    # to accept keyword arguments as well.
+    def incr(self, key: str, delta: int = 1) -> int:
+        return self.__client.incr(key, delta)
+
+    def set_if(self, key: str, val: Any, expected: Optional[Any] = None) -> bool:
+        return self.__client.set_if(key, _to_wire(val), _to_wire(expected))
+
+    def scan(
+        self,
+        prefix: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+    ) -> Iterator[Tuple[str, Any]]:
+        # The simulator keeps the keys sorted, so the pages are fetched one after another, each
+        # starting after the last key of the previous one. The segments don't apply.
+        start_after: Optional[str] = None
+        while True:
+            page = self.__client.scan_page(prefix, start_after, page_size)
+            for key, val in page["items"]:
+                yield key, _from_wire(val)
+
+            start_after = page.get("lastKey")
+            if start_after is None:
+                return
+
+
+def _to_wire(val: Any) -> Any:
+    if isinstance(val, (bytes, bytearray)):
+        return {BINARY_TAG: base64.b64encode(val).decode("ascii")}
+    return val
+
+
+def _from_wire(val: Any) -> Any:
+    if isinstance(val, dict) and len(val) == 1 and BINARY_TAG in val:
+        return base64.b64decode(val[BINARY_TAG])
+    return val
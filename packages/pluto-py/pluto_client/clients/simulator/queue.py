@@ -0,0 +1,28 @@
+from typing import Any, List
+from ...queue import QueuePushFailure
+
+OP_NAMES = {"push_many": "pushMany"}
+"""The names of the methods of the simulated Queue, keyed by the names of the Python methods."""
+
+
+class SimQueueClient:
+    """
+    The client of a simulated Queue. The failures of a bulk push are returned by the simulator as
+    JSON objects, they are converted to `QueuePushFailure` like with the other platforms.
+    """
+
+    def __init__(self, client: Any):
+        self.__client = client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__client, name)
+
+    def push(self, msg: str) -> None:
+        self.__client.push(msg)
+
+    def push_many(self, msgs: List[str]) -> List[QueuePushFailure]:
+        failures = self.__client.push_many(msgs)
+        return [
+            QueuePushFailure(index=f["index"], code=f["code"], reason=f["reason"])
+            for f in failures
+        ]
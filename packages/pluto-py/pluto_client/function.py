@@ -27,6 +27,14 @@ class FunctionOptions:
     memory: int | None = 128  # The memory size in MB, default is 128.
     envs: Dict[str, Any] | None = None
     raw: bool = False  # This option only works for the AWS currently.
+    # The settings of the AWS SDK clients used by the function, e.g. to reach the other resources.
+    # Unset ones keep their defaults. They only work for AWS currently.
+    aws_max_pool_connections: int | None = None
+    aws_tcp_keepalive: bool | None = None  # Default is True.
+    aws_connect_timeout: float | None = None  # In seconds.
+    aws_read_timeout: float | None = None  # In seconds.
+    aws_retry_mode: str | None = None  # "legacy", "standard" or "adaptive", default is "standard".
+    aws_max_attempts: int | None = None  # Including the initial attempt.
 
 
 class IFunctionClientApi(Generic[FnHandler], IResourceClientApi):
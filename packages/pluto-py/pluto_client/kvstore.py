@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pluto_base.resource import (
     IResource,
     IResourceCapturedProps,
@@ -10,10 +10,59 @@ from pluto_base.platform import PlatformType
 from pluto_base import utils
 from .utils import create_simulator_client
 
+DEFAULT_SCAN_PAGE_SIZE = 100
+"""The number of entries fetched per request when scanning a KVStore."""
+
 
 @dataclass
 class KVStoreOptions:
-    pass
+    sim_persistent: Optional[bool] = None
+    """
+    Whether to persist the entries of the KVStore under the state directory of the stack when
+    running the project with `pluto run`, so that they survive the restarts of the simulator. If
+    not provided, the entries are kept in memory only.
+    """
+    codec: Optional[str] = None
+    """
+    The codec of the values, one of:
+    - "str": the values are strings, as the default.
+    - "bytes": the values are bytes, stored as the Binary type in DynamoDB.
+    - "json": the values are JSON-compatible objects, stored as the native types in DynamoDB, e.g.
+      a dict as a Map, so they aren't serialized into strings.
+    - "msgpack": the values are serialized in the MessagePack format and stored as bytes, which
+      requires the `msgpack` package.
+    """
+    cache: Optional[bool] = None
+    """
+    Whether to cache the values read by the client in the process, so that the hot keys are read
+    from the KVStore once per `cache_ttl` instead of on every request. The cache survives across
+    the invocations served by a warm container. The values set through the client update the
+    cache, but the changes made by other processes are only seen once the cached entries expire.
+    """
+    cache_max_entries: Optional[int] = None
+    """
+    The maximum number of entries in the cache. The least recently used entries are evicted beyond
+    it. If not provided, it will be 1000.
+    """
+    cache_max_bytes: Optional[int] = None
+    """
+    The maximum total size of the keys and values in the cache, in bytes. The least recently used
+    entries are evicted beyond it. If not provided, it will be 16 MiB.
+    """
+    cache_ttl: Optional[float] = None
+    """
+    The time in seconds an entry stays in the cache. If not provided, it will be 60 seconds.
+    """
+
+
+@dataclass
+class KVStoreCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    """The number of entries evicted to make room, not including the expired ones."""
+    entries: int
+    bytes: int
 
 
 class IKVStoreRegularApi:
@@ -25,12 +74,69 @@ class IKVStoreRegularApi:
     def aws_partition_key(self) -> str:
         raise NotImplementedError
 
+    def cache_stats(self) -> KVStoreCacheStats:
+        """
+        Get the statistics of the client-side cache. Only available when the cache is enabled.
+        """
+        raise NotImplementedError
+
 
 class IKVStoreClientApi(IResourceClientApi):
-    def get(self, key: str) -> str:
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, val: Any) -> None:
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Get the values of multiple keys in bulk. The keys that don't exist are left out of the
+        returned dictionary.
+        """
+        raise NotImplementedError
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        """
+        Set the values of multiple keys in bulk.
+        """
+        raise NotImplementedError
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        """
+        Atomically add the delta to the numeric value of the key, in a single round trip. A key
+        that doesn't exist starts from 0.
+
+        Returns:
+            The value after the increment.
+        """
+        raise NotImplementedError
+
+    def set_if(self, key: str, val: Any, expected: Optional[Any] = None) -> bool:
+        """
+        Atomically set the value of the key, only if its current value equals the expected one. If
+        the expected value is None, the value is only set if the key doesn't exist.
+
+        Returns:
+            Whether the value was set.
+        """
         raise NotImplementedError
 
-    def set(self, key: str, val: str) -> None:
+    def scan(
+        self,
+        prefix: Optional[str] = None,
+        page_size: int = DEFAULT_SCAN_PAGE_SIZE,
+        segments: int = 1,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Iterate over the key-value pairs lazily, fetching one page of entries at a time, so the
+        memory used doesn't grow with the size of the KVStore.
+
+        Args:
+            prefix: Only the keys starting with the prefix are returned, if provided.
+            page_size: The maximum number of entries fetched per request.
+            segments: The number of segments scanned in parallel. Only DynamoDB supports it, the
+                pairs are returned in no particular order when it's greater than 1.
+        """
         raise NotImplementedError
 
 
@@ -61,8 +167,23 @@ class KVStore(IResource, IKVStoreClient, IKVStoreInfra):
             self._client = aws.DynamoKVStore(name, opts)
 
         elif platform_type == PlatformType.Simulator:
+            from .clients.simulator import SimKVStoreClient
+            from .clients.simulator.kvstore import OP_NAMES
+
             resource_id = utils.gen_resource_id(KVStore.fqn, name)
-            self._client = create_simulator_client(resource_id)  # type: ignore
+            client = create_simulator_client(resource_id, OP_NAMES)
+            self._client = SimKVStoreClient(client)  # type: ignore
 
         else:
             raise ValueError(f"not support this runtime '{platform_type}'")
+
+        if opts is not None and opts.codec:
+            from .clients.shared import EncodedKVStore, get_codec
+
+            self._client = EncodedKVStore(self._client, get_codec(opts.codec))
+
+        # The cache wraps the codec, so it holds the decoded values.
+        if opts is not None and opts.cache:
+            from .clients.shared import CachedKVStore
+
+            self._client = CachedKVStore(self._client, opts)
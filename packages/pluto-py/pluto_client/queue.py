@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Any, Callable, Optional
+from typing import Any, Callable, List, Optional, Union
 from pluto_base.resource import (
     IResource,
     IResourceCapturedProps,
@@ -18,11 +18,79 @@ class CloudEvent:
 
 
 EventHandler = Callable[[CloudEvent], None]
+BatchEventHandler = Callable[[List[CloudEvent]], None]
+
+
+@dataclass
+class QueuePushFailure:
+    index: int
+    """The index of the message in the list passed to `push_many`."""
+    code: str
+    reason: str
 
 
 @dataclass
 class QueueOptions:
-    pass
+    service: Optional[str] = None
+    """
+    The AWS service backing the queue, "SNS" or "SQS". With SNS, every message invokes the
+    subscriber on its own. With SQS, the subscriber is invoked with batches of messages polled from
+    the queue, which suits the high-volume queues. If not provided, it will be "SNS".
+    """
+    sqs_batch_size: Optional[int] = None
+    """
+    The maximum number of messages the SQS queue passes to the subscriber in one invocation, up to
+    10000. It must be 10 or less unless `sqs_batch_window` is set. If not provided, it will be 10.
+    """
+    sqs_batch_window: Optional[int] = None
+    """
+    The maximum time in seconds the SQS queue gathers the messages before invoking the subscriber,
+    up to 300. If not provided, it will be 0, which means the subscriber is invoked as soon as there
+    are messages.
+    """
+    sqs_max_concurrency: Optional[int] = None
+    """
+    The maximum number of concurrent invocations of the subscriber by the SQS queue, between 2 and
+    1000. If not provided, it's only bounded by the concurrency of the account.
+    """
+    batch_handler: Optional[bool] = None
+    """
+    Whether the subscriber takes the list of events delivered in one invocation, instead of one
+    event at a time. If the handler raises, all the events of the invocation are retried.
+    """
+    handler_concurrency: Optional[int] = None
+    """
+    The number of events of an invocation handled concurrently on a thread pool, for the I/O-bound
+    subscribers. It doesn't apply to a batch handler. If not provided, the events are handled one
+    after another.
+    """
+    sim_buffer_size: Optional[int] = None
+    """
+    The maximum number of messages buffered by the simulated queue when running the project with
+    `pluto run`. Once it's full, the pushes wait for the subscriber to catch up. If not provided, it
+    will be 1000.
+    """
+    sim_batch_size: Optional[int] = None
+    """
+    The maximum number of messages the simulated queue delivers to the subscriber in one batch. The
+    messages of a batch are handled one after another. If not provided, it will be 1.
+    """
+    sim_batch_window: Optional[int] = None
+    """
+    The time in milliseconds the simulated queue waits for a batch to fill up before delivering it.
+    If not provided, it will be 0, which means the batch is delivered as soon as possible.
+    """
+    sim_concurrency: Optional[int] = None
+    """
+    The maximum number of batches the simulated queue delivers to the subscriber concurrently. If
+    not provided, it will be 4.
+    """
+    sim_push_timeout: Optional[int] = None
+    """
+    The maximum time in milliseconds `push_many` of the simulated queue waits for room in the
+    buffer. The messages that don't fit in time are reported as failed. If not provided, it will be
+    30000.
+    """
 
 
 class IQueueClientApi(IResourceClientApi):
@@ -33,9 +101,19 @@ class IQueueClientApi(IResourceClientApi):
     def push(self, msg: str) -> Any:
         raise NotImplementedError
 
+    def push_many(self, msgs: List[str]) -> List[QueuePushFailure]:
+        """
+        Push multiple messages in bulk, with far fewer round trips than pushing them one by one. The
+        messages that fail don't stop the others from being pushed.
+
+        Returns:
+            The failures of the messages that weren't pushed, empty if all of them were.
+        """
+        raise NotImplementedError
+
 
 class IQueueInfraApi(IResourceInfraApi):
-    def subscribe(self, fn: EventHandler) -> None:
+    def subscribe(self, fn: Union[EventHandler, BatchEventHandler]) -> None:
         raise NotImplementedError
 
 
@@ -59,11 +137,18 @@ class Queue(IResource, IQueueClient, IQueueInfra):
         if platform_type == PlatformType.AWS:
             from .clients import aws
 
-            self._client = aws.SNSQueue(name, opts)
+            if opts is not None and opts.service == "SQS":
+                self._client = aws.SQSQueue(name, opts)
+            else:
+                self._client = aws.SNSQueue(name, opts)
 
         elif platform_type == PlatformType.Simulator:
+            from .clients.simulator import SimQueueClient
+            from .clients.simulator.queue import OP_NAMES
+
             resource_id = utils.gen_resource_id(Queue.fqn, name)
-            self._client = create_simulator_client(resource_id)  # type: ignore
+            client = create_simulator_client(resource_id, OP_NAMES)
+            self._client = SimQueueClient(client)  # type: ignore
 
         else:
             raise ValueError(f"not support this runtime '{platform_type}'")
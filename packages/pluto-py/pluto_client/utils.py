@@ -1,9 +1,48 @@
 import os
-from pluto_base import simulator
+import importlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
-def create_simulator_client(resource_id: str):
+def create_simulator_client(resource_id: str, op_names: Optional[Dict[str, str]] = None):
     simulator_url = os.getenv("PLUTO_SIMULATOR_URL")
     if simulator_url is None:
         raise Exception("PLUTO_SIMULATOR_URL doesn't exist")
-    return simulator.make_simulator_client(simulator_url, resource_id)
+
+    # Imported here, since the simulator client pulls in `requests`, which is only needed when
+    # running on the simulator.
+    from pluto_base import simulator
+
+    # The socket is only usable if the simulator runs on the same host, the client falls back to
+    # the URL otherwise.
+    socket_path = os.getenv("PLUTO_SIMULATOR_SOCKET")
+    return simulator.make_simulator_client(simulator_url, resource_id, socket_path, op_names)
+
+
+def lazy_attrs(
+    module_globals: Dict[str, Any], attr_modules: Dict[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build the `__getattr__` and `__dir__` of a package (PEP 562), which load the submodule defining
+    an attribute on its first access, so that importing the package doesn't import all of them.
+
+    Args:
+        module_globals (Dict[str, Any]): The `globals()` of the package.
+        attr_modules (Dict[str, str]): The relative names of the submodules, keyed by the names of
+            the attributes they define.
+    """
+    package = module_globals["__name__"]
+
+    def __getattr__(name: str) -> Any:
+        module_name = attr_modules.get(name)
+        if module_name is None:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'")
+
+        value = getattr(importlib.import_module(module_name, package), name)
+        # Cache the attribute in the package, so the later accesses don't reach this function.
+        module_globals[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(module_globals) | set(attr_modules))
+
+    return __getattr__, __dir__
@@ -0,0 +1,88 @@
+"""
+Cold-start benchmark for the AWS clients of the resource types.
+
+It constructs each resource type the way an extracted closure does at import time, and counts the
+work done during that init phase: the SDK clients created, the AWS API calls made and the time
+spent. The API calls are intercepted and never reach AWS, so no credentials are required.
+
+Usage:
+    python tests/bench_cold_start.py
+"""
+
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import boto3
+from botocore.client import BaseClient
+
+
+class InitCounter:
+    def __init__(self):
+        self.clients = 0
+        self.api_calls: List[str] = []
+
+    def reset(self):
+        self.clients = 0
+        self.api_calls = []
+
+
+def instrument(counter: InitCounter):
+    orig_client = boto3.session.Session.client
+    orig_resource = boto3.session.Session.resource
+
+    def client(self, *args, **kwargs):
+        counter.clients += 1
+        return orig_client(self, *args, **kwargs)
+
+    def resource(self, *args, **kwargs):
+        counter.clients += 1
+        return orig_resource(self, *args, **kwargs)
+
+    def make_api_call(self, operation_name: str, api_params: Dict[str, Any]):
+        counter.api_calls.append(f"{self.meta.service_model.service_name}:{operation_name}")
+        return {}
+
+    boto3.session.Session.client = client  # type: ignore
+    boto3.session.Session.resource = resource  # type: ignore
+    BaseClient._make_api_call = make_api_call  # type: ignore
+
+
+def resource_factories() -> List[Tuple[str, Callable[[], Any]]]:
+    from pluto_client import Bucket, Function, KVStore, Queue, Secret
+    from pluto_client.sagemaker import SageMaker
+
+    return [
+        ("Queue", lambda: Queue("bench")),
+        ("KVStore", lambda: KVStore("bench")),
+        ("Bucket", lambda: Bucket("bench")),
+        ("Secret", lambda: Secret("bench", "value")),
+        ("Function", lambda: Function(lambda: None, "bench")),
+        ("SageMaker", lambda: SageMaker("bench", "image-uri")),
+    ]
+
+
+def main():
+    os.environ["PLUTO_PLATFORM_TYPE"] = "AWS"
+    os.environ.setdefault("PLUTO_PROJECT_NAME", "bench")
+    os.environ.setdefault("PLUTO_STACK_NAME", "bench")
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ.setdefault("AWS_DEFAULT_REGION", os.environ["AWS_REGION"])
+
+    counter = InitCounter()
+    instrument(counter)
+
+    print(f"{'resource':<10} {'clients':>8} {'api calls':>10} {'init ms':>10}")
+    for name, factory in resource_factories():
+        counter.reset()
+        start = time.perf_counter()
+        factory()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"{name:<10} {counter.clients:>8} {len(counter.api_calls):>10} {elapsed_ms:>10.2f}"
+            + (f"  {', '.join(counter.api_calls)}" if counter.api_calls else "")
+        )
+
+
+if __name__ == "__main__":
+    main()
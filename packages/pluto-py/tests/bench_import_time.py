@@ -0,0 +1,93 @@
+"""
+Import-time benchmark for the pluto_client package, built on `python -X importtime`.
+
+For each public name of the package, it imports the name in a fresh interpreter and reports the
+import time and the number of modules loaded, excluding the ones loaded by the interpreter
+startup. Passing `--max-us` turns it into a regression check, which fails if any import exceeds the
+budget.
+
+Usage:
+    python tests/bench_import_time.py [--max-us N] [NAME ...]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, Set, Tuple
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def run_importtime(code: str) -> List[Tuple[int, int, str]]:
+    """
+    Run the code in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        The (cumulative us, depth, module) entries, in the order they are printed.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Failed to run '{code}':\n{proc.stderr}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        matched = IMPORTTIME_LINE.match(line)
+        if matched:
+            entries.append((int(matched[2]), len(matched[3]) // 2, matched[4]))
+    return entries
+
+
+def measure(name: str, startup_modules: Set[str]) -> Tuple[int, List[str]]:
+    """
+    Import the name from pluto_client in a fresh interpreter.
+
+    Returns:
+        The cumulative import time in microseconds, and the modules loaded by the import.
+    """
+    total_us = 0
+    modules: List[str] = []
+    for cumulative, depth, module in run_importtime(f"from pluto_client import {name}"):
+        if module in startup_modules:
+            continue
+        modules.append(module)
+        # The nested entries are already included in the cumulative time of the top-level ones.
+        if depth == 0:
+            total_us += cumulative
+    return total_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("names", nargs="*", help="The names to import, defaults to all.")
+    parser.add_argument("--max-us", type=int, help="The import time budget in microseconds.")
+    args = parser.parse_args()
+
+    names = args.names
+    if not names:
+        import pluto_client
+
+        names = pluto_client.__all__
+
+    # The modules loaded by the interpreter startup are not part of the import.
+    startup_modules = {module for _, _, module in run_importtime("pass")}
+
+    failed = False
+    print(f"{'name':<16} {'import us':>10} {'modules':>8}")
+    for name in names:
+        total_us, modules = measure(name, startup_modules)
+        over_budget = args.max_us is not None and total_us > args.max_us
+        failed = failed or over_budget
+        mark = "  OVER BUDGET" if over_budget else ""
+        print(f"{name:<16} {total_us:>10} {len(modules):>8}{mark}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import threading
+from typing import Callable, Iterator, List
+
+import pytest
+from pluto_client.clients.aws.utils import (
+    MESSAGE_BATCH_MAX_BYTES,
+    MESSAGE_BATCH_MAX_ENTRIES,
+    chunk_messages,
+    get_aws_config,
+    iterate_in_parallel,
+)
+
+
+def finite(name: str, count: int) -> Callable[[], Iterator[str]]:
+    def produce() -> Iterator[str]:
+        for i in range(count):
+            yield f"{name}-{i}"
+
+    return produce
+
+
+def test_iterate_in_parallel_yields_all_items():
+    producers = [finite("a", 5), finite("b", 0), finite("c", 20)]
+    items = list(iterate_in_parallel(producers))
+
+    expected = [f"a-{i}" for i in range(5)] + [f"c-{i}" for i in range(20)]
+    assert sorted(items) == sorted(expected)
+    # The items of a producer keep their order.
+    assert [item for item in items if item.startswith("c-")] == [f"c-{i}" for i in range(20)]
+
+
+def test_iterate_in_parallel_with_one_producer():
+    assert list(iterate_in_parallel([finite("a", 3)])) == ["a-0", "a-1", "a-2"]
+
+
+def test_iterate_in_parallel_stops_producers_on_break():
+    stopped: List[threading.Event] = []
+    produced = [0, 0]
+
+    def endless(idx: int) -> Callable[[], Iterator[int]]:
+        done = threading.Event()
+        stopped.append(done)
+
+        def produce() -> Iterator[int]:
+            try:
+                while True:
+                    produced[idx] += 1
+                    yield idx
+            finally:
+                done.set()
+
+        return produce
+
+    for _ in iterate_in_parallel([endless(0), endless(1)]):
+        if sum(produced) > 10:
+            break
+
+    for done in stopped:
+        assert done.wait(timeout=5), "The producer wasn't stopped."
+    # The producers are paused by the bounded buffer, so they don't run far ahead.
+    assert sum(produced) < 100
+
+
+def test_iterate_in_parallel_propagates_errors():
+    def failing() -> Iterator[str]:
+        yield "x-0"
+        raise RuntimeError("producer failed")
+
+    with pytest.raises(RuntimeError, match="producer failed"):
+        for _ in iterate_in_parallel([finite("a", 3), failing]):
+            pass
+
+
+def test_chunk_messages_by_count():
+    bodies = [str(i) for i in range(2 * MESSAGE_BATCH_MAX_ENTRIES + 1)]
+    chunks = list(chunk_messages(bodies))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 1]
+    # Each message is paired with its index.
+    assert [index for chunk in chunks for index, _ in chunk] == list(range(len(bodies)))
+    assert chunks[2] == [(20, "20")]
+
+
+def test_chunk_messages_by_size():
+    # Two halves fill a batch exactly, one more byte starts a new one.
+    half = "x" * (MESSAGE_BATCH_MAX_BYTES // 2)
+    assert [len(c) for c in chunk_messages([half, half])] == [2]
+    assert [len(c) for c in chunk_messages([half, half, "y"])] == [2, 1]
+    assert [len(c) for c in chunk_messages([half, half + "y"])] == [1, 1]
+
+
+def test_chunk_messages_counts_utf8_bytes():
+    # Each character takes 3 bytes in UTF-8, so the two messages fit by length but not by size.
+    body = "\u4e2d" * (MESSAGE_BATCH_MAX_BYTES // 4)
+    assert [len(c) for c in chunk_messages([body, body])] == [1, 1]
+
+
+def test_chunk_messages_keeps_oversized_message_alone():
+    # A message over the limit is sent in a batch of its own, to be rejected by the service.
+    big = "x" * (MESSAGE_BATCH_MAX_BYTES + 1)
+    assert [len(c) for c in chunk_messages(["a", big, "b"])] == [1, 1, 1]
+
+
+def test_chunk_messages_of_nothing():
+    assert list(chunk_messages([])) == []
+
+
+def test_get_aws_config_defaults(monkeypatch: pytest.MonkeyPatch):
+    for name in ("PLUTO_AWS_CONNECT_TIMEOUT", "PLUTO_AWS_RETRY_MODE", "PLUTO_AWS_MAX_ATTEMPTS"):
+        monkeypatch.delenv(name, raising=False)
+
+    config = get_aws_config()
+    assert config.tcp_keepalive is True
+    assert config.retries == {"mode": "standard"}
+    # The timeouts keep the botocore defaults.
+    assert config.connect_timeout == 60
+
+
+def test_get_aws_config_from_envs(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("PLUTO_AWS_MAX_POOL_CONNECTIONS", "5")
+    monkeypatch.setenv("PLUTO_AWS_TCP_KEEPALIVE", "false")
+    monkeypatch.setenv("PLUTO_AWS_CONNECT_TIMEOUT", "1.5")
+    monkeypatch.setenv("PLUTO_AWS_READ_TIMEOUT", "3")
+    monkeypatch.setenv("PLUTO_AWS_RETRY_MODE", "adaptive")
+    monkeypatch.setenv("PLUTO_AWS_MAX_ATTEMPTS", "2")
+
+    config = get_aws_config()
+    assert config.max_pool_connections == 5
+    assert config.tcp_keepalive is False
+    assert (config.connect_timeout, config.read_timeout) == (1.5, 3.0)
+    assert config.retries == {"mode": "adaptive", "total_max_attempts": 2}
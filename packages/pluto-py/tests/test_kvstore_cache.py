@@ -0,0 +1,258 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytest
+from pluto_client.kvstore import KVStoreOptions
+from pluto_client.clients.shared import kvstore_cache
+from pluto_client.clients.shared.kvstore_cache import CachedKVStore, LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(kvstore_cache.time, "monotonic", fake.monotonic)
+    return fake
+
+
+class FakeKVStoreClient:
+    """
+    An in-memory client recording the calls, in place of the client of a KVStore.
+    """
+
+    def __init__(self):
+        self.items: Dict[str, str] = {}
+        self.calls: List[Tuple[str, object]] = []
+
+    def get(self, key: str) -> str:
+        self.calls.append(("get", key))
+        return self.items[key]
+
+    def set(self, key: str, val: str) -> None:
+        self.calls.append(("set", key))
+        self.items[key] = val
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        self.calls.append(("get_many", list(keys)))
+        return {key: self.items[key] for key in keys if key in self.items}
+
+    def set_many(self, items: Dict[str, str]) -> None:
+        self.calls.append(("set_many", list(items)))
+        self.items.update(items)
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        self.calls.append(("incr", key))
+        val = int(self.items.get(key, 0)) + delta
+        self.items[key] = val  # type: ignore
+        return val
+
+    def set_if(self, key: str, val: str, expected: Optional[str] = None) -> bool:
+        self.calls.append(("set_if", key))
+        if self.items.get(key) != expected:
+            return False
+        self.items[key] = val
+        return True
+
+    def scan(self, prefix=None, page_size=100, segments=1) -> Iterator[Tuple[str, str]]:
+        self.calls.append(("scan", prefix))
+        return iter(sorted(self.items.items()))
+
+
+def reads(client: FakeKVStoreClient) -> List[Tuple[str, object]]:
+    return [call for call in client.calls if call[0] in ("get", "get_many")]
+
+
+def test_lru_cache_hit_and_miss(clock: FakeClock):
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=10)
+
+    assert cache.get("a") == (False, None)
+    cache.put("a", "1")
+    assert cache.get("a") == (True, "1")
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_lru_cache_evicts_the_least_recently_used(clock: FakeClock):
+    cache = LRUCache(max_entries=2, max_bytes=1024, ttl=10)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    # Using "a" makes "b" the least recently used one.
+    assert cache.get("a") == (True, "1")
+    cache.put("c", "3")
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, "1")
+    assert cache.get("c") == (True, "3")
+    assert cache.stats().evictions == 1
+
+
+def test_lru_cache_expires_after_ttl(clock: FakeClock):
+    cache = LRUCache(max_entries=10, max_bytes=1024, ttl=10)
+    cache.put("a", "1")
+
+    clock.now += 9.9
+    assert cache.get("a") == (True, "1")
+    clock.now += 0.1
+    assert cache.get("a") == (False, None)
+
+    # The expired entry is dropped, but isn't counted as an eviction.
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (0, 0, 0)
+
+
+def test_lru_cache_accounts_bytes(clock: FakeClock):
+    cache = LRUCache(max_entries=10, max_bytes=10, ttl=10)
+    cache.put("a", "1234")
+    cache.put("b", "1234")
+    assert cache.stats().bytes == 10
+
+    # Replacing an entry releases the size of the old value.
+    cache.put("a", "12")
+    assert cache.stats().bytes == 8
+
+    # The new entry doesn't fit, so the least recently used one is evicted.
+    cache.put("c", "123")
+    stats = cache.stats()
+    assert (stats.entries, stats.bytes, stats.evictions) == (2, 7, 1)
+    assert cache.get("b") == (False, None)
+
+    cache.remove("a")
+    assert cache.stats().bytes == 4
+
+
+def test_lru_cache_skips_values_larger_than_the_limit(clock: FakeClock):
+    cache = LRUCache(max_entries=10, max_bytes=10, ttl=10)
+    cache.put("a", "1")
+    cache.put("big", "x" * 100)
+
+    assert cache.get("big") == (False, None)
+    assert cache.get("a") == (True, "1")
+    assert cache.stats().evictions == 0
+
+
+def test_lru_cache_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=0, max_bytes=10, ttl=10)
+    with pytest.raises(ValueError):
+        LRUCache(max_entries=10, max_bytes=10, ttl=0)
+
+
+def test_cached_get_reads_through_once(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    inner.items["a"] = "1"
+    client = CachedKVStore(inner, KVStoreOptions(cache_ttl=10))
+
+    assert client.get("a") == "1"
+    assert client.get("a") == "1"
+    assert reads(inner) == [("get", "a")]
+
+    clock.now += 10
+    assert client.get("a") == "1"
+    assert reads(inner) == [("get", "a"), ("get", "a")]
+
+
+def test_cached_get_many_reads_the_missing_keys_only(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    inner.items.update({"a": "1", "b": "2", "c": "3"})
+    client = CachedKVStore(inner)
+
+    assert client.get("a") == "1"
+    assert client.get_many(["a", "b", "x"]) == {"a": "1", "b": "2"}
+    assert reads(inner) == [("get", "a"), ("get_many", ["b", "x"])]
+
+    # The key not found isn't cached, it's read again.
+    assert client.get_many(["a", "b", "x"]) == {"a": "1", "b": "2"}
+    assert reads(inner)[-1] == ("get_many", ["x"])
+
+
+def test_cached_writes_update_the_cache(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    client = CachedKVStore(inner)
+
+    client.set("a", "1")
+    client.set_many({"b": "2", "c": "3"})
+    assert client.get("a") == "1"
+    assert client.get_many(["b", "c"]) == {"b": "2", "c": "3"}
+    assert reads(inner) == []
+    assert inner.items == {"a": "1", "b": "2", "c": "3"}
+
+
+def test_cached_set_if_invalidates_on_conflict(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    inner.items["a"] = "1"
+    client = CachedKVStore(inner)
+
+    assert client.set_if("a", "2", expected="1")
+    assert client.get("a") == "2"
+    assert reads(inner) == []
+
+    # Changed by another process, so the cached value is out of date.
+    inner.items["a"] = "3"
+    assert not client.set_if("a", "4", expected="2")
+    assert client.get("a") == "3"
+    assert reads(inner) == [("get", "a")]
+
+
+def test_cached_incr_invalidates_the_key(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    client = CachedKVStore(inner)
+
+    assert client.get_many(["n"]) == {}
+    assert client.incr("n") == 1
+    assert client.incr("n", 2) == 3
+
+    # The counter is read through the client again, instead of being cached.
+    assert client.get("n") == 3
+    assert reads(inner)[-1] == ("get", "n")
+
+
+def test_cached_get_skips_the_value_written_while_loading(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    inner.items["a"] = "old"
+    client = CachedKVStore(inner)
+
+    original_get = inner.get
+
+    def racing_get(key: str) -> str:
+        val = original_get(key)
+        # Another thread sets the key after the value was read, but before it's cached.
+        client.set(key, "new")
+        return val
+
+    inner.get = racing_get  # type: ignore
+    assert client.get("a") == "old"
+    inner.get = original_get  # type: ignore
+
+    # The cache holds the written value, not the one read before it.
+    assert client.get("a") == "new"
+    assert reads(inner) == [("get", "a")]
+
+
+def test_cached_values_are_copied(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    client = CachedKVStore(inner)
+    val = {"tags": ["a"]}
+    client.set("k", val)  # type: ignore
+
+    val["tags"].append("b")
+    got = client.get("k")
+    assert got == {"tags": ["a"]}
+
+    got["tags"].append("c")  # type: ignore
+    assert client.get("k") == {"tags": ["a"]}
+
+
+def test_cached_scan_bypasses_the_cache(clock: FakeClock):
+    inner = FakeKVStoreClient()
+    inner.items.update({"a": "1", "b": "2"})
+    client = CachedKVStore(inner)
+
+    assert list(client.scan()) == [("a", "1"), ("b", "2")]
+    assert client.cache_stats().entries == 0
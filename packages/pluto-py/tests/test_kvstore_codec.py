@@ -0,0 +1,167 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+from pluto_client.clients.shared.kvstore_codec import (
+    BytesCodec,
+    EncodedKVStore,
+    JsonCodec,
+    StrCodec,
+    get_codec,
+)
+from pluto_client.clients.simulator.kvstore import BINARY_TAG, SimKVStoreClient
+
+
+class FakeKVStoreClient:
+    """
+    An in-memory client keeping the values as they are stored, in place of a platform client.
+    """
+
+    def __init__(self):
+        self.items: Dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        return self.items[key]
+
+    def set(self, key: str, val: Any) -> None:
+        self.items[key] = val
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        return {key: self.items[key] for key in keys if key in self.items}
+
+    def set_many(self, items: Dict[str, Any]) -> None:
+        self.items.update(items)
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        self.items[key] = self.items.get(key, 0) + delta
+        return self.items[key]
+
+    def set_if(self, key: str, val: Any, expected: Optional[Any] = None) -> bool:
+        if self.items.get(key) != expected:
+            return False
+        self.items[key] = val
+        return True
+
+    def scan(self, prefix=None, page_size=100, segments=1):
+        return iter(sorted(self.items.items()))
+
+
+class FakeSimulatorClient(FakeKVStoreClient):
+    """
+    Send every call through JSON, as the simulator client does.
+    """
+
+    def __getattribute__(self, name: str) -> Any:
+        attr = super().__getattribute__(name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        def call(*args):
+            result = attr(*json.loads(json.dumps(args)))
+            return json.loads(json.dumps(result))
+
+        return call
+
+    def scan_page(self, prefix: Optional[str], start_after: Optional[str], limit: int):
+        keys = sorted(key for key in self.items if key > (start_after or ""))[:limit]
+        page: Dict[str, Any] = {"items": [[key, self.items[key]] for key in keys]}
+        if len(keys) == limit:
+            page["lastKey"] = keys[-1]
+        return page
+
+
+def test_str_codec():
+    codec = get_codec("str")
+    assert isinstance(codec, StrCodec)
+    assert codec.decode(codec.encode("value")) == "value"
+    with pytest.raises(TypeError):
+        codec.encode(b"value")
+
+
+def test_bytes_codec():
+    codec = get_codec("bytes")
+    assert isinstance(codec, BytesCodec)
+    assert codec.encode(bytearray(b"\x00\xff")) == b"\x00\xff"
+    assert codec.decode(codec.encode(b"\x00\xff")) == b"\x00\xff"
+    with pytest.raises(TypeError):
+        codec.encode("value")
+
+
+def test_json_codec():
+    codec = get_codec("json")
+    assert isinstance(codec, JsonCodec)
+    val = {"name": "pluto", "tags": ["a", "b"], "count": 3, "nested": {"ok": True}}
+    # The values are kept as they are, for the platform clients to store them natively.
+    assert codec.encode(val) is val
+    assert codec.decode(codec.encode(val)) == val
+
+
+def test_msgpack_codec():
+    pytest.importorskip("msgpack")
+    codec = get_codec("msgpack")
+    val = {"name": "pluto", "tags": ["a", "b"], "count": 3, "raw": b"\x00\xff"}
+    encoded = codec.encode(val)
+    assert isinstance(encoded, bytes)
+    assert codec.decode(encoded) == val
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError, match="Unknown codec"):
+        get_codec("pickle")
+
+
+def test_encoded_kvstore_round_trip():
+    inner = FakeKVStoreClient()
+    client = EncodedKVStore(inner, BytesCodec())
+
+    client.set("a", b"1")
+    client.set_many({"b": b"2", "c": bytearray(b"3")})
+    assert client.get("a") == b"1"
+    assert client.get_many(["a", "b", "c", "x"]) == {"a": b"1", "b": b"2", "c": b"3"}
+    assert list(client.scan()) == [("a", b"1"), ("b", b"2"), ("c", b"3")]
+
+    assert client.set_if("a", b"4", expected=b"1")
+    assert not client.set_if("a", b"5", expected=b"1")
+    assert client.get("a") == b"4"
+
+    # The counters aren't encoded.
+    assert client.incr("n", 2) == 2
+    assert inner.items["n"] == 2
+
+    with pytest.raises(TypeError):
+        client.set("d", "not bytes")
+
+
+def test_encoded_kvstore_round_trip_with_msgpack():
+    pytest.importorskip("msgpack")
+    inner = FakeKVStoreClient()
+    client = EncodedKVStore(inner, get_codec("msgpack"))
+
+    client.set("a", {"list": [1, 2, 3]})
+    assert isinstance(inner.items["a"], bytes)
+    assert client.get("a") == {"list": [1, 2, 3]}
+
+
+def test_bytes_through_the_simulator_wire_format():
+    inner = FakeSimulatorClient()
+    client = EncodedKVStore(SimKVStoreClient(inner), BytesCodec())
+
+    client.set("a", b"\x00\xff")
+    client.set_many({"b": b"\x01"})
+    # The bytes are tagged, since the calls are sent as JSON.
+    assert inner.items["a"] == {BINARY_TAG: "AP8="}
+
+    assert client.get("a") == b"\x00\xff"
+    assert client.get_many(["a", "b"]) == {"a": b"\x00\xff", "b": b"\x01"}
+    assert client.set_if("a", b"\x02", expected=b"\x00\xff")
+    assert list(client.scan()) == [("a", b"\x02"), ("b", b"\x01")]
+
+
+def test_other_values_through_the_simulator_wire_format():
+    inner = FakeSimulatorClient()
+    client = SimKVStoreClient(inner)
+
+    client.set("a", "text")
+    client.set("b", {"nested": [1, 2]})
+    assert client.get("a") == "text"
+    assert client.get("b") == {"nested": [1, 2]}
@@ -0,0 +1,230 @@
+import threading
+from typing import Any, Dict, List
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+from pluto_client.clients.aws import kvstore_dynamodb
+from pluto_client.clients.aws.kvstore_dynamodb import DynamoKVStore
+
+
+@pytest.fixture
+def env(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("PLUTO_PROJECT_NAME", "test-project")
+    monkeypatch.setenv("PLUTO_STACK_NAME", "test-stack")
+
+
+@pytest.fixture
+def client(env, monkeypatch: pytest.MonkeyPatch):
+    client = boto3.client(
+        "dynamodb",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    monkeypatch.setattr(kvstore_dynamodb, "get_aws_client", lambda service: client)
+    return client
+
+
+@pytest.fixture
+def stubber(client):
+    with Stubber(client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def item(key: str, val: str) -> Dict[str, Any]:
+    return {"Id": {"S": key}, "Value": {"S": val}}
+
+
+def test_scan_follows_the_pages(stubber: Stubber):
+    store = DynamoKVStore("test")
+    table = store.aws_table_name
+
+    stubber.add_response(
+        "scan",
+        {"Items": [item("a", "1"), item("b", "2")], "LastEvaluatedKey": {"Id": {"S": "b"}}},
+        {"TableName": table, "Limit": 2},
+    )
+    stubber.add_response(
+        "scan",
+        {"Items": [item("c", "3")]},
+        {"TableName": table, "Limit": 2, "ExclusiveStartKey": {"Id": {"S": "b"}}},
+    )
+
+    assert list(store.scan(page_size=2)) == [("a", "1"), ("b", "2"), ("c", "3")]
+
+
+def test_scan_with_prefix_skips_empty_pages(stubber: Stubber):
+    store = DynamoKVStore("test")
+    params = {
+        "TableName": store.aws_table_name,
+        "Limit": 2,
+        "FilterExpression": "begins_with(#pk, :prefix)",
+        "ExpressionAttributeNames": {"#pk": "Id"},
+        "ExpressionAttributeValues": {":prefix": {"S": "user:"}},
+    }
+
+    # The limit is applied before the filter, so a page may have no items but still be followed.
+    stubber.add_response("scan", {"Items": [], "LastEvaluatedKey": {"Id": {"S": "x"}}}, params)
+    stubber.add_response(
+        "scan",
+        {"Items": [item("user:1", "alice")]},
+        {**params, "ExclusiveStartKey": {"Id": {"S": "x"}}},
+    )
+
+    assert list(store.scan(prefix="user:", page_size=2)) == [("user:1", "alice")]
+
+
+class FakeSegmentedClient:
+    """
+    Serve the scan of each segment in two pages, recording the requests.
+    """
+
+    def __init__(self, segments: int):
+        self.segments = segments
+        self.requests: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+    def scan(self, **params):
+        with self.lock:
+            self.requests.append(params)
+        segment = params["Segment"]
+        if "ExclusiveStartKey" not in params:
+            return {
+                "Items": [item(f"{segment}-0", "v")],
+                "LastEvaluatedKey": {"Id": {"S": f"{segment}-0"}},
+            }
+        return {"Items": [item(f"{segment}-1", "v")]}
+
+
+def test_segmented_scan(env, monkeypatch: pytest.MonkeyPatch):
+    client = FakeSegmentedClient(segments=3)
+    monkeypatch.setattr(kvstore_dynamodb, "get_aws_client", lambda service: client)
+    store = DynamoKVStore("test")
+
+    keys = sorted(key for key, _ in store.scan(segments=3))
+    assert keys == ["0-0", "0-1", "1-0", "1-1", "2-0", "2-1"]
+    assert len(client.requests) == 6
+    assert all(request["TotalSegments"] == 3 for request in client.requests)
+
+
+def test_scan_rejects_invalid_segments(env):
+    with pytest.raises(ValueError):
+        list(DynamoKVStore("test").scan(segments=0))
+
+
+@pytest.fixture
+def delays(monkeypatch: pytest.MonkeyPatch) -> List[float]:
+    # The chunks are sent one after another, since the stubbed responses are served in order, and
+    # the delays of the backoff are recorded instead of slept.
+    monkeypatch.setattr(
+        kvstore_dynamodb, "map_in_parallel", lambda fn, chunks: [fn(chunk) for chunk in chunks]
+    )
+    delays: List[float] = []
+    monkeypatch.setattr(kvstore_dynamodb.time, "sleep", delays.append)
+    return delays
+
+
+def get_request(table: str, keys: List[str]) -> Dict[str, Any]:
+    return {"RequestItems": {table: {"Keys": [{"Id": {"S": key}} for key in keys]}}}
+
+
+def write_request(table: str, items: Dict[str, str]) -> Dict[str, Any]:
+    return {
+        "RequestItems": {
+            table: [{"PutRequest": {"Item": item(key, val)}} for key, val in items.items()]
+        }
+    }
+
+
+def test_get_many_in_chunks_of_100(stubber: Stubber, delays: List[float]):
+    store = DynamoKVStore("test")
+    table = store.aws_table_name
+    keys = [f"k{i:03}" for i in range(250)]
+
+    for chunk in (keys[:100], keys[100:200], keys[200:]):
+        stubber.add_response(
+            "batch_get_item",
+            {"Responses": {table: [item(key, key.upper()) for key in chunk]}},
+            get_request(table, chunk),
+        )
+
+    # The duplicated keys are requested once.
+    result = store.get_many(keys + keys[:10])
+    assert result == {key: key.upper() for key in keys}
+    assert delays == []
+
+
+def test_get_many_retries_unprocessed_keys(stubber: Stubber, delays: List[float]):
+    store = DynamoKVStore("test")
+    table = store.aws_table_name
+
+    stubber.add_response(
+        "batch_get_item",
+        {
+            "Responses": {table: [item("a", "1")]},
+            "UnprocessedKeys": get_request(table, ["b", "c"])["RequestItems"],
+        },
+        get_request(table, ["a", "b", "c"]),
+    )
+    stubber.add_response(
+        "batch_get_item",
+        {
+            "Responses": {table: [item("b", "2")]},
+            "UnprocessedKeys": get_request(table, ["c"])["RequestItems"],
+        },
+        get_request(table, ["b", "c"]),
+    )
+    stubber.add_response("batch_get_item", {"Responses": {table: []}}, get_request(table, ["c"]))
+
+    # The key not found isn't in the result.
+    assert store.get_many(["a", "b", "c"]) == {"a": "1", "b": "2"}
+    assert delays == [0.05, 0.1]
+
+
+def test_set_many_in_chunks_of_25(stubber: Stubber, delays: List[float]):
+    store = DynamoKVStore("test")
+    table = store.aws_table_name
+    items = {f"k{i:02}": str(i) for i in range(60)}
+    entries = list(items.items())
+
+    for chunk in (entries[:25], entries[25:50], entries[50:]):
+        stubber.add_response("batch_write_item", {}, write_request(table, dict(chunk)))
+
+    store.set_many(items)
+    assert delays == []
+
+
+def test_set_many_retries_unprocessed_items(stubber: Stubber, delays: List[float]):
+    store = DynamoKVStore("test")
+    table = store.aws_table_name
+
+    stubber.add_response(
+        "batch_write_item",
+        {"UnprocessedItems": write_request(table, {"b": "2"})["RequestItems"]},
+        write_request(table, {"a": "1", "b": "2"}),
+    )
+    stubber.add_response("batch_write_item", {}, write_request(table, {"b": "2"}))
+
+    store.set_many({"a": "1", "b": "2"})
+    assert delays == [0.05]
+
+
+def test_set_many_gives_up_after_retries(
+    stubber: Stubber, delays: List[float], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(kvstore_dynamodb, "BATCH_MAX_RETRIES", 2)
+    store = DynamoKVStore("test")
+    table = store.aws_table_name
+
+    unprocessed = write_request(table, {"a": "1"})
+    for _ in range(3):
+        stubber.add_response(
+            "batch_write_item", {"UnprocessedItems": unprocessed["RequestItems"]}, unprocessed
+        )
+
+    with pytest.raises(RuntimeError, match="unprocessed after 2 retries"):
+        store.set_many({"a": "1"})
+    # No delay after the last attempt.
+    assert delays == [0.05, 0.1]
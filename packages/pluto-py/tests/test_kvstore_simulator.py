@@ -0,0 +1,56 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from pluto_client.clients.simulator.kvstore import SimKVStoreClient
+
+
+class FakeSimulatorClient:
+    """
+    Serve the pages of a scan from the sorted keys, as the simulator does, recording the requests.
+    """
+
+    def __init__(self, items: Dict[str, Any]):
+        self.items = items
+        self.requests: List[Tuple[Optional[str], Optional[str], int]] = []
+
+    def scan_page(self, prefix: Optional[str], start_after: Optional[str], limit: int):
+        self.requests.append((prefix, start_after, limit))
+        keys = sorted(
+            key
+            for key in self.items
+            if key.startswith(prefix or "") and (start_after is None or key > start_after)
+        )
+        page: Dict[str, Any] = {"items": [[key, self.items[key]] for key in keys[:limit]]}
+        if len(keys) > limit:
+            page["lastKey"] = keys[limit - 1]
+        return page
+
+
+def test_scan_follows_the_pages():
+    items = {f"k{i}": str(i) for i in range(5)}
+    inner = FakeSimulatorClient(items)
+    client = SimKVStoreClient(inner)
+
+    assert list(client.scan(page_size=2)) == sorted(items.items())
+    assert inner.requests == [(None, None, 2), (None, "k1", 2), (None, "k3", 2)]
+
+
+def test_scan_with_prefix():
+    inner = FakeSimulatorClient({"a:1": "1", "b:1": "2", "a:2": "3", "a:3": "4"})
+    client = SimKVStoreClient(inner)
+
+    assert list(client.scan(prefix="a:", page_size=2)) == [("a:1", "1"), ("a:2", "3"), ("a:3", "4")]
+    assert inner.requests == [("a:", None, 2), ("a:", "a:2", 2)]
+
+
+def test_scan_stops_early():
+    inner = FakeSimulatorClient({f"k{i}": str(i) for i in range(10)})
+    client = SimKVStoreClient(inner)
+
+    assert next(iter(client.scan(page_size=3))) == ("k0", "0")
+    assert len(inner.requests) == 1
+
+
+def test_scan_of_empty_store():
+    inner = FakeSimulatorClient({})
+    assert list(SimKVStoreClient(inner).scan()) == []
+    assert len(inner.requests) == 1
@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+
+from pluto_client.clients.simulator.queue import SimQueueClient
+from pluto_client.queue import QueuePushFailure
+
+
+class FakeSimulatorClient:
+    def __init__(self, failures: List[Dict[str, Any]]):
+        self.failures = failures
+        self.pushed: List[List[str]] = []
+
+    def push_many(self, msgs: List[str]) -> List[Dict[str, Any]]:
+        self.pushed.append(msgs)
+        return self.failures
+
+
+def test_push_many_converts_the_failures():
+    inner = FakeSimulatorClient([{"index": 1, "code": "Timeout", "reason": "buffer is full"}])
+    client = SimQueueClient(inner)
+
+    failures = client.push_many(["a", "b"])
+    assert inner.pushed == [["a", "b"]]
+    assert failures == [QueuePushFailure(index=1, code="Timeout", reason="buffer is full")]
+
+
+def test_push_many_without_failures():
+    assert SimQueueClient(FakeSimulatorClient([])).push_many(["a"]) == []
@@ -0,0 +1,79 @@
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+from pluto_client.clients.aws import queue_sqs
+from pluto_client.clients.aws.queue_sqs import SQSQueue
+
+QUEUE_URL = "https://sqs.us-east-1.amazonaws.com/123456789012/test-queue"
+
+
+@pytest.fixture
+def env(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("PLUTO_PROJECT_NAME", "test-project")
+    monkeypatch.setenv("PLUTO_STACK_NAME", "test-stack")
+
+
+@pytest.fixture
+def client(env, monkeypatch: pytest.MonkeyPatch):
+    client = boto3.client(
+        "sqs",
+        region_name="us-east-1",
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+    )
+    monkeypatch.setattr(queue_sqs, "get_aws_client", lambda service: client)
+    return client
+
+
+@pytest.fixture
+def stubber(client):
+    with Stubber(client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+def test_push_many_reports_failed_messages(stubber: Stubber):
+    queue = SQSQueue("test")
+    stubber.add_response("get_queue_url", {"QueueUrl": QUEUE_URL}, {"QueueName": ANY})
+    stubber.add_response(
+        "send_message_batch",
+        {
+            "Successful": [
+                {"Id": "0", "MessageId": "m-0", "MD5OfMessageBody": "x"},
+                {"Id": "2", "MessageId": "m-2", "MD5OfMessageBody": "x"},
+            ],
+            "Failed": [
+                {"Id": "1", "SenderFault": False, "Code": "InternalError", "Message": "retry"}
+            ],
+        },
+        {"QueueUrl": QUEUE_URL, "Entries": ANY},
+    )
+
+    failures = queue.push_many(["a", "b", "c"])
+    assert [(f.index, f.code, f.reason) for f in failures] == [(1, "InternalError", "retry")]
+
+
+def test_push_many_fails_the_rejected_chunk(stubber: Stubber):
+    queue = SQSQueue("test")
+    stubber.add_response("get_queue_url", {"QueueUrl": QUEUE_URL}, {"QueueName": ANY})
+    stubber.add_client_error(
+        "send_message_batch",
+        service_error_code="AWS.SimpleQueueService.BatchRequestTooLong",
+        service_message="too long",
+    )
+
+    failures = queue.push_many(["a", "b"])
+    assert [f.index for f in failures] == [0, 1]
+    assert {f.code for f in failures} == {"AWS.SimpleQueueService.BatchRequestTooLong"}
+
+
+def test_push_fetches_the_queue_url_once(stubber: Stubber):
+    queue = SQSQueue("test")
+    stubber.add_response("get_queue_url", {"QueueUrl": QUEUE_URL}, {"QueueName": ANY})
+    for msg in ["a", "b"]:
+        stubber.add_response(
+            "send_message",
+            {"MessageId": "m", "MD5OfMessageBody": "x"},
+            {"QueueUrl": QUEUE_URL, "MessageBody": ANY},
+        )
+        queue.push(msg)
@@ -0,0 +1,66 @@
+import threading
+from typing import List
+
+import pytest
+from pluto_client import CloudEvent
+from pluto_client.clients.shared import queue_subscriber
+from pluto_client.clients.shared.queue_subscriber import (
+    BATCH_HANDLER_ENV,
+    HANDLER_CONCURRENCY_ENV,
+    handle_events,
+)
+
+
+def make_events(*data: str) -> List[CloudEvent]:
+    return [CloudEvent(timestamp=0, data=d) for d in data]
+
+
+def test_handle_events_one_by_one():
+    handled: List[str] = []
+
+    def handler(evt: CloudEvent):
+        if evt.data == "bad":
+            raise ValueError("bad event")
+        handled.append(evt.data)
+
+    failures = handle_events(handler, make_events("a", "bad", "c"))
+    assert handled == ["a", "c"]
+    assert [(index, str(error)) for index, error in failures] == [(1, "bad event")]
+
+
+def test_handle_events_in_batch(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv(BATCH_HANDLER_ENV, "true")
+    batches: List[List[str]] = []
+    handle_events(lambda evts: batches.append([e.data for e in evts]), make_events("a", "b"))
+    assert batches == [["a", "b"]]
+
+    def failing(evts: List[CloudEvent]):
+        raise ValueError("bad batch")
+
+    # A failed batch fails all its events.
+    failures = handle_events(failing, make_events("a", "b"))
+    assert [index for index, _ in failures] == [0, 1]
+
+
+def test_handle_events_concurrently(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv(HANDLER_CONCURRENCY_ENV, "4")
+    monkeypatch.setattr(queue_subscriber, "_executor", None)
+    threads = set()
+    lock = threading.Lock()
+    barrier = threading.Barrier(4, timeout=5)
+
+    def handler(evt: CloudEvent):
+        with lock:
+            threads.add(threading.get_ident())
+        # Only passed if the four events are handled at the same time.
+        barrier.wait()
+        if evt.data == "d":
+            raise ValueError("bad event")
+
+    failures = handle_events(handler, make_events("a", "b", "c", "d"))
+    assert len(threads) == 4
+    assert [index for index, _ in failures] == [3]
+
+
+def test_handle_no_events():
+    assert handle_events(lambda _: None, []) == []
@@ -1,7 +1,12 @@
-import { SNSClient, PublishCommand } from "@aws-sdk/client-sns";
+import { SNSClient, PublishCommand, PublishBatchCommand } from "@aws-sdk/client-sns";
 import { genResourceId } from "@plutolang/base/utils";
-import { CloudEvent, IQueueClient, Queue, QueueOptions } from "../../queue";
-import { genAwsResourceName, getAwsAccountId } from "./utils";
+import { CloudEvent, IQueueClient, Queue, QueueOptions, QueuePushFailure } from "../../queue";
+import { genAwsResourceName, getAwsAccountId, mapInParallel } from "./utils";
+
+/** The maximum number of messages in a PublishBatch request. */
+const PUBLISH_BATCH_MAX_ENTRIES = 10;
+/** The maximum total size of the messages in a PublishBatch request. */
+const PUBLISH_BATCH_MAX_BYTES = 256 * 1024;
 
 /**
  * Implementation of Queue using AWS SNS.
@@ -34,6 +39,43 @@ export class SNSQueue implements IQueueClient {
     );
   }
 
+  public async pushMany(msgs: string[]): Promise<QueuePushFailure[]> {
+    const timestamp = Date.now();
+    const bodies = msgs.map((msg) => JSON.stringify({ timestamp, data: msg } as CloudEvent));
+    const topicArn = await this.topicArn;
+
+    const chunks = chunkMessages(bodies);
+    const results = await mapInParallel(chunks, (chunk) => this.publishBatch(topicArn, chunk));
+    return results.flat();
+  }
+
+  private async publishBatch(
+    topicArn: string,
+    chunk: [number, string][]
+  ): Promise<QueuePushFailure[]> {
+    try {
+      const result = await this.client.send(
+        new PublishBatchCommand({
+          TopicArn: topicArn,
+          PublishBatchRequestEntries: chunk.map(([index, body]) => ({
+            Id: `${index}`,
+            Message: body,
+          })),
+        })
+      );
+      return (result.Failed ?? []).map((failed) => ({
+        index: parseInt(failed.Id!),
+        code: failed.Code!,
+        reason: failed.Message ?? "",
+      }));
+    } catch (e: any) {
+      // The whole chunk was rejected, e.g. it's too large or the topic doesn't exist.
+      const code = e.name ?? "Unknown";
+      const reason = e.message ?? `${e}`;
+      return chunk.map(([index]) => ({ index, code, reason }));
+    }
+  }
+
   private async buildARN(topicName: string): Promise<string> {
     const region = process.env.AWS_REGION;
     if (!region) {
@@ -45,3 +87,30 @@ export class SNSQueue implements IQueueClient {
     return `arn:aws:sns:${region}:${accountId}:${topicName}`;
   }
 }
+
+/**
+ * Split the messages into the chunks of a PublishBatch request, bounded by the number of messages
+ * and their total size. Each message is paired with its index.
+ */
+function chunkMessages(bodies: string[]): [number, string][][] {
+  const chunks: [number, string][][] = [];
+  let chunk: [number, string][] = [];
+  let size = 0;
+  bodies.forEach((body, index) => {
+    const bodySize = Buffer.byteLength(body, "utf-8");
+    if (
+      chunk.length > 0 &&
+      (chunk.length >= PUBLISH_BATCH_MAX_ENTRIES || size + bodySize > PUBLISH_BATCH_MAX_BYTES)
+    ) {
+      chunks.push(chunk);
+      chunk = [];
+      size = 0;
+    }
+    chunk.push([index, body]);
+    size += bodySize;
+  });
+  if (chunk.length > 0) {
+    chunks.push(chunk);
+  }
+  return chunks;
+}
@@ -3,6 +3,12 @@ import { createHash } from "crypto";
 
 const RESOURCE_NAME_MAX_LENGTH = 50;
 
+/**
+ * The maximum number of requests a bulk operation sends to AWS concurrently, the same as the
+ * Python client.
+ */
+export const MAX_PARALLEL_REQUESTS = 8;
+
 export function genAwsResourceName(...parts: string[]): string {
   const resourceFullId = parts
     .join("_")
@@ -34,3 +40,24 @@ export async function getAwsAccountId(): Promise<string> {
   }
   return accountId;
 }
+
+/**
+ * Apply the function to each chunk of a bulk operation, sending up to `MAX_PARALLEL_REQUESTS`
+ * requests concurrently. The results are in the order of the chunks.
+ */
+export async function mapInParallel<T, R>(
+  chunks: readonly T[],
+  fn: (chunk: T) => Promise<R>
+): Promise<R[]> {
+  const results: R[] = new Array(chunks.length);
+  let next = 0;
+  const worker = async () => {
+    while (next < chunks.length) {
+      const idx = next++;
+      results[idx] = await fn(chunks[idx]);
+    }
+  };
+  const workers = Array.from({ length: Math.min(chunks.length, MAX_PARALLEL_REQUESTS) }, worker);
+  await Promise.all(workers);
+  return results;
+}
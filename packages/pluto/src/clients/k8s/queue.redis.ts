@@ -1,5 +1,5 @@
 import { createClient, RedisClientType } from "redis";
-import { CloudEvent, IQueueClient, Queue, QueueOptions } from "../../queue";
+import { CloudEvent, IQueueClient, Queue, QueueOptions, QueuePushFailure } from "../../queue";
 import { genResourceId } from "@plutolang/base/utils";
 import { genK8sResourceName } from "./utils";
 
@@ -27,4 +27,21 @@ export class RedisQueue implements IQueueClient {
     await this.client.xAdd(this.id, "*", { data: JSON.stringify(evt) });
     await this.client.disconnect();
   }
+
+  public async pushMany(msgs: string[]): Promise<QueuePushFailure[]> {
+    if (msgs.length === 0) {
+      return [];
+    }
+    const timestamp = Date.now();
+    await this.client.connect();
+    // Send all the messages in one round trip.
+    const multi = this.client.multi();
+    for (const msg of msgs) {
+      const evt: CloudEvent = { timestamp, data: msg };
+      multi.xAdd(this.id, "*", { data: JSON.stringify(evt) });
+    }
+    await multi.exec();
+    await this.client.disconnect();
+    return [];
+  }
 }
@@ -33,6 +33,16 @@ export interface FunctionOptions {
   memory?: number; // The memory size in MB, default is 128.
   envs?: Record<string, any>;
   raw?: boolean; // This option only works for the AWS currently.
+  /**
+   * The settings of the AWS SDK clients used by the Python function, e.g. to reach the other
+   * resources. Unset ones keep their defaults. They only work for Python on AWS currently.
+   */
+  awsMaxPoolConnections?: number; // The maximum number of connections kept in a pool.
+  awsTcpKeepalive?: boolean; // Whether to enable the TCP keep-alive, default is true.
+  awsConnectTimeout?: number; // The connection timeout in seconds.
+  awsReadTimeout?: number; // The read timeout in seconds.
+  awsRetryMode?: "legacy" | "standard" | "adaptive"; // The retry mode, default is "standard".
+  awsMaxAttempts?: number; // The maximum number of attempts, including the initial one.
 }
 
 export interface IFunctionClientApi<T extends AnyFunction> extends IResourceClientApi {
@@ -13,7 +13,14 @@ import { aws, k8s } from "./clients";
  * The options for instantiating an infrastructure implementation class or a client implementation
  * class.
  */
-export interface KVStoreOptions {}
+export interface KVStoreOptions {
+  /**
+   * Whether to persist the entries of the KVStore under the state directory of the stack when
+   * running the project with `pluto run`, so that they survive the restarts of the simulator. If
+   * not provided, the entries are kept in memory only.
+   */
+  simPersistent?: boolean;
+}
 
 export interface IKVStoreRegularApi {
   readonly awsTableName?: string;
@@ -15,6 +15,13 @@ export interface CloudEvent {
   data: string;
 }
 
+export interface QueuePushFailure {
+  /** The index of the message in the list passed to `pushMany`. */
+  index: number;
+  code: string;
+  reason: string;
+}
+
 export interface EventHandler extends FnResource {
   (evt: CloudEvent): Promise<void>;
 }
@@ -23,13 +30,92 @@ export interface EventHandler extends FnResource {
  * The options for instantiating an infrastructure implementation class or a client implementation
  * class.
  */
-export interface QueueOptions {}
+export interface QueueOptions {
+  /**
+   * The AWS service backing the queue. With SNS, every message invokes the subscriber on its own.
+   * With SQS, the subscriber is invoked with batches of messages polled from the queue, which suits
+   * the high-volume queues. If not provided, it will be "SNS". SQS is only supported by the Python
+   * projects for now.
+   */
+  service?: "SNS" | "SQS";
+
+  /**
+   * The maximum number of messages the SQS queue passes to the subscriber in one invocation, up to
+   * 10000. It must be 10 or less unless `sqsBatchWindow` is set. If not provided, it will be 10.
+   */
+  sqsBatchSize?: number;
+
+  /**
+   * The maximum time in seconds the SQS queue gathers the messages before invoking the subscriber,
+   * up to 300. If not provided, it will be 0, which means the subscriber is invoked as soon as
+   * there are messages.
+   */
+  sqsBatchWindow?: number;
+
+  /**
+   * The maximum number of concurrent invocations of the subscriber by the SQS queue, between 2 and
+   * 1000. If not provided, it's only bounded by the concurrency of the account.
+   */
+  sqsMaxConcurrency?: number;
+
+  /**
+   * Whether the subscriber takes the list of events delivered in one invocation, instead of one
+   * event at a time. If the handler throws, all the events of the invocation are retried. Only
+   * applies to the Python subscribers.
+   */
+  batchHandler?: boolean;
+
+  /**
+   * The number of events of an invocation handled concurrently on a thread pool, for the I/O-bound
+   * subscribers. It doesn't apply to a batch handler. If not provided, the events are handled one
+   * after another. Only applies to the Python subscribers.
+   */
+  handlerConcurrency?: number;
+
+  /**
+   * The maximum number of messages buffered by the simulated queue when running the project with
+   * `pluto run`. Once it's full, the pushes wait for the subscriber to catch up. If not provided,
+   * it will be 1000.
+   */
+  simBufferSize?: number;
+
+  /**
+   * The maximum number of messages the simulated queue delivers to the subscriber in one batch. The
+   * messages of a batch are handled one after another. If not provided, it will be 1.
+   */
+  simBatchSize?: number;
+
+  /**
+   * The time in milliseconds the simulated queue waits for a batch to fill up before delivering it.
+   * If not provided, it will be 0, which means the batch is delivered as soon as possible.
+   */
+  simBatchWindow?: number;
+
+  /**
+   * The maximum number of batches the simulated queue delivers to the subscriber concurrently. If
+   * not provided, it will be 4.
+   */
+  simConcurrency?: number;
+
+  /**
+   * The maximum time in milliseconds `pushMany` of the simulated queue waits for room in the
+   * buffer. The messages that don't fit in time are reported as failed. If not provided, it will be
+   * 30000.
+   */
+  simPushTimeout?: number;
+}
 
 /**
  * Define the access methods for Queue that operate during runtime.
  */
 export interface IQueueClientApi extends IResourceClientApi {
   push(msg: string): Promise<void>;
+  /**
+   * Push multiple messages in bulk, with far fewer round trips than pushing them one by one. The
+   * messages that fail don't stop the others from being pushed. Returns the failures of the
+   * messages that weren't pushed, empty if all of them were.
+   */
+  pushMany(msgs: string[]): Promise<QueuePushFailure[]>;
 }
 
 /**
@@ -70,6 +156,9 @@ export class Queue implements IResource {
     const platformType = utils.currentPlatformType();
     switch (platformType) {
       case PlatformType.AWS:
+        if (opts?.service === "SQS") {
+          throw new Error("The SQS queue is only supported by the Python projects for now.");
+        }
         return new aws.SNSQueue(name, opts);
       case PlatformType.K8s:
         return new k8s.RedisQueue(name, opts);